@@ -0,0 +1,12 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmarks de la evaluación de calidad de datos.
+
+- generador: muestras de eventos sintéticas y su configuración.
+- ejecutar: benchmark de extremo a extremo a varias escalas.
+- kernels: micro-benchmarks de las funciones de cálculo, con comprobación
+  de regresiones frente a una línea base.
+
+Se ejecutan como módulos desde el directorio del programa, por ejemplo:
+    python -m benchmark.ejecutar --escalas pequena --procesos 1 4
+"""
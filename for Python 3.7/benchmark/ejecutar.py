@@ -0,0 +1,244 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark de extremo a extremo de la evaluación de calidad de datos.
+
+Para cada escala, formato de fichero y número de procesos genera una muestra
+sintética (ver benchmark.generador) y mide la evaluación de dimensiones
+(valorar_dimensiones), el post-proceso (de compute_valoracion a
+valorar_calidad_global), los informes pdf y los plots. Los resultados se
+guardan en un fichero JSON, para compararlos entre ejecuciones.
+
+Uso (desde el directorio del programa):
+    python -m benchmark.ejecutar --escalas pequena mediana --formatos csv parquet --procesos 1 4
+"""
+
+import os
+import json
+import shutil
+import argparse
+import tempfile
+import platform
+from datetime import datetime
+
+import lib_calidad_datos as cd
+from benchmark import generador
+
+
+# Escalas de la muestra sintética: parámetros del generador distintos de los
+#   de por defecto (ver generador.PARAMETROS_POR_DEFECTO)
+ESCALAS = {'pequena': {'filas': 10 ** 5, 'pares': 60},
+           'mediana': {'filas': 10 ** 6, 'pares': 200},
+           'grande': {'filas': 10 ** 7, 'pares': 600, 'tipologias': 20},
+           'sesgada': {'filas': 10 ** 6, 'pares': 200, 'sesgo': 2.0},
+           'ancha': {'filas': 10 ** 6, 'pares': 200, 'columnas_extra': 100}}
+
+# Periodo (en días) de las muestras sintéticas
+PERIODO = 30
+
+# Directorio y fichero de resultados
+RESULTADOS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'resultados')
+FICHERO_RESULTADOS = 'benchmark_%s.json'
+
+
+
+###############################################################################
+def ejecutar_caso(directorio, formato, procesos, informes):
+    """
+    Runs and measures the evaluation of the data sample of a directory (see medir_etapa).
+
+    Parameters
+    ----------
+    directorio: str
+                Directory of the data sample and configuration files (see generador.generar_muestra).
+    formato: str
+             'csv' or 'parquet'.
+    procesos: int
+              Number of processes evaluating the chunks.
+    informes: bool
+              If True, pdf reports and plots are also generated and measured.
+
+    Returns
+    -------
+    registro: dict
+              Record of the run, with the measurement of each stage and of each chunk.
+    """
+
+    cd.configurar_ejecucion(input_dir=directorio, config_dir=directorio,
+                            output_dir=os.path.join(directorio, 'output'), temp_dir=os.path.join(directorio, 'temp'))
+    registro = cd.iniciar_registro({'formato': formato, 'procesos': procesos, 'chunksize': cd.CHUNKSIZE})
+
+    data_source_config = cd.compilar_configuracion_fuentes(cd.cargar_configuracion_fuentes())
+    event_typology_config = cd.compilar_configuracion_tipologias(cd.cargar_configuracion_tipologias())
+    lista_ficheros_input = [fic for fic in cd.cargar_ficheros_input() if fic.endswith('.' + formato)]
+
+    with cd.medir_etapa(registro, 'valorar_dimensiones') as etapa:
+        valoracion = cd.valorar_dimensiones(lista_ficheros_input, generador.SEPARADOR, data_source_config,
+                                            event_typology_config, n_procesos=procesos, registro=registro)
+        etapa['filas'] = sum(chunk['filas'] for chunk in registro['chunks'])
+
+    with cd.medir_etapa(registro, 'post_proceso') as etapa:
+        valoracion = cd.compute_valoracion(valoracion)
+        valoracion = cd.valorar_nivel_informacion(valoracion)
+        valoracion = cd.valorar_precio_por_dato(valoracion, PERIODO)
+        valoracion = cd.normalizar_valoracion(valoracion, event_typology_config)
+        valoracion = cd.calcular_niveles(valoracion, event_typology_config)
+        valoracion = cd.valorar_calidad_tipologia(valoracion)
+        valoracion = cd.valorar_exclusividad(valoracion)
+        valoracion_fuentes = cd.valorar_calidad_global(valoracion)
+        etapa['filas'] = len(valoracion)
+
+    if informes:
+        with cd.medir_etapa(registro, 'informes') as etapa:
+            fallos = cd.generar_informe_fuentes(valoracion, valoracion_fuentes)
+            fallos += cd.generar_informe_tipologias(valoracion)
+            fallos += cd.generar_informe_ranking(valoracion_fuentes)
+            etapa['filas'] = len(valoracion_fuentes) + len(set(valoracion['Tipologia'])) + 1
+            etapa['fallos'] = len(fallos)
+        with cd.medir_etapa(registro, 'plots') as etapa:
+            etapa['filas'] = cd.generar_plots(valoracion, 'Tipologia') + cd.generar_plots(valoracion, 'Data source')
+
+
+    return registro
+
+
+
+###############################################################################
+def ejecutar_benchmark(escalas, formatos, lista_procesos, informes=True, directorio_datos=None):
+    """
+    Runs the benchmark for each scale, file format and number of processes.
+    Each sample is generated once per scale and format and evaluated with every number of processes.
+
+    Parameters
+    ----------
+    escalas: list
+             Names of the scales (see ESCALAS).
+    formatos: list
+              File formats ('csv', 'parquet').
+    lista_procesos: list
+                    Numbers of processes evaluating the chunks.
+    informes: bool
+              If True, pdf reports and plots are also generated and measured.
+    directorio_datos: str
+                      Directory in which the samples are generated and kept. If None, a temporary directory is used and removed at the end.
+
+    Returns
+    -------
+    resultados: dict
+                Environment of the benchmark and record of each case.
+
+    Example
+    -------
+    >>> ejecutar_benchmark(['pequena'], ['csv'], [1, 4], informes=False)
+    """
+
+    resultados = {'inicio': datetime.now().isoformat(timespec='seconds'),
+                  'entorno': {'python': platform.python_version(),
+                              'plataforma': platform.platform(),
+                              'procesadores': os.cpu_count()},
+                  'casos': []}
+
+    temporal = directorio_datos is None
+    if temporal:
+        directorio_datos = tempfile.mkdtemp(prefix='benchmark_calidad_')
+    try:
+        for escala in escalas:
+            parametros = dict(generador.PARAMETROS_POR_DEFECTO, **ESCALAS[escala])
+            for formato in formatos:
+                directorio = os.path.join(directorio_datos, '%s_%s' % (escala, formato))
+                path_muestra = os.path.join(directorio, generador.FICHERO_MUESTRA % formato)
+                if not os.path.exists(path_muestra):
+                    generador.generar_muestra(directorio, formato, **parametros)
+                for procesos in lista_procesos:
+                    print('Benchmark: escala %s, formato %s, %d procesos' % (escala, formato, procesos))
+                    registro = ejecutar_caso(directorio, formato, procesos, informes)
+                    registro['escala'] = escala
+                    registro['parametros'] = parametros
+                    registro['bytes'] = os.path.getsize(path_muestra)
+                    resultados['casos'].append(registro)
+    finally:
+        if temporal:
+            shutil.rmtree(directorio_datos, ignore_errors=True)
+
+
+    return resultados
+
+
+
+###############################################################################
+def guardar_resultados(resultados, directorio=RESULTADOS_DIR):
+    """
+    Saves the results of the benchmark as a JSON file.
+
+    Parameters
+    ----------
+    resultados: dict
+                Results of the benchmark (see ejecutar_benchmark).
+    directorio: str
+                Directory of the results.
+
+    Returns
+    -------
+    path_resultados: str
+                     Path of the JSON file.
+    """
+
+    cd.makedir(directorio)
+    fecha = datetime.strptime(resultados['inicio'], '%Y-%m-%dT%H:%M:%S').strftime('%Y%m%d_%H%M%S')
+    path_resultados = os.path.join(directorio, FICHERO_RESULTADOS % fecha)
+    with open(path_resultados, 'w', encoding=cd.ENCODING) as fichero:
+        json.dump(resultados, fichero, indent=2, default=str)
+
+
+    return path_resultados
+
+
+
+###############################################################################
+def mostrar_resumen(resultados):
+    """
+    Prints the wall time of each stage of each case.
+
+    Parameters
+    ----------
+    resultados: dict
+                Results of the benchmark (see ejecutar_benchmark).
+
+    Returns
+    -------
+    None
+    """
+
+    for caso in resultados['casos']:
+        etapas = ', '.join('%s %.3fs' % (etapa['etapa'], etapa['tiempo']) for etapa in caso['etapas'])
+        print('%s/%s/%d procesos: %s' % (caso['escala'], caso['config']['formato'], caso['config']['procesos'], etapas))
+
+
+
+###############################################################################
+def main(argv=None):
+    """
+    Command line entry point of the benchmark.
+    """
+
+    parser = argparse.ArgumentParser(description='End-to-end benchmark of the data quality evaluation.')
+    parser.add_argument('--escalas', nargs='+', choices=sorted(ESCALAS), default=['pequena'])
+    parser.add_argument('--formatos', nargs='+', choices=generador.FORMATOS, default=['csv'])
+    parser.add_argument('--procesos', nargs='+', type=int, default=[1])
+    parser.add_argument('--chunksize', type=int, help='maximum number of lines in each chunk (default: %d)' % cd.CHUNKSIZE)
+    parser.add_argument('--sin-informes', dest='informes', action='store_false',
+                        help='do not generate pdf reports and plots')
+    parser.add_argument('--directorio-datos', dest='directorio_datos',
+                        help='directory in which the samples are generated and kept between runs')
+    parser.add_argument('--resultados', default=RESULTADOS_DIR, help='directory of the results')
+    argumentos = parser.parse_args(argv)
+
+    cd.configurar_ejecucion(chunksize=argumentos.chunksize)
+    resultados = ejecutar_benchmark(argumentos.escalas, argumentos.formatos, argumentos.procesos,
+                                    argumentos.informes, argumentos.directorio_datos)
+    mostrar_resumen(resultados)
+    print(guardar_resultados(resultados, argumentos.resultados))
+
+
+###############################################################################
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,356 @@
+# -*- coding: utf-8 -*-
+"""
+Generador de muestras de eventos sintéticas para los benchmarks.
+
+Genera ficheros de eventos (.csv o .parquet) con el esquema que espera
+lib_calidad_datos (name, devicevendor, flexnumber1, deviceseverity y campos
+obligatorios), junto con los ficheros de configuración de sus tipologías y
+fuentes de datos. La generación es reproducible a partir de una semilla.
+
+Uso:
+    python -m benchmark.generador --filas 1000000 --pares 200 --salida <dir>
+"""
+
+import os
+import sys
+import argparse
+import numpy as np
+import pandas as pd
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+import lib_calidad_datos as cd
+
+
+# Parámetros por defecto de la muestra sintética
+PARAMETROS_POR_DEFECTO = {'filas': 100000,
+                          'pares': 60,
+                          'tipologias': 6,
+                          'campos_obligatorios': 6,
+                          'columnas_extra': 10,
+                          'tasa_nulos': 0.2,
+                          'sesgo': 1.0,
+                          'semilla': 0}
+
+# Número de filas generadas y escritas en cada bloque, para acotar la memoria
+FILAS_POR_BLOQUE = 500000
+
+# Formatos de fichero generados
+FORMATOS = ['csv', 'parquet']
+SEPARADOR = ';'
+
+# Nombres de los ficheros y campos generados
+FICHERO_MUESTRA = 'muestra_sintetica.%s'
+PREFIJO_TIPOLOGIA = 'Tipologia%03d'
+PREFIJO_FUENTE = 'Fuente%03d'
+PREFIJO_CAMPO_OBLIGATORIO = 'campo%d'
+PREFIJO_COLUMNA_EXTRA = 'extra%d'
+
+# Valores de los atributos de las fuentes de datos, asignados por turnos
+TIPOS_FUENTE = ['Propia', 'Publica', 'Privada']
+CONSISTENCIAS_FUENTE = ['Baja', 'Media', 'Alta', 'Muy Alta']
+
+# Umbrales por defecto de las tipologías (sección Default Section)
+CONFIGURACION_TIPOLOGIAS = """[Default Section]
+cantidad_minimo = 0.4
+cantidad_deseado = 0.8
+campos_obligatorios = %s
+completitud_minimo = 0.6
+completitud_deseado = 0.8
+nivel_de_informacion_minimo = 0.6
+nivel_de_informacion_deseado = 0.8
+veracidad_referencia = 5
+veracidad_minimo = 0.6
+veracidad_deseado = 0.8
+veracidad_desconocida_minimo = 0.4
+veracidad_desconocida_deseado = 0.2
+frecuencia_minimo = 06:00:00
+frecuencia_deseado = 02:00:00
+consistencia_minimo = Media
+consistencia_deseado = Alta
+precio_por_dato_referencia = 0.001
+precio_por_dato_minimo = 1
+precio_por_dato_deseado = 1.6
+"""
+
+CONFIGURACION_FUENTE = """
+[%s]
+tipo = %s
+valoracion_datos_obsoletos = N/D
+tasa_falsos_positivos = N/D
+tasa_datos_duplicados = N/D
+frecuencia = %02d:00:00
+consistencia = %s
+precio = %s
+valoracion_manual = Neutra
+"""
+
+ERROR_MSG_301 = 'ERROR: The number of pairs must be between 1 and %d'
+
+
+
+###############################################################################
+def obtener_pares(pares, tipologias, generador):
+    """
+    Chooses the Event typology - Data source pairs of the sample.
+    The number of data sources is the smallest one that gives the requested number of pairs with the requested number of typologies.
+
+    Parameters
+    ----------
+    pares: int
+           Number of Event typology - Data source pairs.
+    tipologias: int
+                Number of event typologies.
+    generador: numpy.random.Generator
+               Random number generator.
+
+    Returns
+    -------
+    lista_pares: list
+                 (typology, data source) tuples, in random order.
+    fuentes: list
+             Data sources of the sample.
+
+    Example
+    -------
+    >>> obtener_pares(4, 2, np.random.default_rng(0))
+    ([('Tipologia001', 'Fuente000'), ...], ['Fuente000', 'Fuente001'])
+    """
+
+    n_fuentes = -(-pares // tipologias)
+    lista_tipologias = [PREFIJO_TIPOLOGIA % i for i in range(tipologias)]
+    fuentes = [PREFIJO_FUENTE % i for i in range(n_fuentes)]
+    if not 1 <= pares <= len(lista_tipologias) * len(fuentes):
+        print(ERROR_MSG_301 % (len(lista_tipologias) * len(fuentes)))
+        sys.exit()
+
+    todos = [(tipologia, fuente) for tipologia in lista_tipologias for fuente in fuentes]
+    lista_pares = [todos[i] for i in generador.permutation(len(todos))[:pares]]
+
+
+    return lista_pares, fuentes
+
+
+
+###############################################################################
+def obtener_pesos(n, sesgo):
+    """
+    Gets the probability of each pair following a Zipf law: the pair of rank k has weight 1 / k ** sesgo.
+
+    Parameters
+    ----------
+    n: int
+       Number of pairs.
+    sesgo: float
+           Skew of the distribution. 0 gives the same probability to every pair.
+
+    Returns
+    -------
+    pesos: numpy.ndarray
+           Probability of each pair.
+
+    Example
+    -------
+    >>> obtener_pesos(3, 1)
+    array([0.54545455, 0.27272727, 0.18181818])
+    """
+
+    pesos = 1 / np.arange(1, n + 1) ** sesgo
+
+
+    return pesos / pesos.sum()
+
+
+
+###############################################################################
+def generar_bloque(filas, lista_pares, pesos, campos, columnas_extra, tasa_nulos, generador):
+    """
+    Generates a block of synthetic events.
+
+    Parameters
+    ----------
+    filas: int
+           Number of events.
+    lista_pares: list
+                 (typology, data source) tuples.
+    pesos: numpy.ndarray
+           Probability of each pair.
+    campos: list
+            Names of the mandatory fields.
+    columnas_extra: int
+                    Number of columns that are not used by the evaluation.
+    tasa_nulos: float or list
+                Rate of null values of the mandatory fields, reliability and severity (one rate for each mandatory field if it is a list).
+    generador: numpy.random.Generator
+               Random number generator.
+
+    Returns
+    -------
+    bloque: pandas dataframe
+            Block of events.
+    """
+
+    indices = generador.choice(len(lista_pares), size=filas, p=pesos)
+    tipologias = np.array([par[0] for par in lista_pares], dtype=object)
+    fuentes = np.array([par[1] for par in lista_pares], dtype=object)
+
+    if np.isscalar(tasa_nulos):
+        tasa_nulos = [tasa_nulos] * len(campos)
+    tasa_media = float(np.mean(tasa_nulos)) if len(tasa_nulos) else 0.0
+
+    # Fiabilidad y severidad en [0, 10], con valores nulos
+    fiabilidad = np.round(generador.uniform(0, 10, filas), 1)
+    fiabilidad[generador.random(filas) < tasa_media] = np.nan
+    severidad = generador.integers(0, 11, filas).astype(float)
+    severidad[generador.random(filas) < tasa_media] = np.nan
+
+    bloque = {cd.FIELD_TYPOLOGY: tipologias[indices],
+              cd.FIELD_DATA_SOURCE: fuentes[indices],
+              cd.FIELD_FIABILITY: fiabilidad,
+              cd.FIELD_SEVERITY: severidad}
+    for campo, tasa in zip(campos, tasa_nulos):
+        valores = generador.integers(0, 10 ** 6, filas).astype(str).astype(object)
+        valores[generador.random(filas) < tasa] = None
+        bloque[campo] = valores
+    for i in range(columnas_extra):
+        bloque[PREFIJO_COLUMNA_EXTRA % i] = generador.integers(0, 10 ** 9, filas)
+
+
+    return pd.DataFrame(bloque)
+
+
+
+###############################################################################
+def generar_muestra(directorio, formato='csv', filas=PARAMETROS_POR_DEFECTO['filas'], pares=PARAMETROS_POR_DEFECTO['pares'],
+                    tipologias=PARAMETROS_POR_DEFECTO['tipologias'], campos_obligatorios=PARAMETROS_POR_DEFECTO['campos_obligatorios'],
+                    columnas_extra=PARAMETROS_POR_DEFECTO['columnas_extra'], tasa_nulos=PARAMETROS_POR_DEFECTO['tasa_nulos'],
+                    sesgo=PARAMETROS_POR_DEFECTO['sesgo'], semilla=PARAMETROS_POR_DEFECTO['semilla']):
+    """
+    Generates a synthetic data sample file, and the configuration files of its typologies and data sources (see generar_configuracion).
+    The same parameters and seed always give the same sample. Events are generated and written in blocks of FILAS_POR_BLOQUE rows.
+
+    Parameters
+    ----------
+    directorio: str
+                Directory of the data sample file and of the configuration files.
+    formato: str
+             'csv' or 'parquet'.
+    filas: int
+           Number of events.
+    pares: int
+           Number of Event typology - Data source pairs.
+    tipologias: int
+                Number of event typologies.
+    campos_obligatorios: int
+                         Number of mandatory fields.
+    columnas_extra: int
+                    Number of columns that are not used by the evaluation.
+    tasa_nulos: float or list
+                Rate of null values of the mandatory fields (one rate for each field if it is a list).
+    sesgo: float
+           Skew of the distribution of events over the pairs (see obtener_pesos).
+    semilla: int
+             Seed of the random number generator.
+
+    Returns
+    -------
+    path_muestra: str
+                  Path of the data sample file.
+
+    Example
+    -------
+    >>> generar_muestra('/tmp/muestra', 'parquet', filas=10 ** 6, pares=200, sesgo=1.2)
+    '/tmp/muestra/muestra_sintetica.parquet'
+    """
+
+    if formato == 'parquet' and pa is None:
+        print(cd.ERROR_MSG_209)
+        sys.exit()
+
+    generador = np.random.default_rng(semilla)
+    lista_pares, fuentes = obtener_pares(pares, tipologias, generador)
+    pesos = obtener_pesos(len(lista_pares), sesgo)
+    campos = [PREFIJO_CAMPO_OBLIGATORIO % i for i in range(1, campos_obligatorios + 1)]
+
+    cd.makedir(directorio)
+    generar_configuracion(directorio, sorted(set(par[0] for par in lista_pares)), fuentes, campos)
+
+    path_muestra = os.path.join(directorio, FICHERO_MUESTRA % formato)
+    escritor = None
+    for inicio in range(0, filas, FILAS_POR_BLOQUE):
+        bloque = generar_bloque(min(FILAS_POR_BLOQUE, filas - inicio), lista_pares, pesos, campos,
+                                columnas_extra, tasa_nulos, generador)
+        if formato == 'csv':
+            bloque.to_csv(path_muestra, sep=SEPARADOR, index=False, header=(inicio == 0),
+                          mode='w' if inicio == 0 else 'a')
+        else:
+            tabla = pa.Table.from_pandas(bloque, preserve_index=False)
+            if escritor is None:
+                escritor = pq.ParquetWriter(path_muestra, tabla.schema)
+            escritor.write_table(tabla)
+    if escritor is not None:
+        escritor.close()
+
+
+    return path_muestra
+
+
+
+###############################################################################
+def generar_configuracion(directorio, tipologias, fuentes, campos):
+    """
+    Writes the configuration files (event_typology.ini and data_source.ini) of a synthetic data sample.
+    Each typology requires a different subset of the mandatory fields, so the evaluation of completeness depends on the typology.
+
+    Parameters
+    ----------
+    directorio: str
+                Directory of the configuration files.
+    tipologias: list
+                Event typologies of the sample.
+    fuentes: list
+             Data sources of the sample.
+    campos: list
+            Names of the mandatory fields.
+
+    Returns
+    -------
+    None
+    """
+
+    with open(os.path.join(directorio, cd.EVENT_TYPOLOGY_CONFIG_FILE), 'w', encoding=cd.ENCODING) as fichero:
+        fichero.write(CONFIGURACION_TIPOLOGIAS % ','.join(campos))
+        for i, tipologia in enumerate(tipologias):
+            campos_tipologia = campos[i % len(campos):] or campos
+            fichero.write('\n[%s]\ncampos_obligatorios = %s\n' % (tipologia, ','.join(campos_tipologia)))
+
+    with open(os.path.join(directorio, cd.DATA_SOURCE_CONFIG_FILE), 'w', encoding=cd.ENCODING) as fichero:
+        for i, fuente in enumerate(fuentes):
+            fichero.write(CONFIGURACION_FUENTE % (fuente, TIPOS_FUENTE[i % len(TIPOS_FUENTE)], i % 24,
+                                                  CONSISTENCIAS_FUENTE[i % len(CONSISTENCIAS_FUENTE)], round(i * 10.5, 2)))
+
+
+
+###############################################################################
+def main(argv=None):
+    """
+    Command line entry point: generates a synthetic data sample and its configuration files.
+    """
+
+    parser = argparse.ArgumentParser(description='Generates a synthetic data sample and its configuration files.')
+    parser.add_argument('--salida', required=True, help='directory of the sample and configuration files')
+    parser.add_argument('--formato', choices=FORMATOS, default='csv')
+    for parametro, valor in PARAMETROS_POR_DEFECTO.items():
+        parser.add_argument('--' + parametro.replace('_', '-'), dest=parametro, type=type(valor), default=valor,
+                            help='default: %(default)s')
+    argumentos = vars(parser.parse_args(argv))
+
+    print(generar_muestra(argumentos.pop('salida'), **argumentos))
+
+
+###############################################################################
+if __name__ == "__main__":
+    main()
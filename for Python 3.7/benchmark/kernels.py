@@ -0,0 +1,529 @@
+# -*- coding: utf-8 -*-
+"""
+Micro-benchmarks de las funciones de cálculo de lib_calidad_datos.
+
+Mide cada función sobre entradas sintéticas de varios tamaños (filas de la
+muestra o pares Tipologia - Data source, según la función) y compara los
+tiempos con una línea base guardada, para detectar regresiones.
+
+Uso (desde el directorio del programa):
+    python -m benchmark.kernels --guardar-linea-base     (guarda la línea base)
+    python -m benchmark.kernels                          (compara con ella)
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import platform
+from datetime import datetime
+import numpy as np
+import pandas as pd
+
+import lib_calidad_datos as cd
+from benchmark import generador
+
+
+# Tamaños de las entradas: número de filas para las funciones que recorren
+#   la muestra de datos y número de pares para las que recorren la
+#   estructura de valoración
+FILAS = [10 ** 4, 10 ** 5, 10 ** 6]
+PARES = [100, 1000, 10000]
+
+# Número de repeticiones de cada medida (se guarda la mejor)
+REPETICIONES = 5
+
+# Tipologías de la muestra sintética y filas por par en las entradas de las
+#   funciones que recorren la estructura de valoración
+TIPOLOGIAS = 20
+FILAS_POR_PAR = 20
+
+# Línea base y tolerancia: una función es una regresión si su tiempo supera
+#   al de la línea base en más de la tolerancia y en más de TIEMPO_MINIMO
+#   segundos, ya que los tiempos muy pequeños varían mucho entre ejecuciones
+FICHERO_LINEA_BASE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'linea_base_kernels.json')
+TOLERANCIA = 0.25
+TIEMPO_MINIMO = 0.01
+
+WARNING_MSG_302 = 'WARNING: Regression in %s (%s = %d): %.4fs, baseline %.4fs (+%.0f%%)'
+ERROR_MSG_303 = 'ERROR: Baseline %s does not exist, save it first with --guardar-linea-base'
+
+
+
+###############################################################################
+def preparar_entorno(pares, directorio):
+    """
+    Writes the configuration files of a synthetic sample with the given number of pairs and loads them.
+    Events are spread evenly over the pairs, so the size of the inputs does not depend on the skew.
+
+    Parameters
+    ----------
+    pares: int
+           Number of Event typology - Data source pairs.
+    directorio: str
+                Directory of the configuration files.
+
+    Returns
+    -------
+    entorno: dict
+             Pairs of the sample and their probabilities, mandatory fields, parsers and compiled configurations.
+    """
+
+    cd.makedir(directorio)
+    generador_aleatorio = np.random.default_rng(generador.PARAMETROS_POR_DEFECTO['semilla'])
+    lista_pares, fuentes = generador.obtener_pares(pares, min(TIPOLOGIAS, pares), generador_aleatorio)
+    campos = [generador.PREFIJO_CAMPO_OBLIGATORIO % i
+              for i in range(1, generador.PARAMETROS_POR_DEFECTO['campos_obligatorios'] + 1)]
+    generador.generar_configuracion(directorio, sorted(set(par[0] for par in lista_pares)), fuentes, campos)
+    cd.configurar_ejecucion(config_dir=directorio)
+
+    data_source_parser = cd.cargar_configuracion_fuentes()
+    event_typology_parser = cd.cargar_configuracion_tipologias()
+    entorno = {'pares': lista_pares,
+               'pesos': generador.obtener_pesos(len(lista_pares), 0),
+               'campos': campos,
+               'generador': generador_aleatorio,
+               'e_t_p': event_typology_parser,
+               'd_s_c': cd.compilar_configuracion_fuentes(data_source_parser),
+               'e_t_c': cd.compilar_configuracion_tipologias(event_typology_parser)}
+
+
+    return entorno
+
+
+
+###############################################################################
+def generar_datos(entorno, filas):
+    """
+    Generates a block of synthetic events of the pairs of the environment (see generador.generar_bloque).
+
+    Parameters
+    ----------
+    entorno: dict
+             Environment of the benchmark (see preparar_entorno).
+    filas: int
+           Number of events.
+
+    Returns
+    -------
+    dat: pandas dataframe
+         Block of events, without extra columns.
+    """
+
+    dat = generador.generar_bloque(filas, entorno['pares'], entorno['pesos'], entorno['campos'], 0,
+                                   generador.PARAMETROS_POR_DEFECTO['tasa_nulos'], entorno['generador'])
+
+
+    return dat
+
+
+
+###############################################################################
+def preparar_valoracion(entorno):
+    """
+    Prepares the running evaluation structure of all the pairs of the environment, as accumulated chunk by chunk (see acumular_valoracion).
+
+    Parameters
+    ----------
+    entorno: dict
+             Environment of the benchmark (see preparar_entorno).
+
+    Returns
+    -------
+    val: pandas dataframe
+         Running evaluation structure, indexed by Tipologia and Data source.
+    """
+
+    # Los pares son equiprobables (ver preparar_entorno), así que con
+    #   FILAS_POR_PAR filas por par aparecen prácticamente todos
+    dat = cd.compactar_chunk(generar_datos(entorno, len(entorno['pares']) * FILAS_POR_PAR))
+
+
+    return cd.acumular_valoracion(None, cd.process_chunk(dat, entorno['d_s_c'], entorno['e_t_c']))
+
+
+
+###############################################################################
+def preparar_valoracion_normalizada(entorno):
+    """
+    Prepares the normalized evaluation structure of all the pairs of the environment, which is the input of calcular_niveles.
+
+    Parameters
+    ----------
+    entorno: dict
+             Environment of the benchmark (see preparar_entorno).
+
+    Returns
+    -------
+    val: pandas dataframe
+         Normalized evaluation structure for each Data source - Event typology.
+    """
+
+    val = cd.compute_valoracion(preparar_valoracion(entorno))
+    val = cd.valorar_nivel_informacion(val)
+    val = cd.valorar_precio_por_dato(val, 30)
+
+
+    return cd.normalizar_valoracion(val, entorno['e_t_c'])
+
+
+
+###############################################################################
+def preparar_replace_by_threshold(entorno, filas):
+    """
+    Prepares the inputs of replace_by_threshold: the severity of a block of events.
+    """
+
+    dat = generar_datos(entorno, filas)[[cd.FIELD_SEVERITY]]
+
+
+    return dat, cd.FIELD_SEVERITY, [4, 8], [3, 6, 9]
+
+
+
+###############################################################################
+def preparar_process_chunk(entorno, filas):
+    """
+    Prepares the inputs of process_chunk: a block of events with the dtype plan applied, as read from a data sample file.
+    """
+
+    dat = cd.compactar_chunk(generar_datos(entorno, filas))
+
+
+    return dat, entorno['d_s_c'], entorno['e_t_c']
+
+
+
+###############################################################################
+def preparar_chunk_agrupado(entorno, filas, mapas_presencia):
+    """
+    Prepares the inputs of valorar_chunk_agrupado as process_chunk does: a block of events with recodified reliability and severity, its evaluation structure, the index of the pair of each row and, if mapas_presencia, the presence bitmaps of the mandatory fields.
+
+    Parameters
+    ----------
+    entorno: dict
+             Environment of the benchmark (see preparar_entorno).
+    filas: int
+           Number of events.
+    mapas_presencia: bool
+                     If True, mandatory fields are reduced to presence bitmaps (see reducir_a_mapas_presencia).
+
+    Returns
+    -------
+    val: pandas dataframe
+         Evaluation structure of the pairs of the block.
+    dat: pandas dataframe
+         Block of events.
+    codigos: numpy array
+             Index in val of the pair of each row.
+    e_t_c: ConfiguracionTipologias
+           Compiled event typologies configuration.
+    presencia: dict
+               Presence bitmaps of the block, with the bitmap segment of each row of val (None if not mapas_presencia).
+    """
+
+    dat = cd.compactar_chunk(generar_datos(entorno, filas))
+    presencia = mapas = None
+    if mapas_presencia:
+        dat, presencia = cd.reducir_a_mapas_presencia(dat)
+        codigos, tip_fue, mapas = presencia['codigos'], presencia['pares'], presencia['mapas']
+    else:
+        codigos, tip_fue = cd.factorizar_pares(dat)
+    val = cd.inicializar_estructura_valoracion(tip_fue, entorno['d_s_c'])
+    dat = cd.eliminar_columnas_innecesarias(dat, entorno['e_t_c'], list(set(val['Tipologia'])), mapas)
+    dat = cd.redefinir_datos_fiabilidad_severidad(dat)
+
+    posiciones = pd.MultiIndex.from_frame(val[cd.SORT_FIELDS]).get_indexer(pd.MultiIndex.from_frame(tip_fue))
+    codigos = np.where(codigos >= 0, posiciones[codigos], -1)
+    if mapas_presencia:
+        evaluados = np.nonzero(posiciones >= 0)[0]
+        segmentos = np.zeros(len(val), dtype=np.int64)
+        segmentos[posiciones[evaluados]] = evaluados
+        presencia = dict(presencia, segmentos=segmentos)
+
+
+    return val, dat, codigos, entorno['e_t_c'], presencia
+
+
+
+###############################################################################
+def preparar_valorar_chunk_agrupado(entorno, filas):
+    """
+    Prepares the inputs of valorar_chunk_agrupado, with completeness counted over the columns of the mandatory fields (see preparar_chunk_agrupado).
+    """
+
+    return preparar_chunk_agrupado(entorno, filas, False)
+
+
+
+###############################################################################
+def preparar_valorar_chunk_agrupado_mapas(entorno, filas):
+    """
+    Prepares the inputs of valorar_chunk_agrupado, with completeness counted over presence bitmaps (see preparar_chunk_agrupado).
+    """
+
+    return preparar_chunk_agrupado(entorno, filas, True)
+
+
+
+###############################################################################
+def preparar_reducir_a_mapas_presencia(entorno, filas):
+    """
+    Prepares the inputs of reducir_a_mapas_presencia: a block of events with the dtype plan applied, as read from a data sample file.
+    """
+
+    return (cd.compactar_chunk(generar_datos(entorno, filas)),)
+
+
+
+###############################################################################
+def preparar_contar_bits_por_segmento(entorno, filas):
+    """
+    Prepares the inputs of contar_bits_por_segmento: the presence bitmap of a mandatory field of a block of events and the segment of each pair (see reducir_a_mapas_presencia).
+    """
+
+    _, presencia = cd.reducir_a_mapas_presencia(cd.compactar_chunk(generar_datos(entorno, filas)))
+
+
+    return presencia['mapas'][entorno['campos'][0]], presencia['inicios']
+
+
+
+###############################################################################
+def preparar_calcular_niveles(entorno, pares):
+    """
+    Prepares the inputs of calcular_niveles (see preparar_valoracion_normalizada).
+    """
+
+    return preparar_valoracion_normalizada(entorno), entorno['e_t_c']
+
+
+
+###############################################################################
+def preparar_valorar_exclusividad(entorno, pares):
+    """
+    Prepares the inputs of valorar_exclusividad: the evaluation structure with levels and quality of each pair.
+    """
+
+    val = cd.calcular_niveles(preparar_valoracion_normalizada(entorno), entorno['e_t_c'])
+
+
+    return (cd.valorar_calidad_tipologia(val),)
+
+
+
+###############################################################################
+# Funciones medidas: tipo de tamaño sobre el que se miden ('filas' o 'pares'),
+#   función y preparación de sus entradas a partir del entorno y el tamaño
+KERNELS = {'replace_by_threshold': ('filas', cd.replace_by_threshold, preparar_replace_by_threshold),
+           'valorar_chunk_agrupado': ('filas', cd.valorar_chunk_agrupado, preparar_valorar_chunk_agrupado),
+           'valorar_chunk_agrupado_mapas': ('filas', cd.valorar_chunk_agrupado, preparar_valorar_chunk_agrupado_mapas),
+           'reducir_a_mapas_presencia': ('filas', cd.reducir_a_mapas_presencia, preparar_reducir_a_mapas_presencia),
+           'contar_bits_por_segmento': ('filas', cd.contar_bits_por_segmento, preparar_contar_bits_por_segmento),
+           'process_chunk': ('filas', cd.process_chunk, preparar_process_chunk),
+           'compute_valoracion': ('pares', cd.compute_valoracion, lambda entorno, pares: (preparar_valoracion(entorno),)),
+           'calcular_niveles': ('pares', cd.calcular_niveles, preparar_calcular_niveles),
+           'valorar_exclusividad': ('pares', cd.valorar_exclusividad, preparar_valorar_exclusividad)}
+
+
+
+###############################################################################
+def medir_kernel(funcion, args, repeticiones):
+    """
+    Measures a function: it is called repeticiones times, each one over a fresh copy of its inputs, as some of the functions modify them (the copy is not measured).
+
+    Parameters
+    ----------
+    funcion: function
+             Function to be measured.
+    args: tuple
+          Inputs of the function.
+    repeticiones: int
+                  Number of repetitions.
+
+    Returns
+    -------
+    medida: dict
+            Best and median wall time of the repetitions, in seconds.
+    """
+
+    tiempos = []
+    for _ in range(repeticiones):
+        argumentos = [arg.copy() if hasattr(arg, 'copy') else arg for arg in args]
+        inicio = time.perf_counter()
+        funcion(*argumentos)
+        tiempos.append(time.perf_counter() - inicio)
+
+
+    return {'mejor': min(tiempos), 'mediana': float(np.median(tiempos)), 'repeticiones': repeticiones}
+
+
+
+###############################################################################
+def ejecutar_kernels(nombres, filas=FILAS, pares=PARES, repeticiones=REPETICIONES):
+    """
+    Runs the micro-benchmarks of the given functions over every size.
+
+    Parameters
+    ----------
+    nombres: list
+             Names of the functions (see KERNELS).
+    filas: list
+           Numbers of rows of the functions measured over rows.
+    pares: list
+           Numbers of pairs of the functions measured over pairs. The functions measured over rows use the first one.
+    repeticiones: int
+                  Number of repetitions of each measurement.
+
+    Returns
+    -------
+    resultados: dict
+                Environment of the benchmark and measurement of each function and size.
+
+    Example
+    -------
+    >>> ejecutar_kernels(['process_chunk'], filas=[10 ** 5])
+    """
+
+    resultados = {'inicio': datetime.now().isoformat(timespec='seconds'),
+                  'entorno': {'python': platform.python_version(),
+                              'plataforma': platform.platform(),
+                              'numpy': np.__version__,
+                              'pandas': cd.pd.__version__},
+                  'kernels': {}}
+
+    directorio = tempfile.mkdtemp(prefix='benchmark_kernels_')
+    try:
+        entornos = {}
+        for nombre in nombres:
+            tipo, funcion, preparar = KERNELS[nombre]
+            resultados['kernels'][nombre] = {}
+            for n in (filas if tipo == 'filas' else pares):
+                n_pares = pares[0] if tipo == 'filas' else n
+                if n_pares not in entornos:
+                    entornos[n_pares] = preparar_entorno(n_pares, os.path.join(directorio, str(n_pares)))
+                medida = medir_kernel(funcion, preparar(entornos[n_pares], n), repeticiones)
+                medida['tipo'] = tipo
+                resultados['kernels'][nombre][str(n)] = medida
+                print('%s (%s = %d): %.4fs' % (nombre, tipo, n, medida['mejor']))
+    finally:
+        shutil.rmtree(directorio, ignore_errors=True)
+
+
+    return resultados
+
+
+
+###############################################################################
+def comparar_con_linea_base(resultados, path_linea_base=FICHERO_LINEA_BASE, tolerancia=TOLERANCIA,
+                            tiempo_minimo=TIEMPO_MINIMO):
+    """
+    Compares the best time of each function and size with the baseline. Functions or sizes not in the baseline are not checked.
+    A time is a regression if it exceeds the baseline both by more than the tolerance and by more than tiempo_minimo seconds.
+
+    Parameters
+    ----------
+    resultados: dict
+                Results of the micro-benchmarks (see ejecutar_kernels).
+    path_linea_base: str
+                     Path of the baseline (results saved with guardar_linea_base).
+    tolerancia: float
+                Allowed relative increase of the time over the baseline.
+    tiempo_minimo: float
+                   Allowed absolute increase of the time over the baseline, in seconds.
+
+    Returns
+    -------
+    regresiones: list or None
+                 Function, size, time and baseline time of each regression. None if the baseline does not exist.
+
+    Example
+    -------
+    >>> comparar_con_linea_base(resultados)
+    WARNING: Regression in process_chunk (filas = 1000000): 0.9120s, baseline 0.4100s (+122%)
+    [('process_chunk', '1000000', 0.912, 0.41)]
+    """
+
+    if not os.path.exists(path_linea_base):
+        print(ERROR_MSG_303 % path_linea_base)
+        return None
+
+    with open(path_linea_base, 'r', encoding=cd.ENCODING) as fichero:
+        linea_base = json.load(fichero)['kernels']
+
+    regresiones = []
+    for nombre, medidas in resultados['kernels'].items():
+        for n, medida in medidas.items():
+            if n not in linea_base.get(nombre, {}):
+                continue
+            referencia = linea_base[nombre][n]['mejor']
+            if medida['mejor'] > referencia * (1 + tolerancia) and medida['mejor'] - referencia > tiempo_minimo:
+                print(WARNING_MSG_302 % (nombre, medida['tipo'], int(n), medida['mejor'], referencia,
+                                         100 * (medida['mejor'] / referencia - 1)))
+                regresiones.append((nombre, n, medida['mejor'], referencia))
+
+
+    return regresiones
+
+
+
+###############################################################################
+def guardar_linea_base(resultados, path_linea_base=FICHERO_LINEA_BASE):
+    """
+    Saves the results of the micro-benchmarks as the baseline.
+
+    Parameters
+    ----------
+    resultados: dict
+                Results of the micro-benchmarks (see ejecutar_kernels).
+    path_linea_base: str
+                     Path of the baseline.
+
+    Returns
+    -------
+    None
+    """
+
+    with open(path_linea_base, 'w', encoding=cd.ENCODING) as fichero:
+        json.dump(resultados, fichero, indent=2)
+
+
+
+###############################################################################
+def main(argv=None):
+    """
+    Command line entry point of the micro-benchmarks. It exits with status 1 if there is any regression or
+    the baseline does not exist.
+    """
+
+    parser = argparse.ArgumentParser(description='Micro-benchmarks of the evaluation functions.')
+    parser.add_argument('--kernels', nargs='+', choices=list(KERNELS), default=list(KERNELS))
+    parser.add_argument('--filas', nargs='+', type=int, default=FILAS)
+    parser.add_argument('--pares', nargs='+', type=int, default=PARES)
+    parser.add_argument('--repeticiones', type=int, default=REPETICIONES)
+    parser.add_argument('--linea-base', dest='linea_base', default=FICHERO_LINEA_BASE, help='path of the baseline')
+    parser.add_argument('--tolerancia', type=float, default=TOLERANCIA,
+                        help='allowed relative increase over the baseline (default: %(default)s)')
+    parser.add_argument('--tiempo-minimo', dest='tiempo_minimo', type=float, default=TIEMPO_MINIMO,
+                        help='allowed absolute increase over the baseline, in seconds (default: %(default)s)')
+    parser.add_argument('--guardar-linea-base', dest='guardar', action='store_true',
+                        help='save the results as the new baseline instead of checking them')
+    argumentos = parser.parse_args(argv)
+
+    resultados = ejecutar_kernels(argumentos.kernels, argumentos.filas, argumentos.pares, argumentos.repeticiones)
+    if argumentos.guardar:
+        guardar_linea_base(resultados, argumentos.linea_base)
+        print(argumentos.linea_base)
+    else:
+        regresiones = comparar_con_linea_base(resultados, argumentos.linea_base, argumentos.tolerancia,
+                                              argumentos.tiempo_minimo)
+        if regresiones is None or regresiones:
+            sys.exit(1)
+
+
+###############################################################################
+if __name__ == "__main__":
+    main()
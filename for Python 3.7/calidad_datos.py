@@ -5,14 +5,113 @@ Created on Mon May 27 09:46:38 2019
 @author: Enrique
 """
 
+import sys
+import argparse
 from time import time
 import lib_calidad_datos as cd
 
 
-def main():
+# Informes que puede emitir una ejecución
+FORMATOS = ['fuentes', 'tipologias', 'ranking', 'plots']
+
+# Configuración por defecto de una ejecución (ver run). Separador y periodo
+#   no tienen valor por defecto: son obligatorios, para que la ejecución no
+#   se quede esperando a que se escriban por teclado
+CONFIGURACION_POR_DEFECTO = {'separador': None,
+                             'periodo': None,
+                             'input_dir': None,
+                             'output_dir': None,
+                             'config_dir': None,
+                             'temp_dir': None,
+                             'procesos': cd.N_PROCESOS,
+                             'procesos_informes': cd.N_PROCESOS_INFORMES,
+                             'chunksize': None,
+                             'incremental': cd.INCREMENTAL,
+                             'mapas_presencia': cd.MAPAS_PRESENCIA,
+                             'formatos': FORMATOS,
+                             'solo_cambios': cd.PLOTS_SOLO_CAMBIOS,
+                             'registro': True}
+
+
+
+###############################################################################
+def leer_argumentos(argv=None):
     """
+    Parses the command line arguments of a run.
+
+    Parameters
+    ----------
+    argv: list
+          Command line arguments (sys.argv[1:] if None).
+
+    Returns
+    -------
+    config: dict
+            Run configuration (see run).
+
+    Example
+    -------
+    >>> leer_argumentos(['-s', ';', '-p', '30', '--formatos', 'ranking'])
+    {'separador': ';', 'periodo': 30.0, ..., 'formatos': ['ranking']}
     """
 
+    parser = argparse.ArgumentParser(description='Evaluates the quality of the data sources of a data sample.')
+    parser.add_argument('-s', '--separador', required=True, help='value separator character of the csv files')
+    parser.add_argument('-p', '--periodo', type=float, required=True, help='period (in days) to which the sample refers')
+    parser.add_argument('--input-dir', dest='input_dir', help='directory of the data sample files')
+    parser.add_argument('--output-dir', dest='output_dir', help='directory of the pdf reports')
+    parser.add_argument('--config-dir', dest='config_dir', help='directory of the .ini configuration files')
+    parser.add_argument('--temp-dir', dest='temp_dir', help='directory of the comparison plots')
+    parser.add_argument('--procesos', type=int, default=cd.N_PROCESOS,
+                        help='number of processes evaluating the chunks (default: %(default)s)')
+    parser.add_argument('--procesos-informes', dest='procesos_informes', type=int, default=cd.N_PROCESOS_INFORMES,
+                        help='number of processes rendering reports and plots (default: %(default)s)')
+    parser.add_argument('--chunksize', type=int, help='maximum number of lines in each chunk (default: %d)' % cd.CHUNKSIZE)
+    parser.add_argument('--incremental', action='store_true', default=cd.INCREMENTAL,
+                        help='only read the input files that are new or changed since the last run')
+    parser.add_argument('--mapas-presencia', dest='mapas_presencia', action='store_true', default=cd.MAPAS_PRESENCIA,
+                        help='reduce the mandatory fields to presence bitmaps as soon as each chunk is read')
+    parser.add_argument('--formatos', nargs='+', choices=FORMATOS, default=FORMATOS,
+                        help='reports to emit (default: all)')
+    parser.add_argument('--solo-cambios', dest='solo_cambios', action='store_true', default=cd.PLOTS_SOLO_CAMBIOS,
+                        help='only redraw the plots whose data changed since the last run')
+    parser.add_argument('--sin-registro', dest='registro', action='store_false',
+                        help='do not save the JSON record of the run (times, memory and rows of each stage)')
+
+
+    return vars(parser.parse_args(argv))
+
+
+
+###############################################################################
+def run(config):
+    """
+    Runs the whole evaluation: dimensions, levels, quality, reports and plots.
+    It never reads from keyboard, so it can be called from another program: if separador or periodo are not given, the program returns an error and ends.
+
+    Parameters
+    ----------
+    config: dict or argparse.Namespace
+            Run configuration. Keys not given take their value from CONFIGURACION_POR_DEFECTO:
+            separador, periodo, input_dir, output_dir, config_dir, temp_dir, procesos, procesos_informes, chunksize, incremental, mapas_presencia, formatos, solo_cambios and registro.
+            If registro is True, the wall time, CPU time, peak memory and rows of each stage, and the throughput of each chunk, are saved in a JSON file next to the reports.
+
+    Returns
+    -------
+    valoracion: pandas dataframe
+                Evaluation structure for each Data source - Event typology.
+    valoracion_fuentes: pandas dataframe
+                        Data source evaluation structure.
+
+    Example
+    -------
+    >>> run({'separador': ';', 'periodo': 30, 'input_dir': '/datos/muestra', 'formatos': ['ranking']})
+    """
+
+    if isinstance(config, argparse.Namespace):
+        config = vars(config)
+    config = dict(CONFIGURACION_POR_DEFECTO, **config)
+
 ###############################################################################
 #                                                                             #
 # Lectura de las características de la muestra de datos. Carga de ficheros de #
@@ -20,17 +119,37 @@ def main():
 #                                                                             #
 ###############################################################################
 
-    # Lectura del separador de datos y periodo de la muestra de datos
-    separador, data_period = cd.leer_caracteristicas_muestra()
+    # Directorios de trabajo y tamaño de chunk de la ejecución
+    cd.configurar_ejecucion(config['input_dir'], config['output_dir'], config['config_dir'],
+                            config['temp_dir'], config['chunksize'])
+
+    # Separador de datos y periodo de la muestra de datos
+    separador, data_period = config['separador'], config['periodo']
+    campos_ausentes = [campo for campo in ['separador', 'periodo'] if config[campo] is None]
+    if campos_ausentes:
+        print(cd.ERROR_MSG_215 % ', '.join(campos_ausentes))
+        sys.exit(1)
+    formatos = config['formatos']
 
     inicio = time()
     print('Calculando...')
 
+    # Registro de tiempos, memoria y filas de cada etapa de la ejecución
+    registro = cd.iniciar_registro(config) if config['registro'] else None
+
     # Carga de los ficheros de parametrizacion de tipologias de eventos y de
     #   fuentes de datos (data_source.ini y event_typology.ini)
     data_source_parser = cd.cargar_configuracion_fuentes()
     event_typology_parser = cd.cargar_configuracion_tipologias()
 
+    # Tabla de atributos de las fuentes de datos, que se utiliza para
+    #   inicializar la valoración de cada chunk
+    data_source_config = cd.compilar_configuracion_fuentes(data_source_parser)
+
+    # Compilación de la configuración de tipologías, que se utiliza en todas
+    #   las etapas del cálculo
+    event_typology_config = cd.compilar_configuracion_tipologias(event_typology_parser)
+
     # Carga del listado de ficheros de input
     lista_ficheros_input = cd.cargar_ficheros_input()
 
@@ -43,16 +162,20 @@ def main():
 
     # Cálculo de las dimensiones de cantidad, completitud, fiabilidad y severidad.
     #   Se realizará fichero a fichero (por chunks) después será neceario agrupar los resultados.
-    valoracion = cd.valorar_dimensiones(lista_ficheros_input, separador, data_source_parser, event_typology_parser)
+    valoracion = cd.valorar_dimensiones(lista_ficheros_input, separador, data_source_config, event_typology_config,
+                                        n_procesos=config['procesos'], mapas_presencia=config['mapas_presencia'],
+                                        registro=registro, incremental=config['incremental'])
 
-    # Agrupación de todos las valoraciones de los diferentes chunks de datos
-    valoracion = cd.compute_valoracion(valoracion)
+    with cd.medir_etapa(registro, 'compute_valoracion') as etapa:
+        # Agrupación de todos las valoraciones de los diferentes chunks de datos
+        valoracion = cd.compute_valoracion(valoracion)
 
-    # Cálculo del nivel de información (en este punto solo tenemos el número total de campos)
-    valoracion = cd.valorar_nivel_informacion(valoracion)
+        # Cálculo del nivel de información (en este punto solo tenemos el número total de campos)
+        valoracion = cd.valorar_nivel_informacion(valoracion)
 
-    # Cálculo del precio por dato
-    valoracion = cd.valorar_precio_por_dato(valoracion, data_period)
+        # Cálculo del precio por dato
+        valoracion = cd.valorar_precio_por_dato(valoracion, float(data_period))
+        etapa['filas'] = len(valoracion)
 
 
 ###############################################################################
@@ -61,14 +184,10 @@ def main():
 #                                                                             #
 ###############################################################################
 
-    # Cáclulo de cantidad normalizada
-    valoracion = cd.calcular_cantidad_normalizada(valoracion)
-
-    # Cálculo de dimensiones de calidad normalizadas
-    valoracion = cd.calcular_valores_normalizados(valoracion)
-
-    # Cálculo del precio por dato normalizado
-    valoracion = cd.calcular_precio_normalizado(valoracion, event_typology_parser)
+    # Cálculo de cantidad, dimensiones de calidad y precio por dato normalizados
+    with cd.medir_etapa(registro, 'normalization') as etapa:
+        valoracion = cd.normalizar_valoracion(valoracion, event_typology_config)
+        etapa['filas'] = len(valoracion)
 
 
 ###############################################################################
@@ -79,13 +198,17 @@ def main():
 ###############################################################################
 
     # Cálculo de niveles
-    valoracion = cd.calcular_niveles(valoracion, event_typology_parser)
+    with cd.medir_etapa(registro, 'calcular_niveles') as etapa:
+        valoracion = cd.calcular_niveles(valoracion, event_typology_config)
+        etapa['filas'] = len(valoracion)
 
-    # Valoracion de calidad las fuentes, por tipologia:
-    valoracion = cd.valorar_calidad_tipologia(valoracion)
+    with cd.medir_etapa(registro, 'scoring') as etapa:
+        # Valoracion de calidad las fuentes, por tipologia:
+        valoracion = cd.valorar_calidad_tipologia(valoracion)
 
-    # Valoración de la exclusibidad de las fuentes, por tipologías:
-    valoracion = cd.valorar_exclusividad(valoracion)
+        # Valoración de la exclusibidad de las fuentes, por tipologías:
+        valoracion = cd.valorar_exclusividad(valoracion)
+        etapa['filas'] = len(valoracion)
 
 
 ###############################################################################
@@ -94,7 +217,9 @@ def main():
 #                                                                             #
 ###############################################################################
 
-    valoracion_fuentes = cd.valorar_calidad_global(valoracion)
+    with cd.medir_etapa(registro, 'valorar_calidad_global') as etapa:
+        valoracion_fuentes = cd.valorar_calidad_global(valoracion)
+        etapa['filas'] = len(valoracion_fuentes)
 
 ###############################################################################
 #                                                                             #
@@ -102,17 +227,55 @@ def main():
 #                                                                             #
 ###############################################################################
 
-    cd.generar_informe_fuentes(valoracion, valoracion_fuentes)
-    cd.generar_informe_tipologias(valoracion)
-    cd.generar_informe_ranking(valoracion_fuentes)
-    cd.generar_plots(valoracion, 'Tipologia')
-    cd.generar_plots(valoracion, 'Data source')
+    # Los informes que no se puedan generar no detienen la ejecución: se
+    #   muestra un resumen de los fallos al terminar
+    fallos_informes = []
+    n_informes = 0
+    if 'fuentes' in formatos:
+        with cd.medir_etapa(registro, 'report_fuentes') as etapa:
+            fallos_informes += cd.generar_informe_fuentes(valoracion, valoracion_fuentes, config['procesos_informes'])
+            etapa['filas'] = len(valoracion_fuentes)
+        n_informes += len(valoracion_fuentes)
+    if 'tipologias' in formatos:
+        with cd.medir_etapa(registro, 'report_tipologias') as etapa:
+            fallos_informes += cd.generar_informe_tipologias(valoracion, config['procesos_informes'])
+            etapa['filas'] = len(set(valoracion['Tipologia']))
+        n_informes += len(set(valoracion['Tipologia']))
+    if 'ranking' in formatos:
+        with cd.medir_etapa(registro, 'report_ranking') as etapa:
+            fallos_informes += cd.generar_informe_ranking(valoracion_fuentes)
+            etapa['filas'] = 1
+        n_informes += 1
+    cd.avisar_informes_fallidos(fallos_informes, n_informes)
+    if 'plots' in formatos:
+        with cd.medir_etapa(registro, 'plots') as etapa:
+            etapa['filas'] = cd.generar_plots(valoracion, 'Tipologia', config['procesos_informes'],
+                                              solo_cambios=config['solo_cambios'])
+            etapa['filas'] += cd.generar_plots(valoracion, 'Data source', config['procesos_informes'],
+                                               solo_cambios=config['solo_cambios'])
 
 
     fin = time()
     tiempo = fin - inicio
     print('Tiempo de ejecución: ', tiempo)
 
+    if registro is not None:
+        registro['tiempo_total'] = tiempo
+        cd.guardar_registro(registro)
+
+
+    return valoracion, valoracion_fuentes
+
+
+
+###############################################################################
+def main(argv=None):
+    """
+    Command line entry point (see leer_argumentos and run).
+    """
+
+    run(leer_argumentos(argv))
+
 
 ###############################################################################
 if __name__ == "__main__":
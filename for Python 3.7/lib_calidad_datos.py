@@ -9,17 +9,47 @@ from __future__ import division
 import sys
 import base64
 import os
-import gc
-import codecs
 import configparser as conp
 import glob
 import unicodedata
 import copy
+import io
+import mmap
+import gzip
+import bz2
+import lzma
+import queue
+import threading
+import json
+import hashlib
+import time
+from datetime import datetime
+from collections import namedtuple
+from contextlib import contextmanager
+from functools import lru_cache
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
 import numpy as np
-import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
 import pandas as pd
 import xhtml2pdf.pisa as pisa
 from jinja2 import Environment, FileSystemLoader
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pa_compute
+    import pyarrow.csv as pa_csv
+    import pyarrow.ipc as pa_ipc
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+try:
+    import zstandard as zstd
+except ImportError:
+    zstd = None
+try:
+    import resource
+except ImportError:
+    resource = None
 
 
 # Definición ruta y ficheros de trabajo:
@@ -33,15 +63,89 @@ EVENT_TYPOLOGY_CONFIG_FILE = 'event_typology.ini'
 ENCODING = 'utf-8'
 
 
+# Extensiones de los ficheros de input admitidos. Los ficheros Parquet y
+#   Arrow IPC se leen por columnas (requieren pyarrow)
+CSV_EXTENSIONS = ['.csv']
+PARQUET_EXTENSIONS = ['.parquet']
+ARROW_EXTENSIONS = ['.arrow', '.feather']
+
+# Extensiones de los ficheros .csv comprimidos (por ejemplo, .csv.gz). Se
+#   descomprimen al vuelo en un hilo aparte, en bloques de
+#   BYTES_BLOQUE_DESCOMPRESION bytes, con un máximo de
+#   BLOQUES_EN_COLA_DESCOMPRESION bloques pendientes de leer por el parser.
+#   Los ficheros .zst requieren zstandard
+COMPRESSED_EXTENSIONS = ['.gz', '.bz2', '.xz', '.zst']
+BYTES_BLOQUE_DESCOMPRESION = 2 ** 22
+BLOQUES_EN_COLA_DESCOMPRESION = 4
+
+# Si pyarrow está instalado, los ficheros .csv se leen con su parser en
+#   bloques de BYTES_BLOQUE_CSV bytes, y los campos obligatorios de cada
+#   bloque se reducen a su presencia antes de leer el siguiente, así que sus
+#   valores nunca llegan a ser objetos de Python. Se leen como nulos los
+#   mismos valores que en pd.read_csv
+BYTES_BLOQUE_CSV = 2 ** 18
+VALORES_NULOS_CSV = ['', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan', '1.#IND', '1.#QNAN',
+                     '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'n/a', 'nan', 'null']
+
+
 # Número máximo de líneas a tratar en cada iteración:
 CHUNKSIZE = 800000
 
 
+# Número de procesos para la evaluación de los chunks (1 = ejecución secuencial)
+N_PROCESOS = 1
+
+# Número máximo de chunks en evaluación simultánea por cada proceso, para
+#   acotar la memoria utilizada en la ejecución en paralelo
+MAX_CHUNKS_POR_PROCESO = 2
+
+# Número de procesos para la generación de los informes pdf y de los plots.
+#   Cada informe se genera de forma independiente, por lo que se usan todos
+#   los procesadores
+N_PROCESOS_INFORMES = os.cpu_count() or 1
+
+
+# Si es True, solo se vuelven a dibujar los plots cuyos datos han cambiado
+#   desde la anterior ejecución
+PLOTS_SOLO_CAMBIOS = False
+FICHERO_HUELLAS_PLOTS = 'huellas.json'
+
+
+# Evaluación incremental: los contadores de cada fichero se guardan en el
+#   almacén de estado (en el directorio temporal) y se reutilizan mientras el
+#   fichero no cambie (tamaño, fecha de modificación y hash del contenido)
+INCREMENTAL = False
+FICHERO_ESTADO = 'estado_valoracion.json'
+VERSION_ESTADO = 1
+BYTES_BLOQUE_HASH = 2 ** 20
+
+
+# Registro de la ejecución (tiempos, memoria y filas de cada etapa), que se
+#   guarda en el directorio de informes con la fecha y hora de la ejecución
+FICHERO_REGISTRO_EJECUCION = 'registro_ejecucion_%s.json'
+
+
 # Campos base de datos:
 FIELD_TYPOLOGY = 'name'
 FIELD_DATA_SOURCE = 'devicevendor'
 FIELD_FIABILITY = 'flexnumber1'
 FIELD_SEVERITY = 'deviceseverity'
+BASE_FIELDS = [FIELD_TYPOLOGY, FIELD_DATA_SOURCE, FIELD_FIABILITY, FIELD_SEVERITY]
+
+
+# Plan de tipos de la muestra de datos: tipología y fuente categóricas,
+#   fiabilidad y severidad recodificadas (valores 1/3/6/9) como enteros
+#   pequeños y campos obligatorios reducidos a su presencia (booleano nulable)
+CATEGORICAL_FIELDS = [FIELD_TYPOLOGY, FIELD_DATA_SOURCE]
+RECODIFIED_DTYPE = np.int8
+
+
+# Modo de ingesta de solo completitud: los campos obligatorios se reducen a
+#   mapas de bits de presencia (1 bit por fila) al leer cada chunk
+MAPAS_PRESENCIA = False
+
+# Número de bits a 1 de cada valor de byte, para contar bits en los mapas
+BITS_POR_BYTE = np.array([bin(byte).count('1') for byte in range(256)], dtype=np.uint8)
 
 
 # Campos para el procesado de la muestra de datos
@@ -57,6 +161,56 @@ ADDITION_FIELDS = ['Cantidad',
                    'Relevancia desconocida']
 CONCATENATION_FIELDS = SORT_FIELDS + ADDITION_FIELDS
 
+# Campos de cada par que se guardan en el almacén de estado de la evaluación
+#   incremental
+CAMPOS_ESTADO = SORT_FIELDS + ADDITION_FIELDS + ['Numero campos obligatorios']
+
+
+# Campos de la estructura de valoracion de cada par Tipologia - Data source
+VALUATION_FIELDS = ['Tipologia',
+                    'Data source',
+                    'Data source type',
+                    'Valoracion datos obsoletos',
+                    'Tasa falsos positivos',
+                    'Tasa datos duplicados',
+                    'Cantidad',
+                    'Cantidad normalizada',
+                    'Cantidad nivel',
+                    'Completitud',
+                    'Numero campos obligatorios',
+                    'Completitud normalizada',
+                    'Completitud nivel',
+                    'Nivel de informacion',
+                    'Nivel de informacion normalizada',
+                    'Nivel de informacion nivel',
+                    'Veracidad',
+                    'Veracidad normalizada',
+                    'Veracidad nivel',
+                    'Veracidad desconocida',
+                    'Veracidad desconocida normalizada',
+                    'Veracidad desconocida nivel',
+                    'Frecuencia',
+                    'Frecuencia normalizada',
+                    'Frecuencia nivel',
+                    'Consistencia',
+                    'Consistencia normalizada',
+                    'Consistencia nivel',
+                    'Relevancia alta',
+                    'Relevancia alta normalizada',
+                    'Relevancia media',
+                    'Relevancia media normalizada',
+                    'Relevancia baja',
+                    'Relevancia baja normalizada',
+                    'Relevancia desconocida',
+                    'Relevancia desconocida normalizada',
+                    'Precio',
+                    'Precio por dato',
+                    'Precio por dato normalizada',
+                    'Precio por dato nivel',
+                    'Valoracion manual',
+                    'Calidad',
+                    'Exclusividad']
+
 
 # Definición numérica de las valoraciones de las dimiensiones de calidad:
 GOOD_LEVEL = 2
@@ -71,11 +225,40 @@ EQUIVALENCIA_CONSISTENCIA_NUMERICA = {'Baja': 0,
                                       'Muy Alta': 3}
 
 
+# Definición de las dimensiones con nivel de calidad: dimensión, prefijo de
+#   sus umbrales en event_typology.ini y si un valor mayor es mejor
+DIMENSIONES_NIVELES = [('Cantidad', 'cantidad', True),
+                       ('Completitud', 'completitud', True),
+                       ('Nivel de informacion', 'nivel_de_informacion', True),
+                       ('Veracidad', 'veracidad', True),
+                       ('Veracidad desconocida', 'veracidad_desconocida', False),
+                       ('Frecuencia', 'frecuencia', False),
+                       ('Consistencia', 'consistencia', True),
+                       ('Precio por dato', 'precio_por_dato', False)]
+
+
+# Configuración de tipologías compilada una sola vez a partir de
+#   event_typology.ini (ver compilar_configuracion_tipologias): umbrales ya
+#   convertidos a números y campos obligatorios de cada tipología, con la
+#   herencia de la Default Section resuelta
+UmbralesTipologia = namedtuple('UmbralesTipologia',
+                               [parametro + sufijo for dimension, parametro, mayor_es_mejor in DIMENSIONES_NIVELES
+                                for sufijo in ['_minimo', '_deseado']])
+ConfiguracionTipologia = namedtuple('ConfiguracionTipologia',
+                                    ['campos_obligatorios', 'veracidad_referencia', 'precio_por_dato_referencia', 'umbrales'])
+ConfiguracionTipologias = namedtuple('ConfiguracionTipologias', ['por_defecto', 'tipologias'])
+
+
 # Definición de los pesos de los distintos niveles de valoración:
 W1 = 1
 W2 = 0.5
 W3 = -1
 
+# Peso de cada nivel de valoración (valor por defecto de valorar_calidad_tipologia):
+PESOS_NIVELES = {GOOD_LEVEL: W1,
+                 ACCEPTABLE_LEVEL: W2,
+                 BAD_LEVEL: W3}
+
 
 # Definición del cojunto de dimensiones que puntuan para la calidad:
 DIMENSIONES = ['Cantidad nivel',
@@ -97,6 +280,12 @@ DATA_SOURCE = 'Data source'
 FUENTE = 'Fuente de datos'
 
 
+# Clase de estilo de los informes para cada nivel de valoración:
+CLASES_NIVELES = {BAD_LEVEL: 'bad',
+                  ACCEPTABLE_LEVEL: 'acceptable',
+                  GOOD_LEVEL: 'good'}
+
+
 # Definición del conjunto de dimensiones que se mostrarán gráficamente:
 COMPARISON_PLOTS_DIMENSIONS = ['Cantidad',
                                'Completitud',
@@ -114,6 +303,9 @@ INPUT_MSG_002 = 'Indicate the period (in days) to which the sample refers: '
 
 # Mensajes de aviso:
 WARNING_MSG_101 = 'WARNING: Data source %s configuration could not be loaded. Please, check file %s'
+WARNING_MSG_102 = 'WARNING: Report %s could not be generated: %s'
+WARNING_MSG_103 = 'WARNING: %d of %d reports could not be generated'
+WARNING_MSG_104 = 'WARNING: State store %s could not be read, all the input files will be evaluated'
 
 
 # Mensajes de error:
@@ -125,6 +317,13 @@ ERROR_MSG_205 = 'ERROR: Configuration file error: settings are not valid for dat
 ERROR_MSG_206 = 'ERROR: Data sample file can not be opened'
 ERROR_MSG_207 = 'ERROR: Configuration file error: attribute campos_obligatorios does not exist'
 ERROR_MSG_208 = 'ERROR: Configuration file error: atribute %s does not exist'
+ERROR_MSG_209 = 'ERROR: Parquet and Arrow data sample files require pyarrow'
+ERROR_MSG_210 = 'ERROR: Data sample file %s does not contain the features: %s'
+ERROR_MSG_211 = 'ERROR: Data sample does not contain the mandatory features: %s'
+ERROR_MSG_212 = 'ERROR: Data sample file %s requires zstandard'
+ERROR_MSG_213 = 'ERROR: Data sample file %s can not be decompressed: %s'
+ERROR_MSG_214 = 'ERROR: pdf conversion failed with %d errors: %s'
+ERROR_MSG_215 = 'ERROR: Run configuration error: %s not given'
 
 
 
@@ -170,6 +369,53 @@ def leer_caracteristicas_muestra():
 
 
 
+###############################################################################
+def configurar_ejecucion(input_dir=None, output_dir=None, config_dir=None, temp_dir=None, chunksize=None):
+    """
+    Overrides the working directories and the chunk size of the run (module defaults are kept for the arguments that are None).
+    Relative directories are taken from the current working directory. Output and temp directories are created if they do not exist.
+
+    Parameters
+    ----------
+    input_dir: string
+               Directory of the data sample files.
+    output_dir: string
+                Directory of the pdf reports.
+    config_dir: string
+                Directory of the .ini configuration files.
+    temp_dir: string
+              Directory of the comparison plots.
+    chunksize: int
+               Maximum number of lines processed in each chunk.
+
+    Returns
+    -------
+    None
+
+    Example
+    -------
+    >>> configurar_ejecucion(input_dir='/datos/muestra', output_dir='/datos/informes', chunksize=200000)
+    """
+
+    global INPUT_DIR, OUTPUT_DIR, CONFIG_DIR, TEMP_DIR, CHUNKSIZE
+
+    # Las rutas se guardan absolutas y con separador final, ya que se unen a
+    #   BASE_PATH y se concatenan con los nombres de fichero
+    if input_dir is not None:
+        INPUT_DIR = os.path.join(os.path.abspath(input_dir), '')
+    if output_dir is not None:
+        OUTPUT_DIR = os.path.join(os.path.abspath(output_dir), '')
+        makedir(OUTPUT_DIR)
+    if config_dir is not None:
+        CONFIG_DIR = os.path.join(os.path.abspath(config_dir), '')
+    if temp_dir is not None:
+        TEMP_DIR = os.path.abspath(temp_dir)
+        makedir(TEMP_DIR)
+    if chunksize is not None:
+        CHUNKSIZE = int(chunksize)
+
+
+
 ###############################################################################
 
 def cargar_configuracion_fuentes():
@@ -238,388 +484,1215 @@ def cargar_configuracion_tipologias():
 
 
 ###############################################################################
-def cargar_ficheros_input():
+def convertir_umbral(parametro, valor):
     """
-    Obtains the list of data sample files.
+    Converts a threshold of a quality dimension, as written in the configuration file, into a number: hh:mm:ss frequencies into seconds and consistency levels into their numeric equivalence.
 
     Parameters
     ----------
-    None
+    parametro: string
+               Prefix of the dimension thresholds in the configuration file (see DIMENSIONES_NIVELES).
+    valor: string
+           Threshold value in the configuration file.
 
     Returns
     -------
-    lista_fic_input: list
-                     List of data sample files .csv, contained in the input directory.
+    umbral: float
+            Numeric threshold (nan for an unknown consistency level).
 
-    >>> cargar_ficheros_input()
-    [It returns a list with .csv data sample files.]
+    Example
+    -------
+    >>> convertir_umbral('frecuencia', '00:05:00')
+    300.0
     """
 
-    path_to_input_files = os.path.join(BASE_PATH, INPUT_DIR)
-    #fic_input = listdir(path_to_input_files)
-    lista_fic_input = glob.glob(path_to_input_files + '*.csv')
-#    if len(lista_fic_input) == 0:
-    if  not lista_fic_input:
-        print(ERROR_MSG_203)
-        sys.exit()
+    if parametro == 'frecuencia':
+        umbral = obtener_segundos(valor)
+    elif parametro == 'consistencia':
+        umbral = EQUIVALENCIA_CONSISTENCIA_NUMERICA.get(valor, np.nan)
+    else:
+        umbral = valor
 
 
-    return lista_fic_input
+    return float(umbral)
 
 
 
 ###############################################################################
-def cargar_fichero_muestra_by_chunks(fic, separ):
+def compilar_configuracion_tipologia(tip, e_t_p):
     """
-    Loads a chunk of the .csv data file into a dataframe.
+    Reads every parameter of an event typology from the configuration file, taking it from the Default Section if the typology does not define it, and converts it to its final type.
 
     Parameters
     ----------
-    fic: string
-         File name.
-    separ: char
-           Character to separate values in the .csv data file.
-    chunksize: int
-               Size of the read chunks (number of rows).
+    tip: string
+         Event typology (section of the configuration file).
+    e_t_p: ConfigParser
+           Event typologies configuration structure.
 
     Returns
     -------
-    dat: pandas dataframe
-         Data sample.
+    configuracion: ConfiguracionTipologia
+                   Mandatory fields (tuple), veracity reference (int), reference price per data (float) and numeric thresholds (UmbralesTipologia) of the typology.
+
+    Example
+    -------
+    >>> compilar_configuracion_tipologia('IP Bot', event_typology_parser)
+    ConfiguracionTipologia(campos_obligatorios=('Aggregated Event Count', ...), veracidad_referencia=7, precio_por_dato_referencia=0.01, umbrales=UmbralesTipologia(...))
     """
 
-    dat = pd.DataFrame()
-    path_to_sample_file = os.path.join(BASE_PATH, INPUT_DIR, fic)
-    try:
-        dat = pd.read_csv(path_to_sample_file, sep=separ, chunksize=CHUNKSIZE)
-    except Exception:
-        print(ERROR_MSG_206)
-        sys.exit()
+    umbrales = UmbralesTipologia(*[convertir_umbral(umbral.rsplit('_', 1)[0], obtener_parametro(umbral, tip, e_t_p))
+                                   for umbral in UmbralesTipologia._fields])
 
+    configuracion = ConfiguracionTipologia(tuple(obtener_campos_obligatorios(tip, e_t_p)),
+                                           int(obtener_parametro('veracidad_referencia', tip, e_t_p)),
+                                           float(obtener_parametro('precio_por_dato_referencia', tip, e_t_p)),
+                                           umbrales)
 
-    return dat
+
+    return configuracion
 
 
 
 ###############################################################################
-def inicializar_estructura_valoracion(t_f, d_s_p):
+def compilar_configuracion_tipologias(e_t_p):
     """
-    Initializes the evaluation structure with all "datasource-event typology" combina   tions.
-    In each item, sets datasource properties using .ini configuration file.
-    If datasource is not defined in the .ini configuration file, it is not included in the return dataframe.
-    If return dataframe is empty (there is no any datatasource defined in the .ini configuration file), the program returns an error and ends.
+    Builds, once per run, the compiled event typologies configuration used by every stage of the evaluation, so the configuration file is not parsed again for each pair, chunk or row.
+    Typologies without a section in the configuration file use the Default Section values (see obtener_configuracion_tipologia).
 
     Parameters
     ----------
-    t_f: pandas dataframe
-         Set of Event typology - Data source.
-    d_s_p: ConfigParser
-           Datasource configuration structure
+    e_t_p: ConfigParser
+           Event typologies configuration structure.
 
     Returns
     -------
-    val: pandas dataframe
-         Evaluation structure for each Data source - Event typology.
+    e_t_c: ConfiguracionTipologias
+           Compiled configuration of the Default Section and of each typology section.
 
     Example
     -------
-    >>> inicializar_estructura_valoracion(tipologia_fuente, data_source_parser)
-    [It generates a dataframe with combinations of datasources and event typologies.
-    In each of them, it initializes the values obtained from .ini configuration files.
-    If there is no configuration in the .ini file, then the item is not included in the return dataframe.]
+    >>> compilar_configuracion_tipologias(event_typology_parser)
+    [It returns the compiled configuration of all the typologies in event_typology.ini.]
     """
 
-    val = pd.DataFrame(columns=('Tipologia',
-                                'Data source',
-                                'Data source type',
-                                'Valoracion datos obsoletos',
-                                'Tasa falsos positivos',
-                                'Tasa datos duplicados',
-                                'Cantidad',
-                                'Cantidad normalizada',
-                                'Cantidad nivel',
-                                'Completitud',
-                                'Numero campos obligatorios',
-                                'Completitud normalizada',
-                                'Completitud nivel',
-                                'Nivel de informacion',
-                                'Nivel de informacion normalizada',
-                                'Nivel de informacion nivel',
-                                'Veracidad',
-                                'Veracidad normalizada',
-                                'Veracidad nivel',
-                                'Veracidad desconocida',
-                                'Veracidad desconocida normalizada',
-                                'Veracidad desconocida nivel',
-                                'Frecuencia',
-                                'Frecuencia normalizada',
-                                'Frecuencia nivel',
-                                'Consistencia',
-                                'Consistencia normalizada',
-                                'Consistencia nivel',
-                                'Relevancia alta',
-                                'Relevancia alta normalizada',
-                                'Relevancia media',
-                                'Relevancia media normalizada',
-                                'Relevancia baja',
-                                'Relevancia baja normalizada',
-                                'Relevancia desconocida',
-                                'Relevancia desconocida normalizada',
-                                'Precio',
-                                'Precio por dato',
-                                'Precio por dato normalizada',
-                                'Precio por dato nivel',
-                                'Valoracion manual',
-                                'Calidad',
-                                'Exclusividad'))
-
-    for i in range(len(t_f)):
-        tipologia = t_f.iloc[i][FIELD_TYPOLOGY]
-        fuente = t_f.iloc[i][FIELD_DATA_SOURCE]
-
-        try:
-            val = val.append({'Tipologia': tipologia,
-                              'Data source': fuente,
-                              'Data source type': d_s_p.get(fuente, 'tipo',),
-                              'Valoracion datos obsoletos': d_s_p.get(fuente, 'valoracion_datos_obsoletos',),
-                              'Tasa falsos positivos': d_s_p.get(fuente, 'tasa_falsos_positivos',),
-                              'Tasa datos duplicados': d_s_p.get(fuente, 'tasa_datos_duplicados',),
-                              'Cantidad': 0,
-                              'Completitud': 0,
-                              'Nivel de informacion': 0,
-                              'Veracidad': 0,
-                              'Veracidad desconocida': 0,
-                              'Frecuencia': d_s_p.get(fuente, 'frecuencia'),
-                              'Frecuencia normalizada': d_s_p.get(fuente, 'frecuencia'),
-                              'Consistencia': d_s_p.get(fuente, 'consistencia'),
-                              'Consistencia normalizada': d_s_p.get(fuente, 'consistencia'),
-                              'Relevancia alta': 0,
-                              'Relevancia media': 0,
-                              'Relevancia baja': 0,
-                              'Relevancia desconocida': 0,
-                              'Precio': float(d_s_p.get(fuente, 'precio')),
-                              'Valoracion manual': d_s_p.get(fuente, 'valoracion_manual')
-                             }, ignore_index=True)
-        except Exception:
-            print(WARNING_MSG_101, fuente, DATA_SOURCE_CONFIG_FILE)
-
-    if val.empty:
-        print(ERROR_MSG_205)
-        sys.exit()
+    por_defecto = compilar_configuracion_tipologia('Default Section', e_t_p)
+    tipologias = {tip: compilar_configuracion_tipologia(tip, e_t_p) for tip in e_t_p.sections() if tip != 'Default Section'}
 
 
-    return val
+    return ConfiguracionTipologias(por_defecto, tipologias)
 
 
 
 ###############################################################################
-def eliminar_columnas_innecesarias(dat, e_t_p, l_t):
+def obtener_configuracion_tipologia(tip, e_t_c):
     """
-    Starting from the list of typologies defined in the configuration file and included in the data file, this function deletes from the data sample all those features that are not necessary for the evaluation of the quality of the data.
+    Gets the compiled configuration of an event typology, or the Default Section one if the typology is not in the configuration file.
 
     Parameters
     ----------
-    dat: pandas dataframe
-         Data sample
-    e_t_p: ConfigParser
-           Event typology configuration structure.
-    l_t: list
-         List of event tipologies.
+    tip: string
+         Event typology.
+    e_t_c: ConfiguracionTipologias
+           Compiled event typologies configuration.
 
     Returns
     -------
-    data_reducido: pandas dataframe
-                   Reduced data sample (without unnecessary features)
+    configuracion: ConfiguracionTipologia
+                   Compiled configuration of the typology.
 
     Example
     -------
-    >>> eliminar_columnas_innecesarias(data, event_typology_parser, lista_tipologias)
-    [It returns dataframe data without unnecessary features]
+    >>> obtener_configuracion_tipologia('IP Bot', event_typology_config).veracidad_referencia
+    7
     """
 
-    campos_necesarios = [FIELD_TYPOLOGY, FIELD_DATA_SOURCE, FIELD_FIABILITY, FIELD_SEVERITY]
-
-    tmp = e_t_p.get('Default Section', 'campos_obligatorios')
-    tmp = tmp.replace('\n', '')
-    campos_config = tmp.split(",")
 
-    campos_necesarios += campos_config
-
-    for tip in l_t:
-        try:
-            tmp = e_t_p.get(tip, 'campos_obligatorios')
-            tmp = tmp.replace('\n', '')
-            campos_config = tmp.split(",")
+    return e_t_c.tipologias.get(tip, e_t_c.por_defecto)
 
-            campos_necesarios += campos_config
-        except Exception:
-            pass
 
-    campos_necesarios = set(campos_necesarios)
 
-    data_reducido = dat.loc[:, campos_necesarios]
+###############################################################################
+def compilar_configuracion_fuentes(d_s_p):
+    """
+    Builds, once per run, the data sources attribute table used to initialize the evaluation structure of every chunk, so the configuration file is not parsed again for each pair.
+    Data sources whose configuration can not be loaded (missing attributes or a non numeric price) are left out of the table, as if they were not defined.
 
+    Parameters
+    ----------
+    d_s_p: ConfigParser
+           Datasources configuration structure
 
-    return data_reducido
+    Returns
+    -------
+    d_s_c: pandas dataframe
+           Attributes of each data source, indexed by data source.
 
+    Example
+    -------
+    >>> compilar_configuracion_fuentes(data_source_parser)
+    [It returns a dataframe with a row for each data source and the columns Data source type, Valoracion datos obsoletos, ..., Valoracion manual.]
+    """
 
+    atributos = [('Data source type', 'tipo'),
+                 ('Valoracion datos obsoletos', 'valoracion_datos_obsoletos'),
+                 ('Tasa falsos positivos', 'tasa_falsos_positivos'),
+                 ('Tasa datos duplicados', 'tasa_datos_duplicados'),
+                 ('Frecuencia', 'frecuencia'),
+                 ('Frecuencia normalizada', 'frecuencia'),
+                 ('Consistencia', 'consistencia'),
+                 ('Consistencia normalizada', 'consistencia'),
+                 ('Precio', 'precio'),
+                 ('Valoracion manual', 'valoracion_manual')]
+
+    filas = {}
+    for fuente in d_s_p.sections():
+        try:
+            fila = {campo: d_s_p.get(fuente, atributo) for campo, atributo in atributos}
+            fila['Precio'] = float(fila['Precio'])
+        except Exception:
+            continue
+        filas[fuente] = fila
 
-###############################################################################
-def replace_by_threshold(df, column, threshold, recodified):
-    '''
-    Replace the column by the values in recodified as specified by threshold
+    d_s_c = pd.DataFrame.from_dict(filas, orient='index', columns=[campo for campo, atributo in atributos])
+    d_s_c['Precio'] = d_s_c['Precio'].astype(float)
+    d_s_c.index.name = 'Data source'
 
-    Parameters
-    ----------
-    df: pandas.DataFrame
-        The data
-    column: object
-            The column whose values will be replaced
-    threshold: list
-               The threshold values. Its lenght must be equal to 2
-    recodified: XXX
-                The values to be substituted into the data column. Its lenght must be equal to 3.
-    '''
 
-    col_data = pd.to_numeric(df[column], errors='coerce')
-    nulled = pd.isnull(col_data)
-    lower = (col_data <= threshold[0]) & (col_data > 1)
-    middle = (col_data > threshold[0]) & (col_data < threshold[1])
-    higher = col_data >= threshold[1]
-    col_data[higher] = recodified[-1]
-    col_data[middle] = recodified[-2]
-    col_data[lower] = recodified[-3]
-    col_data[nulled] = 1
-    df[column] = col_data
+    return d_s_c
 
 
 
 ###############################################################################
-def redefinir_datos_fiabilidad_severidad(dat):
+def avisar_fuentes_desconocidas(fuentes_desconocidas):
     """
-    Modifies the data sample to standardize severity and fiability values.
+    Warns, once per run, about every data source found in the data sample that is not defined in the configuration file, and therefore not evaluated.
 
     Parameters
     ----------
-    dat: pandas dataframe
-         Data sample.
+    fuentes_desconocidas: set
+                          Data sources not defined in the configuration file.
 
     Returns
     -------
-    dat: pandas dataframe
-         Data sample with standardized reliability and severity values.
+    None
 
     Example
     -------
-    >>> redefinir_datos_fiabilidad_severidad(data)
-    Returns data sample with standardized severity and fiability values.
+    >>> avisar_fuentes_desconocidas({'Fuente9'})
+    WARNING: Data source Fuente9 configuration could not be loaded. Please, check file data_source.ini
     """
 
-    threshold_split = [4, 8]
-    valores_recodificados = [3, 6, 9]
+    for fuente in sorted(fuentes_desconocidas, key=str):
+        print(WARNING_MSG_101 % (fuente, DATA_SOURCE_CONFIG_FILE))
 
-    #target = FIELD_SEVERITY
-    #dat[target] = dat[target].apply(lambda x: pretratar_valor_target(x, threshold_split, valores_recodificados))
 
-    #target = FIELD_FIABILITY
-    #dat[target] = dat[target].apply(lambda x: pretratar_valor_target(x, threshold_split, valores_recodificados))
 
-    replace_by_threshold(dat, FIELD_SEVERITY, threshold_split, valores_recodificados)
-    replace_by_threshold(dat, FIELD_FIABILITY, threshold_split, valores_recodificados)
+###############################################################################
+def cargar_ficheros_input():
+    """
+    Obtains the list of data sample files.
+
+    Parameters
+    ----------
+    None
 
+    Returns
+    -------
+    lista_fic_input: list
+                     List of data sample files (.csv, compressed .csv, .parquet, .arrow or .feather), contained in the input directory.
 
-    return dat
+    >>> cargar_ficheros_input()
+    [It returns a list with .csv, .csv.gz, .csv.bz2, .csv.xz, .csv.zst, .parquet, .arrow and .feather data sample files.]
+    """
+
+    path_to_input_files = os.path.join(BASE_PATH, INPUT_DIR)
+    #fic_input = listdir(path_to_input_files)
+    lista_fic_input = []
+    extensiones_comprimidas = [csv + comp for csv in CSV_EXTENSIONS for comp in COMPRESSED_EXTENSIONS]
+    for extension in CSV_EXTENSIONS + extensiones_comprimidas + PARQUET_EXTENSIONS + ARROW_EXTENSIONS:
+        lista_fic_input += glob.glob(path_to_input_files + '*' + extension)
+#    if len(lista_fic_input) == 0:
+    if  not lista_fic_input:
+        print(ERROR_MSG_203)
+        sys.exit()
+
+
+    return lista_fic_input
 
 
 
 ###############################################################################
-def obtener_campos_obligatorios(tip, e_t_p):
+def es_fichero_comprimido(fic):
     """
-    Return the mandatory fields for the selected typology. This fields are collected from the configuration file.
-    First, the field names will be tried to recover from the typology section. If they are not defined, they are retrieved from default section.
-    This list will be used as a reference to consider whether a data is complete or not.
+    Checks whether a data sample file is a compressed .csv file (gzip, bz2, xz or zstd).
 
     Parameters
     ----------
-    tip: string
-         Event typology.
-    e_t_p: ConfigParser
-           Event typologies configuration structureqqqqq
+    fic: string
+         File name.
 
     Returns
     -------
-    cam_obl: string list
-             Mandatory fields for tip typology, sepparated by commas.
+    comprimido: bool
+                True for .gz, .bz2, .xz and .zst files.
 
     Example
     -------
-    >>> obtener_campos_obligatorios('IP Bot', event_typology_parser)
-    [Aggregated Event Count, Correlated Event Count, End Time, Event ID, External ID, Locality, Destination Address, Destination Geo Country Code, Target Address, Agent Asset ID]
+    >>> es_fichero_comprimido('muestra.csv.gz')
+    True
     """
 
-    cam_obl = []
-    try:
-        tmp = e_t_p.get(tip, 'campos_obligatorios')
-        tmp = tmp.replace('\n', '')
-        cam_obl = tmp.split(",")
-    except Exception:
-        try:
-            tmp = e_t_p.get('Default Section', 'campos_obligatorios')
-            tmp = tmp.replace('\n', '')
-            cam_obl = tmp.split(",")
-        except Exception:
-            print(ERROR_MSG_207)
-            sys.exit()
+    extension = os.path.splitext(fic)[1].lower()
 
 
-    return cam_obl
+    return extension in COMPRESSED_EXTENSIONS
 
 
 
 ###############################################################################
-def valorar_completitud(val, dat, i, tip, e_t_p):
+def abrir_fichero_comprimido(fic):
     """
-    Evaluates data completeness. This function checks how many data contain all mandatory fields, for a specific event typology.
+    Opens a compressed data sample file as a stream of decompressed bytes.
+    If the file is .zst and zstandard is not installed, the program returns an error and ends.
 
     Parameters
     ----------
-    val: pandas dataframe
-         Evaluation structure for each Data source - Event typology.
-    dat: pandas dataframe
-         Data sample for the current Data source and Event typology.
-    i: integer
-       Current index in dataframe val.
-    tip: string
-         Event typology.
-    e_t_p: ConfigParser
-           Event typology configuration structure.
+    fic: string
+         File name.
 
     Returns
     -------
-    val: pandas dataframe
-         Evaluation structure for each Data source - Event typology.
+    fuente: file object
+            Binary stream of the decompressed content.
 
     Example
     -------
-    >>> valorar_completitud(valoracion, data_aux, i,  tipologia, event_typology_parser, cantidad)
-    Returns evaluation dataframe updated (completeness dimension).
+    >>> with abrir_fichero_comprimido('muestra.csv.gz') as fuente:
+    ...     cabecera = fuente.readline()
     """
 
-#    # Cálculo de la completitud para la tipologia-fuente actual
-#    campos_obligatorios = obtener_campos_obligatorios(tip, e_t_p)
-#
-#    data_compl = dat.dropna(subset=campos_obligatorios)
-#
-#    completitud = len(data_compl)
-#    val.loc[i, 'Completitud'] += completitud
-#
-#    # Almacenamos el número de campos obligatorios para después normalizar
-#    val.loc[i, 'Numero campos obligatorios'] = len(campos_obligatorios)
-#
-#    # Cálculo del nivel de información la tipologia-fuente actual
-#    campos_totales = 0
-#
-#    for col in campos_obligatorios:
+    path_to_sample_file = os.path.join(BASE_PATH, INPUT_DIR, fic)
+    extension = os.path.splitext(fic)[1].lower()
+    if extension == '.zst':
+        if zstd is None:
+            print(ERROR_MSG_212 % fic)
+            sys.exit()
+        return zstd.ZstdDecompressor().stream_reader(open(path_to_sample_file, 'rb'), closefd=True)
+
+    descompresores = {'.gz': gzip.open, '.bz2': bz2.open, '.xz': lzma.open}
+
+
+    return descompresores[extension](path_to_sample_file, 'rb')
+
+
+
+###############################################################################
+class LectorDescompresion(io.RawIOBase):
+    """
+    Read-only file object over the decompressed content of a data sample file, to be parsed as a .csv file.
+    A separate thread decompresses the file in blocks of BYTES_BLOQUE_DESCOMPRESION bytes and queues them, so decompression overlaps with parsing and evaluation of the chunks (the decompressors release the GIL).
+    At most BLOQUES_EN_COLA_DESCOMPRESION blocks wait in the queue, so memory usage does not depend on file size.
+
+    Parameters
+    ----------
+    fic: string
+         File name.
+
+    Example
+    -------
+    >>> with LectorDescompresion('muestra.csv.gz') as lector:
+    ...     reader = pd.read_csv(lector, sep=';', chunksize=CHUNKSIZE)
+    """
+
+    def __init__(self, fic):
+        super().__init__()
+        self.cola = queue.Queue(maxsize=BLOQUES_EN_COLA_DESCOMPRESION)
+        self.detenido = threading.Event()
+        self.bloque = memoryview(b'')
+        self.terminado = False
+        self.error = None
+        # El fichero se abre en el hilo principal, así los errores de
+        #   apertura no se confunden con los de descompresión
+        fuente = abrir_fichero_comprimido(fic)
+        self.hilo = threading.Thread(target=self.descomprimir, args=(fuente,), daemon=True)
+        self.hilo.start()
+
+    def descomprimir(self, fuente):
+        # Un bloque vacío indica el final del fichero; un error se pasa al
+        #   lector para que lo lance al leer
+        try:
+            with fuente:
+                bloque = True
+                while bloque and not self.detenido.is_set():
+                    bloque = fuente.read(BYTES_BLOQUE_DESCOMPRESION)
+                    self.encolar(bloque)
+        except Exception as error:
+            self.encolar(error)
+
+    def encolar(self, elemento):
+        # Se espera a que haya sitio en la cola, salvo que el lector se cierre
+        while not self.detenido.is_set():
+            try:
+                self.cola.put(elemento, timeout=0.1)
+                return
+            except queue.Full:
+                pass
+
+    def readable(self):
+        return True
+
+    def read(self, n=-1):
+        if n is None or n < 0:
+            return self.readall()
+        if not self.bloque and not self.terminado:
+            elemento = self.cola.get()
+            if isinstance(elemento, Exception):
+                self.error = elemento
+                raise elemento
+            self.terminado = not elemento
+            self.bloque = memoryview(elemento)
+        datos = bytes(self.bloque[:n])
+        self.bloque = self.bloque[n:]
+        return datos
+
+    def readinto(self, destino):
+        datos = self.read(len(destino))
+        destino[:len(datos)] = datos
+        return len(datos)
+
+    def close(self):
+        self.detenido.set()
+        self.hilo.join()
+        super().close()
+
+
+
+###############################################################################
+def abrir_lector_csv(fuente, separ, campos, cabecera=None):
+    """
+    Opens a pyarrow streaming reader over a .csv data file, which parses it in blocks of BYTES_BLOQUE_CSV bytes.
+    Typology, data source, reliability and severity are parsed as dictionaries (categorical once converted to pandas), and the mandatory fields as strings, to be reduced to their presence block by block (see reducir_lote_csv).
+
+    Parameters
+    ----------
+    fuente: string or file object
+            Path of the file, or binary stream of its content.
+    separ: char
+           Character to separate values in the .csv data file.
+    campos: list
+            Names of the features to be read.
+    cabecera: list
+              Names of the features in the file, if the stream has no header line (a byte range of the file, see LectorRangoMapeado).
+
+    Returns
+    -------
+    lector: pyarrow.csv.CSVStreamingReader
+            Reader of the record batches of the file.
+
+    Example
+    -------
+    >>> abrir_lector_csv('input/muestra.csv', ';', columnas)
+    """
+
+    tipos = {campo: pa.dictionary(pa.int32(), pa.string()) if campo in BASE_FIELDS else pa.string() for campo in campos}
+
+    opciones_lectura = pa_csv.ReadOptions(block_size=BYTES_BLOQUE_CSV, column_names=cabecera)
+    opciones_formato = pa_csv.ParseOptions(delimiter=separ, newlines_in_values=True)
+    opciones_conversion = pa_csv.ConvertOptions(include_columns=campos, column_types=tipos, null_values=VALORES_NULOS_CSV,
+                                                strings_can_be_null=True)
+
+
+    return pa_csv.open_csv(fuente, read_options=opciones_lectura, parse_options=opciones_formato,
+                           convert_options=opciones_conversion)
+
+
+
+###############################################################################
+def reducir_lote_csv(lote):
+    """
+    Reduces the mandatory fields of a record batch of a .csv data file to their presence: a boolean that is True where the feature is informed and null where it is not.
+    Only the validity bitmap of each field is kept, so its values are freed before the next batch is parsed, and tabla_a_chunk converts it as any other column.
+
+    Parameters
+    ----------
+    lote: pyarrow RecordBatch
+          Record batch read by abrir_lector_csv.
+
+    Returns
+    -------
+    lote: pyarrow RecordBatch
+          Record batch with presence-only mandatory fields.
+    """
+
+    columnas = []
+    for campo, columna in zip(lote.schema.names, lote.columns):
+        if campo not in BASE_FIELDS:
+            columna = pa_compute.if_else(pa_compute.is_valid(columna), True, None)
+        columnas.append(columna)
+
+
+    return pa.RecordBatch.from_arrays(columnas, names=lote.schema.names)
+
+
+
+###############################################################################
+def leer_tablas_csv(lector, filas=None):
+    """
+    Reads the record batches of a .csv data file, reduced with reducir_lote_csv, and joins them into tables of the given number of rows.
+
+    Parameters
+    ----------
+    lector: pyarrow.csv.CSVStreamingReader
+            Reader of the file (see abrir_lector_csv).
+    filas: int
+           Number of rows of each table (the last one can be shorter). If None, the whole file is read into a single table.
+
+    Returns
+    -------
+    tablas: generator
+            Generator of tables (pyarrow Table).
+    """
+
+    # El lote vacío fija el esquema de las tablas, aunque no haya filas
+    lotes = [reducir_lote_csv(pa.RecordBatch.from_pylist([], schema=lector.schema))]
+    n_filas = 0
+    for lote in lector:
+        lotes.append(reducir_lote_csv(lote))
+        n_filas += lote.num_rows
+        while filas is not None and n_filas >= filas:
+            tabla = pa.Table.from_batches(lotes)
+            yield tabla.slice(0, filas)
+            lotes = [lotes[0]] + tabla.slice(filas).to_batches()
+            n_filas -= filas
+
+    if n_filas or filas is None:
+        yield pa.Table.from_batches(lotes)
+
+
+
+###############################################################################
+def leer_fichero_muestra(fic, separ, campos=None, chunksize=None):
+    """
+    Reads a .csv data file (plain or compressed) chunk by chunk, without any further processing of the chunks.
+    With pyarrow, each chunk is a table whose mandatory fields are reduced to their presence while the file is parsed (see leer_tablas_csv); without it, each chunk is the dataframe parsed by pd.read_csv.
+    If the file can not be opened or parsed, the program returns an error and ends; decompression errors are reported with their own message.
+
+    Parameters
+    ----------
+    fic: string
+         File name.
+    separ: char
+           Character to separate values in the .csv data file.
+    campos: list
+            Names of the features to be read (all of them if None).
+    chunksize: int
+               Maximum number of rows of each chunk (CHUNKSIZE if None).
+
+    Returns
+    -------
+    reader: generator
+            Generator of data sample chunks (pyarrow tables or pandas dataframes), as parsed.
+    """
+
+    if campos is None:
+        campos = obtener_cabecera(fic, separ)
+    if chunksize is None:
+        chunksize = CHUNKSIZE
+
+    lector = None
+    try:
+        if es_fichero_comprimido(fic):
+            lector = LectorDescompresion(fic)
+        fuente = os.path.join(BASE_PATH, INPUT_DIR, fic) if lector is None else lector
+        if pa is not None:
+            reader = leer_tablas_csv(abrir_lector_csv(fuente, separ, campos), chunksize)
+        else:
+            reader = pd.read_csv(fuente, sep=separ, usecols=campos, chunksize=chunksize,
+                                 dtype={campo: 'category' for campo in CATEGORICAL_FIELDS})
+        for dat in reader:
+            yield dat
+    except Exception:
+        if lector is not None and lector.error is not None:
+            print(ERROR_MSG_213 % (fic, lector.error))
+        else:
+            print(ERROR_MSG_206)
+        sys.exit()
+    finally:
+        if lector is not None:
+            lector.close()
+
+
+
+###############################################################################
+def cargar_fichero_muestra_by_chunks(fic, separ, campos=None):
+    """
+    Loads a chunk of the .csv data file into a dataframe.
+    Only the features in campos are parsed; the rest of each line is skipped by the csv parser.
+    Typology and data source are parsed as categorical and each chunk is converted with tabla_a_chunk (or reduced with compactar_chunk, without pyarrow).
+    Compressed files are decompressed in a separate thread while the chunks are parsed and evaluated (see LectorDescompresion).
+
+    Parameters
+    ----------
+    fic: string
+         File name.
+    separ: char
+           Character to separate values in the .csv data file.
+    campos: list
+            Names of the features to be read (all of them if None).
+
+    Returns
+    -------
+    reader: generator
+            Generator of data sample chunks (pandas dataframes).
+    """
+
+    convertir_chunk = compactar_chunk if pa is None else tabla_a_chunk
+    for dat in leer_fichero_muestra(fic, separ, campos):
+        yield convertir_chunk(dat)
+
+
+
+###############################################################################
+def convertir_a_presencia(informado):
+    """
+    Builds a presence-only column: a nullable boolean that is True where the feature is informed and NA where it is null.
+    Values of the mandatory fields are never read, only checked with pd.notnull, so this keeps the completeness evaluation unchanged using 2 bytes per row instead of a Python string.
+
+    Parameters
+    ----------
+    informado: numpy array
+               Boolean array, True where the feature is informed.
+
+    Returns
+    -------
+    presencia: pandas BooleanArray
+               Presence-only column.
+
+    Example
+    -------
+    >>> convertir_a_presencia(np.array([True, False]))
+    <BooleanArray>
+    [True, <NA>]
+    Length: 2, dtype: boolean
+    """
+
+    informado = np.asarray(informado, dtype=bool)
+
+
+    return pd.arrays.BooleanArray(np.ones(len(informado), dtype=bool), ~informado)
+
+
+
+###############################################################################
+def compactar_chunk(dat):
+    """
+    Applies the dtype plan to a chunk of the data sample: typology and data source become categorical, and every feature other than BASE_FIELDS (the mandatory fields) is reduced to its presence.
+    Reliability and severity are reduced to small integers once recodified, in redefinir_datos_fiabilidad_severidad.
+
+    Parameters
+    ----------
+    dat: pandas dataframe
+         Data sample chunk.
+
+    Returns
+    -------
+    dat: pandas dataframe
+         Data sample chunk with compact dtypes.
+
+    Example
+    -------
+    >>> compactar_chunk(chunk)
+    [It returns the chunk with categorical typology and data source, and presence-only mandatory fields.]
+    """
+
+    for campo in CATEGORICAL_FIELDS:
+        if not isinstance(dat[campo].dtype, pd.CategoricalDtype):
+            dat[campo] = dat[campo].astype('category')
+
+    for campo in dat.columns:
+        if campo not in BASE_FIELDS and not isinstance(dat[campo].dtype, pd.BooleanDtype):
+            dat[campo] = convertir_a_presencia(dat[campo].notnull().values)
+
+
+    return dat
+
+
+
+###############################################################################
+def tabla_a_chunk(tabla):
+    """
+    Converts a block of a columnar data sample file into a chunk with the dtype plan of compactar_chunk.
+    The presence of the mandatory fields is taken from the Arrow validity bitmaps, so their values are never converted into Python objects.
+
+    Parameters
+    ----------
+    tabla: pyarrow Table
+           Block of the data sample.
+
+    Returns
+    -------
+    dat: pandas dataframe
+         Data sample chunk with compact dtypes.
+    """
+
+    columnas = {}
+    for campo in tabla.column_names:
+        if campo in BASE_FIELDS:
+            columnas[campo] = tabla.column(campo).to_pandas()
+        else:
+            informado = pa_compute.is_valid(tabla.column(campo)).to_numpy(zero_copy_only=False)
+            columnas[campo] = convertir_a_presencia(informado)
+
+
+    return compactar_chunk(pd.DataFrame(columnas))
+
+
+
+###############################################################################
+def obtener_campos_necesarios(e_t_c):
+    """
+    Obtains every feature needed to evaluate the data sample: typology, data source, reliability and severity, plus the union of the mandatory fields of all the typologies in the configuration file.
+
+    Parameters
+    ----------
+    e_t_c: ConfiguracionTipologias
+           Compiled event typologies configuration (see compilar_configuracion_tipologias).
+
+    Returns
+    -------
+    campos_necesarios: list
+                       Names of the needed features, without duplicates.
+
+    Example
+    -------
+    >>> obtener_campos_necesarios(event_typology_config)
+    ['name', 'devicevendor', 'flexnumber1', 'deviceseverity', 'campo1', 'campo2', 'campo1a']
+    """
+
+    campos_necesarios = list(BASE_FIELDS)
+    campos_necesarios += e_t_c.por_defecto.campos_obligatorios
+    for configuracion in e_t_c.tipologias.values():
+        campos_necesarios += configuracion.campos_obligatorios
+
+    # Se eliminan los duplicados manteniendo el orden
+    campos_necesarios = list(dict.fromkeys(campos_necesarios))
+
+
+    return campos_necesarios
+
+
+
+###############################################################################
+def obtener_cabecera(fic, separ):
+    """
+    Reads the names of the features of a data sample file, without loading any data.
+
+    Parameters
+    ----------
+    fic: string
+         File name.
+    separ: char
+           Character to separate values in the .csv data file.
+
+    Returns
+    -------
+    cabecera: list
+              Names of the features in the file.
+
+    Example
+    -------
+    >>> obtener_cabecera('muestra.csv', ';')
+    ['name', 'devicevendor', 'flexnumber1', 'deviceseverity', 'campo1', 'campo2', 'campo3']
+    """
+
+    path_to_sample_file = os.path.join(BASE_PATH, INPUT_DIR, fic)
+    if es_fichero_columnar(fic) and pa is None:
+        print(ERROR_MSG_209)
+        sys.exit()
+
+    try:
+        if es_fichero_comprimido(fic):
+            with abrir_fichero_comprimido(fic) as fuente:
+                cabecera = list(pd.read_csv(fuente, sep=separ, nrows=0).columns)
+        elif not es_fichero_columnar(fic):
+            cabecera = list(pd.read_csv(path_to_sample_file, sep=separ, nrows=0).columns)
+        elif os.path.splitext(fic)[1].lower() in PARQUET_EXTENSIONS:
+            cabecera = pq.read_schema(path_to_sample_file).names
+        else:
+            with pa.memory_map(path_to_sample_file) as fuente:
+                cabecera = pa_ipc.open_file(fuente).schema.names
+    except Exception:
+        print(ERROR_MSG_206)
+        sys.exit()
+
+
+    return cabecera
+
+
+
+###############################################################################
+def obtener_columnas_lectura(fic, cabecera, campos, e_t_c):
+    """
+    Selects the features of a data sample file that have to be read, so the unnecessary ones are never parsed.
+    Typology, data source, reliability, severity and the mandatory fields of the Default Section are used for every typology, so if any of them is not in the header the program returns an error and ends.
+    Mandatory fields of specific typologies are read when present; eliminar_columnas_innecesarias reports them if a typology that needs them appears in the data.
+
+    Parameters
+    ----------
+    fic: string
+         File name.
+    cabecera: list
+              Names of the features in the file.
+    campos: list
+            Names of the needed features, from obtener_campos_necesarios.
+    e_t_c: ConfiguracionTipologias
+           Compiled event typologies configuration (see compilar_configuracion_tipologias).
+
+    Returns
+    -------
+    columnas: list
+              Names of the features to be read from the file.
+
+    Example
+    -------
+    >>> obtener_columnas_lectura('muestra.csv', obtener_cabecera('muestra.csv', ';'), campos_necesarios, event_typology_config)
+    ['name', 'devicevendor', 'flexnumber1', 'deviceseverity', 'campo1', 'campo2']
+    """
+
+    campos_imprescindibles = list(BASE_FIELDS)
+    campos_imprescindibles += e_t_c.por_defecto.campos_obligatorios
+
+    campos_ausentes = [campo for campo in campos_imprescindibles if campo not in cabecera]
+    if campos_ausentes:
+        print(ERROR_MSG_210 % (fic, ', '.join(campos_ausentes)))
+        sys.exit()
+
+    columnas = [campo for campo in campos if campo in cabecera]
+
+
+    return columnas
+
+
+
+###############################################################################
+def es_fichero_columnar(fic):
+    """
+    Checks whether a data sample file is stored in a columnar format (Parquet or Arrow IPC).
+
+    Parameters
+    ----------
+    fic: string
+         File name.
+
+    Returns
+    -------
+    columnar: bool
+              True for .parquet, .arrow and .feather files.
+
+    Example
+    -------
+    >>> es_fichero_columnar('muestra.parquet')
+    True
+    """
+
+    extension = os.path.splitext(fic)[1].lower()
+
+
+    return extension in PARQUET_EXTENSIONS + ARROW_EXTENSIONS
+
+
+
+###############################################################################
+def obtener_bloques_columnar(fic):
+    """
+    Obtains the number of blocks of a columnar data sample file: row groups in Parquet files and record batches in Arrow IPC files.
+    Each block can be read on its own, which makes it the unit of work of the parallel evaluation.
+
+    Parameters
+    ----------
+    fic: string
+         File name.
+
+    Returns
+    -------
+    n_bloques: int
+               Number of blocks of the file.
+
+    Example
+    -------
+    >>> obtener_bloques_columnar('muestra.parquet')
+    12
+    """
+
+    if pa is None:
+        print(ERROR_MSG_209)
+        sys.exit()
+
+    path_to_sample_file = os.path.join(BASE_PATH, INPUT_DIR, fic)
+    try:
+        if os.path.splitext(fic)[1].lower() in PARQUET_EXTENSIONS:
+            n_bloques = pq.ParquetFile(path_to_sample_file).num_row_groups
+        else:
+            with pa.memory_map(path_to_sample_file) as fuente:
+                n_bloques = pa_ipc.open_file(fuente).num_record_batches
+    except Exception:
+        print(ERROR_MSG_206)
+        sys.exit()
+
+
+    return n_bloques
+
+
+
+###############################################################################
+def cargar_bloque_columnar(fic, bloque, campos):
+    """
+    Loads a block (Parquet row group or Arrow IPC record batch) of a columnar data sample file, reading only the needed features.
+
+    Parameters
+    ----------
+    fic: string
+         File name.
+    bloque: int
+            Index of the block in the file.
+    campos: list
+            Names of the features to be read.
+
+    Returns
+    -------
+    tabla: pyarrow Table
+           Block of the data sample, with the needed features only.
+    """
+
+    path_to_sample_file = os.path.join(BASE_PATH, INPUT_DIR, fic)
+    try:
+        if os.path.splitext(fic)[1].lower() in PARQUET_EXTENSIONS:
+            tabla = pq.ParquetFile(path_to_sample_file).read_row_group(bloque, columns=campos)
+        else:
+            with pa.memory_map(path_to_sample_file) as fuente:
+                tabla = pa.Table.from_batches([pa_ipc.open_file(fuente).get_batch(bloque)]).select(campos)
+    except Exception:
+        print(ERROR_MSG_206)
+        sys.exit()
+
+
+    return tabla
+
+
+
+###############################################################################
+def leer_fichero_columnar(fic, campos, chunksize=None):
+    """
+    Reads a columnar data sample file (Parquet or Arrow IPC) in tables of at most chunksize rows, reading only the needed features.
+    Blocks larger than chunksize rows are split without copying them.
+
+    Parameters
+    ----------
+    fic: string
+         File name.
+    campos: list
+            Names of the features to be read.
+    chunksize: int
+               Maximum number of rows of each chunk (CHUNKSIZE if None).
+
+    Returns
+    -------
+    reader: generator
+            Generator of data sample chunks (pyarrow tables).
+    """
+
+    if chunksize is None:
+        chunksize = CHUNKSIZE
+
+    for bloque in range(obtener_bloques_columnar(fic)):
+        tabla = cargar_bloque_columnar(fic, bloque, campos)
+        for inicio in range(0, tabla.num_rows, chunksize):
+            yield tabla.slice(inicio, chunksize)
+        del tabla
+
+
+
+###############################################################################
+def cargar_fichero_columnar_by_chunks(fic, campos):
+    """
+    Loads a columnar data sample file (Parquet or Arrow IPC) chunk by chunk, reading only the needed features.
+
+    Parameters
+    ----------
+    fic: string
+         File name.
+    campos: list
+            Names of the features to be read.
+
+    Returns
+    -------
+    reader: generator
+            Generator of data sample chunks (pandas dataframes).
+    """
+
+    for tabla in leer_fichero_columnar(fic, campos):
+        yield tabla_a_chunk(tabla)
+
+
+
+###############################################################################
+def inicializar_estructura_valoracion(t_f, d_s_c, fuentes_desconocidas=None):
+    """
+    Initializes the evaluation structure with all "datasource-event typology" combinations.
+    In each item, sets datasource properties from the data sources attribute table (see compilar_configuracion_fuentes), merged against the list of pairs.
+    If datasource is not defined in the .ini configuration file, it is not included in the return dataframe and it is added to fuentes_desconocidas, so it can be reported once per run (see avisar_fuentes_desconocidas).
+
+    Parameters
+    ----------
+    t_f: pandas dataframe
+         Set of Event typology - Data source.
+    d_s_c: pandas dataframe
+           Data sources attribute table, indexed by data source.
+    fuentes_desconocidas: set
+                          Data sources not defined in the configuration file found so far. The ones of t_f are added to it.
+
+    Returns
+    -------
+    val: pandas dataframe
+         Evaluation structure for each Data source - Event typology.
+
+    Example
+    -------
+    >>> inicializar_estructura_valoracion(tipologia_fuente, data_source_config)
+    [It generates a dataframe with combinations of datasources and event typologies.
+    In each of them, it initializes the values obtained from .ini configuration files.
+    If there is no configuration in the .ini file, then the item is not included in the return dataframe.]
+    """
+
+    pares = pd.DataFrame({'Tipologia': t_f[FIELD_TYPOLOGY].astype(object).values,
+                          'Data source': t_f[FIELD_DATA_SOURCE].astype(object).values})
+
+    configuradas = pares['Data source'].isin(d_s_c.index).values
+    if fuentes_desconocidas is not None:
+        fuentes_desconocidas.update(pares.loc[~configuradas, 'Data source'])
+
+    val = pares[configuradas].merge(d_s_c, how='left', left_on='Data source', right_index=True)
+    val = val.reindex(columns=VALUATION_FIELDS).reset_index(drop=True)
+    val[ADDITION_FIELDS] = 0
+
+
+    return val
+
+
+
+###############################################################################
+def eliminar_columnas_innecesarias(dat, e_t_c, l_t, mapas=None):
+    """
+    Starting from the list of typologies defined in the configuration file and included in the data file, this function deletes from the data sample all those features that are not necessary for the evaluation of the quality of the data.
+
+    Parameters
+    ----------
+    dat: pandas dataframe
+         Data sample
+    e_t_c: ConfiguracionTipologias
+           Compiled event typologies configuration (see compilar_configuracion_tipologias).
+    l_t: list
+         List of event tipologies.
+    mapas: dict
+           Presence bitmaps of the mandatory fields already reduced at ingestion (see reducir_a_mapas_presencia). These fields are checked against it instead of the data sample.
+
+    Returns
+    -------
+    data_reducido: pandas dataframe
+                   Reduced data sample (without unnecessary features)
+
+    Example
+    -------
+    >>> eliminar_columnas_innecesarias(data, event_typology_config, lista_tipologias)
+    [It returns dataframe data without unnecessary features]
+    """
+
+    campos_necesarios = list(BASE_FIELDS)
+    campos_necesarios += e_t_c.por_defecto.campos_obligatorios
+
+    for tip in l_t:
+        campos_necesarios += obtener_configuracion_tipologia(tip, e_t_c).campos_obligatorios
+
+    campos_necesarios = list(dict.fromkeys(campos_necesarios))
+
+    if mapas is None:
+        mapas = {}
+    campos_ausentes = [campo for campo in campos_necesarios if campo not in dat.columns and campo not in mapas]
+    if campos_ausentes:
+        print(ERROR_MSG_211 % ', '.join(campos_ausentes))
+        sys.exit()
+
+    data_reducido = dat.loc[:, [campo for campo in campos_necesarios if campo in dat.columns]]
+
+
+    return data_reducido
+
+
+
+###############################################################################
+def replace_by_threshold(df, column, threshold, recodified):
+    '''
+    Replace the column by the values in recodified as specified by threshold
+
+    Parameters
+    ----------
+    df: pandas.DataFrame
+        The data
+    column: object
+            The column whose values will be replaced
+    threshold: list
+               The threshold values. Its lenght must be equal to 2
+    recodified: XXX
+                The values to be substituted into the data column. Its lenght must be equal to 3.
+    '''
+
+    col_data = pd.to_numeric(df[column], errors='coerce')
+    nulled = pd.isnull(col_data)
+    lower = (col_data <= threshold[0]) & (col_data > 1)
+    middle = (col_data > threshold[0]) & (col_data < threshold[1])
+    higher = col_data >= threshold[1]
+    col_data[higher] = recodified[-1]
+    col_data[middle] = recodified[-2]
+    col_data[lower] = recodified[-3]
+    col_data[nulled] = 1
+    df[column] = col_data
+
+
+
+###############################################################################
+def redefinir_datos_fiabilidad_severidad(dat):
+    """
+    Modifies the data sample to standardize severity and fiability values.
+
+    Parameters
+    ----------
+    dat: pandas dataframe
+         Data sample.
+
+    Returns
+    -------
+    dat: pandas dataframe
+         Data sample with standardized reliability and severity values.
+
+    Example
+    -------
+    >>> redefinir_datos_fiabilidad_severidad(data)
+    Returns data sample with standardized severity and fiability values.
+    """
+
+    threshold_split = [4, 8]
+    valores_recodificados = [3, 6, 9]
+
+    #target = FIELD_SEVERITY
+    #dat[target] = dat[target].apply(lambda x: pretratar_valor_target(x, threshold_split, valores_recodificados))
+
+    #target = FIELD_FIABILITY
+    #dat[target] = dat[target].apply(lambda x: pretratar_valor_target(x, threshold_split, valores_recodificados))
+
+    replace_by_threshold(dat, FIELD_SEVERITY, threshold_split, valores_recodificados)
+    replace_by_threshold(dat, FIELD_FIABILITY, threshold_split, valores_recodificados)
+
+    # Los valores recodificados caben en enteros pequeños. Los valores no
+    #   recodificados (menores o iguales que 1) se redondean hacia abajo, lo
+    #   que conserva su comparación con cualquier umbral entero
+    for campo in [FIELD_SEVERITY, FIELD_FIABILITY]:
+        limites = np.iinfo(RECODIFIED_DTYPE)
+        dat[campo] = np.clip(np.floor(dat[campo].values), limites.min, limites.max).astype(RECODIFIED_DTYPE)
+
+
+    return dat
+
+
+
+###############################################################################
+def obtener_campos_obligatorios(tip, e_t_p):
+    """
+    Return the mandatory fields for the selected typology. This fields are collected from the configuration file.
+    First, the field names will be tried to recover from the typology section. If they are not defined, they are retrieved from default section.
+    This list will be used as a reference to consider whether a data is complete or not.
+
+    Parameters
+    ----------
+    tip: string
+         Event typology.
+    e_t_p: ConfigParser
+           Event typologies configuration structureqqqqq
+
+    Returns
+    -------
+    cam_obl: string list
+             Mandatory fields for tip typology, sepparated by commas.
+
+    Example
+    -------
+    >>> obtener_campos_obligatorios('IP Bot', event_typology_parser)
+    [Aggregated Event Count, Correlated Event Count, End Time, Event ID, External ID, Locality, Destination Address, Destination Geo Country Code, Target Address, Agent Asset ID]
+    """
+
+    cam_obl = []
+    try:
+        tmp = e_t_p.get(tip, 'campos_obligatorios')
+        tmp = tmp.replace('\n', '')
+        cam_obl = tmp.split(",")
+    except Exception:
+        try:
+            tmp = e_t_p.get('Default Section', 'campos_obligatorios')
+            tmp = tmp.replace('\n', '')
+            cam_obl = tmp.split(",")
+        except Exception:
+            print(ERROR_MSG_207)
+            sys.exit()
+
+
+    return cam_obl
+
+
+
+###############################################################################
+def valorar_completitud(val, dat, i, tip, e_t_p):
+    """
+    Evaluates data completeness. This function checks how many data contain all mandatory fields, for a specific event typology.
+
+    Parameters
+    ----------
+    val: pandas dataframe
+         Evaluation structure for each Data source - Event typology.
+    dat: pandas dataframe
+         Data sample for the current Data source and Event typology.
+    i: integer
+       Current index in dataframe val.
+    tip: string
+         Event typology.
+    e_t_p: ConfigParser
+           Event typology configuration structure.
+
+    Returns
+    -------
+    val: pandas dataframe
+         Evaluation structure for each Data source - Event typology.
+
+    Example
+    -------
+    >>> valorar_completitud(valoracion, data_aux, i,  tipologia, event_typology_parser, cantidad)
+    Returns evaluation dataframe updated (completeness dimension).
+    """
+
+#    # Cálculo de la completitud para la tipologia-fuente actual
+#    campos_obligatorios = obtener_campos_obligatorios(tip, e_t_p)
+#
+#    data_compl = dat.dropna(subset=campos_obligatorios)
+#
+#    completitud = len(data_compl)
+#    val.loc[i, 'Completitud'] += completitud
+#
+#    # Almacenamos el número de campos obligatorios para después normalizar
+#    val.loc[i, 'Numero campos obligatorios'] = len(campos_obligatorios)
+#
+#    # Cálculo del nivel de información la tipologia-fuente actual
+#    campos_totales = 0
+#
+#    for col in campos_obligatorios:
 #        data_nivelinf = dat[pd.notnull(dat[col])]
 #        campos_totales = campos_totales + len(data_nivelinf)
 #
@@ -631,97 +1704,1162 @@ def valorar_completitud(val, dat, i, tip, e_t_p):
 #    return val
 
 
-    # Cálculo de la completitud para la tipologia-fuente actual
-    campos_obligatorios = obtener_campos_obligatorios(tip, e_t_p)
+    # Cálculo de la completitud para la tipologia-fuente actual
+    campos_obligatorios = obtener_campos_obligatorios(tip, e_t_p)
+
+    #data_compl = dat.dropna(subset=campos_obligatorios)
+
+    #completitud = len(data_compl)
+    mask = pd.notnull(dat[campos_obligatorios]).values
+    completitud = np.sum(np.all(mask, axis=1))
+    #val.loc[i, 'Completitud'] += completitud
+
+    # Almacenamos el número de campos obligatorios para después normalizar
+    val.loc[i, 'Numero campos obligatorios'] = len(campos_obligatorios)
+
+    # Cálculo del nivel de información la tipologia-fuente actual
+    #campos_totales = 0
+
+    #for col in campos_obligatorios:
+    #    data_nivelinf = dat[pd.notnull(dat[col])]
+    #    campos_totales = campos_totales + len(data_nivelinf)
+
+        # De momento, no calculamos el nivel de información. Solo añadimos los campos totales
+        # nivel_de_informacion = campos_totales / cantidad
+    campos_totales = np.sum(mask)
+    modified = ['Completitud', 'Nivel de informacion']
+    #val.loc[i, 'Nivel de informacion'] += campos_totales
+    val.loc[i, modified] += [completitud, campos_totales]
+
+
+    return val
+
+
+
+###############################################################################
+def obtener_parametro(parametro, tip, c_p):
+    """
+    Get an item value from comfiguration file. First, it is looked for in the typology section. If it does not exist, it is looked for in the defalut section.
+
+    Parameters
+    ----------
+    parametro: string
+               .ini file key which we want to obtain the value.
+    tip: string
+         Event typology.
+    c_p : ConfigParser
+          Configuration file values.
+
+    Returns
+    -------
+    valor_parametro: string
+                     Value of the configuration file element with key = parameter.
+
+    Example
+    -------
+    >>> obtener_parametro('veracidad_deseado', tip, e_t_p)
+    0.5
+    """
+
+    try:
+        valor_parametro = c_p.get(tip, parametro)
+    except Exception:
+        try:
+            valor_parametro = c_p.get('Default Section', parametro)
+        except Exception:
+            print(ERROR_MSG_208, parametro)
+            sys.exit()
+
+
+    return valor_parametro
+
+
+
+###############################################################################
+def valorar_veracidad(val, dat, i, tip, e_t_p):
+    """
+    Evaluates data accuracy/credibility (reliability).
+    This function checks:
+        · Reliability: How many data reach the reference reliability level, for a specific event typology.
+        . Unknow reliability level: What is the unknow reliability level in received data, for a specific event typology.
+
+    Parameters
+    ----------
+    val: pandas dataframe
+         Evaluation structure for each Data source - Event typology.
+    dat: pandas dataframe
+         Data sample for the current Data source and Event typology.
+    i: integer
+       Current index in dataframe val.
+    tip: string
+         Event typology.
+    e_t_p: ConfigParser
+           Event tipology configuration structure.
+
+    Returns
+    -------
+    val: pandas dataframe
+         Evaluation structure for each Data source - Event typology.
+
+    Example
+    -------
+    >>> valorar_veracidad(valoracion, data_aux, i, tipologia, event_tipology_parser)
+    Returns evaluation dataframe updated (reliability dimensions).
+    """
+
+    # Cálculo de la veracidad para la tipologia-fuente actual
+    veracidad_referencia = int(obtener_parametro('veracidad_referencia', tip, e_t_p))
+    #veracidad = len(dat[dat[FIELD_FIABILITY] >= veracidad_referencia])
+    veracidad = np.sum(dat[FIELD_FIABILITY] >= veracidad_referencia)
+    #val.loc[i, 'Veracidad'] += veracidad
+
+    # Cálculo de la veracidad desconocida para la tipologia-fuente actual
+    #veracidad_desconocida = len(dat[dat[FIELD_FIABILITY] <= 1])
+    veracidad_desconocida = np.sum(dat[FIELD_FIABILITY] <= 1)
+    #val.loc[i, 'Veracidad desconocida'] += veracidad_desconocida
+
+    val.loc[i, ['Veracidad', 'Veracidad desconocida']] += [veracidad, veracidad_desconocida]
+
+
+    return val
+
+
+
+###############################################################################
+def valorar_relevancia(val, dat, i):
+    """
+    Evaluates the data distribution into the different levels of severity.
+
+    Parameters
+    ----------
+    val: pandas dataframe
+         Evaluation structure for each Data source - Event typology.
+    dat: pandas dataframe
+         Data sample for the current Data source and Event typology.
+    i: integer
+       Current index in dataframe val.
+
+    Returns
+    -------
+    val: pandas dataframe
+         Evaluation structure for each Data source - Event typology.
+
+    Example
+    -------
+    >>> valorar_relevancia(valoracion, i,  tipologia, event_tipology_parser)
+    Returns evaluation dataframe updated (severity dimensions).
+    """
+
+    # Cálculo de la relevancia alta para la tipologia-fuente actual
+    #relevancia_alta = len(dat[dat[FIELD_SEVERITY] >= 8])
+    relevancia_alta = np.sum(dat[FIELD_SEVERITY] >= 8)
+    #val.loc[i, 'Relevancia alta'] += relevancia_alta
+
+    # Cálculo de la relevancia media para la tipologia-fuente actual
+    #relevancia_media = len(dat[(dat[FIELD_SEVERITY] >= 5) & (dat[FIELD_SEVERITY] < 8)])
+    relevancia_media = np.sum((dat[FIELD_SEVERITY] >= 5) & (dat[FIELD_SEVERITY] < 8))
+    #val.loc[i, 'Relevancia media'] += relevancia_media
+
+    # Cálculo de la relevancia baja para la tipologia-fuente actual
+    #relevancia_baja = len(dat[(dat[FIELD_SEVERITY] >= 2) & (dat[FIELD_SEVERITY] < 5)])
+    relevancia_baja = np.sum((dat[FIELD_SEVERITY] >= 2) & (dat[FIELD_SEVERITY] < 5))
+    #val.loc[i, 'Relevancia baja'] += relevancia_baja
+
+    # Cálculo de la relevancia desconocida para la tipologia-fuente actual
+    #relevancia_desconocida = len(dat[(dat[FIELD_SEVERITY] < 2)])
+    relevancia_desconocida = np.sum(dat[FIELD_SEVERITY] < 2)
+    #val.loc[i, 'Relevancia desconocida'] += relevancia_desconocida
+
+    relevancias = ['Relevancia alta', 'Relevancia media', 'Relevancia baja', 'Relevancia desconocida']
+    val.loc[i, relevancias] += [relevancia_alta, relevancia_media, relevancia_baja, relevancia_desconocida]
+
+
+    return val
+
+
+
+###############################################################################
+def eliminar_tildes(val):
+    """
+    Remove tildes from evaluation dataframe's typology variable.
+
+    Parameters
+    ----------
+    val: pandas dataframe
+         Evaluation structure for each Data source - Event typology.
+
+    Returns
+    -------
+    val: pandas dataframe
+         Evaluation structure for each Data source - Event typology.
+
+    Example
+    -------
+    >>> eliminar_tildes(valoracion)
+    Returns evaluation dataframe updated (without tildes in typology variable).
+    """
+
+    val['Tipologia'] = val['Tipologia'].apply(lambda x: unicodedata.normalize('NFKD', x.decode('utf-8')).encode('utf-8').decode('ascii', 'ignore'))
+
+
+    return val
+
+
+
+###############################################################################
+def factorizar_pares(dat):
+    """
+    Encodes each row of the data sample with the index of its Event typology - Data source pair.
+    Both columns are factorized only once, so the whole data sample is scanned a single time whatever the number of pairs.
+    Rows without event typology or data source are not assigned to any pair.
+
+    Parameters
+    ----------
+    dat: pandas dataframe
+         Data sample.
+
+    Returns
+    -------
+    cod: numpy array
+         Index of the Event typology - Data source pair of each row (-1 if the row has no pair).
+    t_f: pandas dataframe
+         Set of Event typology - Data source present in the data sample.
+
+    Example
+    -------
+    >>> factorizar_pares(data)
+    [It returns the pair index of each row and the dataframe with the distinct pairs.]
+    """
+
+    cod_tip, tipologias = pd.factorize(dat[FIELD_TYPOLOGY])
+    cod_fue, fuentes = pd.factorize(dat[FIELD_DATA_SOURCE])
+
+    # Se combinan los códigos de tipologia y fuente en un único entero por par
+    validos = (cod_tip >= 0) & (cod_fue >= 0)
+    combinado = cod_tip[validos].astype(np.int64) * len(fuentes) + cod_fue[validos]
+
+    cod = np.full(len(dat), -1, dtype=np.int64)
+    cod[validos], pares = pd.factorize(combinado)
+
+    t_f = pd.DataFrame({FIELD_TYPOLOGY: np.asarray(tipologias)[pares // len(fuentes)],
+                        FIELD_DATA_SOURCE: np.asarray(fuentes)[pares % len(fuentes)]})
+
+
+    return cod, t_f
+
+
+
+###############################################################################
+def reducir_a_mapas_presencia(dat, informados=None):
+    """
+    Completeness-only ingestion: reduces every mandatory field of a chunk to a packed presence bitmap (1 bit per row) and drops its column.
+    Rows are laid out in the bitmaps grouped by Event typology - Data source pair, and every pair starts at a byte boundary, so the informed values of a pair are counted with a popcount over a contiguous range of bytes.
+
+    Parameters
+    ----------
+    dat: pandas dataframe
+         Data sample chunk.
+    informados: dict
+                Presence (boolean numpy array) of each mandatory field, if it was taken from the parser output (see tabla_a_mapas_presencia). If None, it is taken from the mandatory field columns of the chunk.
+
+    Returns
+    -------
+    dat: pandas dataframe
+         Data sample chunk with BASE_FIELDS only.
+    presencia: dict
+               Presence bitmaps of the chunk:
+                   'codigos': pair index of each row (see factorizar_pares),
+                   'pares': dataframe with the pairs of the chunk,
+                   'inicios': first byte of each pair in the bitmaps, plus the total length,
+                   'mapas': packed presence bitmap of each mandatory field.
+
+    Example
+    -------
+    >>> reducir_a_mapas_presencia(chunk)
+    [It returns the chunk without mandatory fields and the presence bitmaps of those fields.]
+    """
+
+    cod, t_f = factorizar_pares(dat)
+    validos = cod >= 0
+    cantidad = np.bincount(cod[validos], minlength=len(t_f))
+
+    # Cada par ocupa un número entero de bytes en los mapas de bits
+    inicios = np.zeros(len(t_f) + 1, dtype=np.int64)
+    inicios[1:] = np.cumsum((cantidad + 7) // 8)
+
+    # Bit de cada fila: comienzo del segmento de su par más su orden dentro del par
+    orden = np.argsort(cod, kind='stable')[np.count_nonzero(~validos):]
+    cod_ordenado = cod[orden]
+    primera_fila = np.cumsum(cantidad) - cantidad
+    posicion = 8 * inicios[cod_ordenado] + np.arange(len(orden)) - primera_fila[cod_ordenado]
+
+    if informados is None:
+        informados = {campo: pd.notnull(dat[campo].values) for campo in dat.columns if campo not in BASE_FIELDS}
+
+    mapas = {}
+    for campo, informado in informados.items():
+        bits = np.zeros(8 * inicios[-1], dtype=bool)
+        bits[posicion] = informado[orden]
+        mapas[campo] = np.packbits(bits)
+
+    dat = dat[[campo for campo in dat.columns if campo in BASE_FIELDS]]
+    presencia = {'codigos': cod, 'pares': t_f, 'inicios': inicios, 'mapas': mapas}
+
+
+    return dat, presencia
+
+
+
+###############################################################################
+def tabla_a_mapas_presencia(tabla):
+    """
+    Converts a block of the data sample, as read by the parser, into a chunk with BASE_FIELDS only and the presence bitmaps of its mandatory fields (see reducir_a_mapas_presencia).
+    The presence of each mandatory field is taken from its Arrow validity bitmap, so the mandatory fields never become pandas columns.
+
+    Parameters
+    ----------
+    tabla: pyarrow Table
+           Block of the data sample (see leer_tablas_csv and leer_fichero_columnar).
+
+    Returns
+    -------
+    dat: pandas dataframe
+         Data sample chunk with BASE_FIELDS only.
+    presencia: dict
+               Presence bitmaps of the chunk (see reducir_a_mapas_presencia).
+    """
+
+    dat = tabla_a_chunk(tabla.select([campo for campo in tabla.column_names if campo in BASE_FIELDS]))
+    informados = {campo: pa_compute.is_valid(tabla.column(campo)).to_numpy(zero_copy_only=False)
+                  for campo in tabla.column_names if campo not in BASE_FIELDS}
+
+
+    return reducir_a_mapas_presencia(dat, informados)
+
+
+
+###############################################################################
+def preparar_chunk(dat, mapas_presencia=MAPAS_PRESENCIA):
+    """
+    Converts a chunk of the data sample, as read by the parser, into the chunk to be evaluated: pyarrow tables with tabla_a_chunk and pandas dataframes (read without pyarrow) with compactar_chunk.
+    If mapas_presencia is True, the mandatory fields are reduced to presence bitmaps instead, straight from the parser output in the case of pyarrow tables (see tabla_a_mapas_presencia).
+
+    Parameters
+    ----------
+    dat: pyarrow Table or pandas dataframe
+         Data sample chunk, as read.
+    mapas_presencia: bool
+                     If True, mandatory fields are reduced to presence bitmaps.
+
+    Returns
+    -------
+    dat: pandas dataframe
+         Data sample chunk.
+    presencia: dict
+               Presence bitmaps of the chunk (see reducir_a_mapas_presencia), None if mapas_presencia is False.
+
+    Example
+    -------
+    >>> preparar_chunk(tabla, True)
+    [It returns the chunk with BASE_FIELDS only and the presence bitmaps of its mandatory fields.]
+    """
+
+    presencia = None
+    if isinstance(dat, pd.DataFrame):
+        dat = compactar_chunk(dat)
+        if mapas_presencia:
+            dat, presencia = reducir_a_mapas_presencia(dat)
+    elif mapas_presencia:
+        dat, presencia = tabla_a_mapas_presencia(dat)
+    else:
+        dat = tabla_a_chunk(dat)
+
+
+    return dat, presencia
+
+
+
+###############################################################################
+def contar_bits_por_segmento(mapa, inicios):
+    """
+    Counts the bits set in each segment of a packed bitmap (popcount).
+
+    Parameters
+    ----------
+    mapa: numpy array
+          Packed bitmap (uint8).
+    inicios: numpy array
+             First byte of each segment, plus the total length.
+
+    Returns
+    -------
+    bits: numpy array
+          Number of bits set in each segment.
+
+    Example
+    -------
+    >>> contar_bits_por_segmento(np.array([255, 1, 3], dtype=np.uint8), np.array([0, 2, 3]))
+    array([9, 2])
+    """
+
+    acumulado = np.zeros(len(mapa) + 1, dtype=np.int64)
+    np.cumsum(BITS_POR_BYTE[mapa], out=acumulado[1:])
+
+
+    return acumulado[inicios[1:]] - acumulado[inicios[:-1]]
+
+
+
+###############################################################################
+def valorar_chunk_agrupado(val, dat, cod, e_t_c, presencia=None):
+    """
+    Evaluates quantity, completeness, information level, reliability and severity for all Event typology - Data source pairs in a single grouped pass over the data sample.
+    The counters are the same ones computed pair by pair by valorar_completitud, valorar_veracidad and valorar_relevancia, but each one is obtained for every pair at once with a weighted bincount over the pair index of the rows.
+
+    Parameters
+    ----------
+    val: pandas dataframe
+         Evaluation structure for each Data source - Event typology.
+    dat: pandas dataframe
+         Data sample, with standardized reliability and severity values.
+    cod: numpy array
+         Index in dataframe val of the pair of each row (-1 if the row is not evaluated).
+    e_t_c: ConfiguracionTipologias
+           Compiled event typologies configuration (see compilar_configuracion_tipologias).
+    presencia: dict
+               Presence bitmaps of the mandatory fields (see reducir_a_mapas_presencia), with the key 'segmentos' holding the bitmap segment of each row of val.
+               If it is given, completeness and information level are counted with popcounts over the bitmaps.
+
+    Returns
+    -------
+    val: pandas dataframe
+         Evaluation structure for each Data source - Event typology.
 
-    #data_compl = dat.dropna(subset=campos_obligatorios)
+    Example
+    -------
+    >>> valorar_chunk_agrupado(valoracion, data, codigos, event_typology_config)
+    Returns evaluation dataframe updated (quantity, completeness, reliability and severity dimensions).
+    """
 
-    #completitud = len(data_compl)
-    mask = pd.notnull(dat[campos_obligatorios]).values
-    completitud = np.sum(np.all(mask, axis=1))
-    #val.loc[i, 'Completitud'] += completitud
+    n_pares = len(val)
+    filas = cod >= 0
+    cod = cod[filas]
+
+    # Parámetros de cada par, tomados de la configuración compilada
+    configuracion_par = [obtener_configuracion_tipologia(tip, e_t_c) for tip in val['Tipologia']]
+    campos_par = [configuracion.campos_obligatorios for configuracion in configuracion_par]
+    referencia_par = np.array([configuracion.veracidad_referencia for configuracion in configuracion_par], dtype=float)
+
+    # Calculo de medidas relacionadas con la dimension de CANTIDAD (I):
+    val['Cantidad'] = np.bincount(cod, minlength=n_pares)
+
+    # Calculo de medidas relacionadas con la dimension de COMPLETITUD:
+    #   los pares se agrupan según su lista de campos obligatorios, de forma
+    #   que la máscara de nulos se calcula una vez por cada lista distinta
+    completitud = np.zeros(n_pares, dtype=np.int64)
+    campos_totales = np.zeros(n_pares, dtype=np.int64)
+    bits_por_campo = {}
+    for campos in set(campos_par):
+        pares_grupo = np.array([c == campos for c in campos_par])
+        if presencia is None:
+            filas_grupo = pares_grupo[cod]
+            mask = pd.notnull(dat[list(campos)]).values[filas]
+            mask = mask[filas_grupo]
+            cod_grupo = cod[filas_grupo]
+            completitud += np.bincount(cod_grupo, weights=np.all(mask, axis=1), minlength=n_pares).astype(np.int64)
+            campos_totales += np.bincount(cod_grupo, weights=np.sum(mask, axis=1), minlength=n_pares).astype(np.int64)
+        else:
+            # Las filas completas son las que tienen a 1 el bit de todos los
+            #   campos obligatorios: AND de los mapas y recuento por par
+            segmentos = presencia['segmentos'][pares_grupo]
+            mapa_completo = np.bitwise_and.reduce([presencia['mapas'][campo] for campo in campos])
+            completitud[pares_grupo] = contar_bits_por_segmento(mapa_completo, presencia['inicios'])[segmentos]
+            for campo in campos:
+                if campo not in bits_por_campo:
+                    bits_por_campo[campo] = contar_bits_por_segmento(presencia['mapas'][campo], presencia['inicios'])
+                campos_totales[pares_grupo] += bits_por_campo[campo][segmentos]
+
+    val['Completitud'] = completitud
+    val['Nivel de informacion'] = campos_totales
+    val['Numero campos obligatorios'] = [len(campos) for campos in campos_par]
+
+    # Calculo de medidas relacionadas con la dimension de VERACIDAD:
+    fiabilidad = dat[FIELD_FIABILITY].values[filas]
+    veracidad = fiabilidad >= referencia_par[cod]
+    veracidad_desconocida = fiabilidad <= 1
+    val['Veracidad'] = np.bincount(cod, weights=veracidad, minlength=n_pares).astype(np.int64)
+    val['Veracidad desconocida'] = np.bincount(cod, weights=veracidad_desconocida, minlength=n_pares).astype(np.int64)
+
+    # Calculo de medidas relacionadas con la dimension de RELEVANCIA:
+    severidad = dat[FIELD_SEVERITY].values[filas]
+    relevancias = {'Relevancia alta': severidad >= 8,
+                   'Relevancia media': (severidad >= 5) & (severidad < 8),
+                   'Relevancia baja': (severidad >= 2) & (severidad < 5),
+                   'Relevancia desconocida': severidad < 2}
+    for relevancia, seleccion in relevancias.items():
+        val[relevancia] = np.bincount(cod, weights=seleccion, minlength=n_pares).astype(np.int64)
 
-    # Almacenamos el número de campos obligatorios para después normalizar
-    val.loc[i, 'Numero campos obligatorios'] = len(campos_obligatorios)
 
-    # Cálculo del nivel de información la tipologia-fuente actual
-    #campos_totales = 0
+    return val
+
+
+
+###############################################################################
+def process_chunk(data, d_s_c, e_t_c, presencia=None, fuentes_desconocidas=None):
+    '''
+    Process a data chunk from a data file and creates the evaluation structure for the data contained within.
+
+    Parameters
+    ----------
+    data: pandas.Dataframe
+          A chunk from a data file
+    d_s_c: pandas dataframe
+           Data sources attribute table (see compilar_configuracion_fuentes).
+    e_t_c: ConfiguracionTipologias
+           Compiled event typologies configuration (see compilar_configuracion_tipologias).
+    presencia: dict
+               Presence bitmaps of the mandatory fields, if the chunk was reduced at ingestion with reducir_a_mapas_presencia.
+    fuentes_desconocidas: set
+                          Data sources not defined in the configuration file found so far. The ones of the chunk are added to it.
+
+    Returns
+    -------
+    valoracion: pandas.DataFrame
+                Evaluation structure for each Data source - Event typology in the chunk
+
+    Example
+    -------
+    >>> process_chunk(chunk, data_source_config, event_typology_config)
+    Returns evaluation dataframe updated (quantity, completeness, reliability and severity dimensions).
+    '''
+
+    #try:
+    # data.to_csv('chunks/%f.csv' % np.random.random(), header=True, index=False)
+    if presencia is None:
+        codigos, tip_fue = factorizar_pares(data)
+        mapas = None
+    else:
+        codigos, tip_fue = presencia['codigos'], presencia['pares']
+        mapas = presencia['mapas']
+    valoracion = inicializar_estructura_valoracion(tip_fue, d_s_c, fuentes_desconocidas)
+    lista_tipologias = list(set(valoracion['Tipologia']))
+    data = eliminar_columnas_innecesarias(data, e_t_c, lista_tipologias, mapas)
+    data = redefinir_datos_fiabilidad_severidad(data)
+
+    # Índice de cada par del chunk en la estructura de valoracion (-1 para los
+    #   pares cuya fuente no está configurada, que no se evalúan)
+    posiciones = pd.MultiIndex.from_frame(valoracion[SORT_FIELDS]).get_indexer(pd.MultiIndex.from_frame(tip_fue))
+    codigos = np.where(codigos >= 0, posiciones[codigos], -1)
+
+    # Segmento de los mapas de presencia de cada par de la estructura de valoracion
+    if presencia is not None:
+        evaluados = np.nonzero(posiciones >= 0)[0]
+        segmentos = np.zeros(len(valoracion), dtype=np.int64)
+        segmentos[posiciones[evaluados]] = evaluados
+        presencia = dict(presencia, segmentos=segmentos)
+
+    # Calculo de medidas relacionadas con las dimensiones de CANTIDAD (I),
+    #   COMPLETITUD, VERACIDAD y RELEVANCIA para todos los pares a la vez.
+    #       La cantidad normalizada y el nivel de calidad se calcularan al
+    #       final del proceso, ya que necesitan utilizar los datos de todas
+    #       las fuentes
+    valoracion = valorar_chunk_agrupado(valoracion, data, codigos, e_t_c, presencia)
+
+    #except Exception as e:
+    #    log.error(str(e))
+
+#    valoracion = eliminar_tildes(valoracion)
+
+
+    return valoracion
+
+
+
+###############################################################################
+def acumular_valoracion(acumulado, val):
+    """
+    Adds the evaluation structure of a chunk to the running evaluation structure.
+    The running structure is indexed by Event typology - Data source and holds one row per pair, so the ADDITION_FIELDS of the pairs already seen are summed in place and only the new pairs are appended.
+    Memory and merge cost depend on the number of pairs, not on the number of chunks.
+
+    Parameters
+    ----------
+    acumulado: pandas dataframe or None
+               Running evaluation structure, indexed by Tipologia and Data source. None before the first chunk.
+    val: pandas dataframe
+         Evaluation structure for each Data source - Event typology in the chunk.
+
+    Returns
+    -------
+    acumulado: pandas dataframe
+               Running evaluation structure, indexed by Tipologia and Data source.
+
+    Example
+    -------
+    >>> acumular_valoracion(valoracion_acumulada, process_chunk(chunk, data_source_config, event_typology_config))
+    Returns the running evaluation dataframe with the counters of the chunk added.
+    """
+
+    val = val.set_index(SORT_FIELDS)
+    if acumulado is None:
+        return val
+
+    # Posición de cada par del chunk en la estructura acumulada (-1 si es nuevo)
+    posiciones = acumulado.index.get_indexer(val.index)
+    existentes = posiciones >= 0
+
+    columnas = [acumulado.columns.get_loc(campo) for campo in ADDITION_FIELDS]
+    filas = posiciones[existentes]
+    acumulado.iloc[filas, columnas] = acumulado.iloc[filas, columnas].values + val[ADDITION_FIELDS].values[existentes]
+
+    if not existentes.all():
+        acumulado = pd.concat([acumulado, val[~existentes]])
+
+
+    return acumulado
+
+
+
+###############################################################################
+class LectorRangoMapeado(io.RawIOBase):
+    """
+    Read-only file object over a byte range of a memory-mapped file, to be parsed as a .csv file.
+    Each read copies the requested bytes straight from the mapping (the page cache), so the range is never loaded into an intermediate buffer.
+
+    Parameters
+    ----------
+    mapa: mmap.mmap
+          Memory-mapped data sample file.
+    inicio: int
+            First byte of the range.
+    fin: int
+         Byte after the end of the range.
+
+    Example
+    -------
+    >>> with LectorRangoMapeado(mapa, 41, 96000123) as lector:
+    ...     chunk = pd.read_csv(lector, sep=';', header=None, names=cabecera)
+    """
+
+    def __init__(self, mapa, inicio, fin):
+        super().__init__()
+        self.vista = memoryview(mapa)
+        self.posicion = inicio
+        self.fin = fin
+
+    def readable(self):
+        return True
+
+    def read(self, n=-1):
+        if n is None or n < 0:
+            n = self.fin - self.posicion
+        n = min(n, self.fin - self.posicion)
+        datos = bytes(self.vista[self.posicion:self.posicion + n])
+        self.posicion += n
+        return datos
+
+    def readinto(self, destino):
+        n = min(len(destino), self.fin - self.posicion)
+        destino[:n] = self.vista[self.posicion:self.posicion + n]
+        self.posicion += n
+        return n
+
+    def close(self):
+        # Se libera la vista para que la proyección del fichero se pueda cerrar
+        self.vista.release()
+        super().close()
+
+
+
+###############################################################################
+def mapear_fichero(fic):
+    """
+    Memory-maps a data sample file for reading. Empty files can not be mapped, so None is returned for them.
+
+    Parameters
+    ----------
+    fic: string
+         File name.
+
+    Returns
+    -------
+    mapa: mmap.mmap or None
+          Read-only mapping of the whole file.
+    """
+
+    with open(os.path.join(BASE_PATH, INPUT_DIR, fic), 'rb') as fichero:
+        if os.fstat(fichero.fileno()).st_size == 0:
+            return None
+        # La proyección sigue siendo válida después de cerrar el fichero
+        mapa = mmap.mmap(fichero.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+    return mapa
+
+
+
+###############################################################################
+def contar_comillas(mapa, inicio, fin):
+    """
+    Counts the quote characters in a byte range of a memory-mapped file, reading it in blocks of BYTES_BLOQUE_CSV bytes.
+
+    Parameters
+    ----------
+    mapa: mmap.mmap
+          Mapping of the file (see mapear_fichero).
+    inicio: int
+            First byte of the range.
+    fin: int
+         Byte following the last one of the range.
+
+    Returns
+    -------
+    comillas: int
+              Number of quote characters in the range.
+    """
+
+    comillas = 0
+    for bloque in range(inicio, fin, BYTES_BLOQUE_CSV):
+        comillas += mapa[bloque:min(bloque + BYTES_BLOQUE_CSV, fin)].count(b'"')
+
+
+    return comillas
+
+
+
+###############################################################################
+def obtener_rangos_fichero(fic, n_filas):
+    """
+    Splits a .csv data file into byte ranges of about n_filas rows each. Every range starts and ends at a record boundary, so it can be parsed on its own.
+    The file is memory-mapped, so boundaries are searched in the page cache without reading the file through a stream.
+    A line break is a record boundary only if it is not inside a quoted value, that is, if the range up to it holds an even number of quote characters (escaped quotes are doubled, so they do not change it).
+    The header line is not included in any range.
+
+    Parameters
+    ----------
+    fic: string
+         File name.
+    n_filas: int
+             Approximate number of rows in each range.
+
+    Returns
+    -------
+    rangos: list
+            List of (start, end) byte offsets.
+
+    Example
+    -------
+    >>> obtener_rangos_fichero('muestra.csv', CHUNKSIZE)
+    [(41, 96000123), (96000123, 192000087), (192000087, 201412500)]
+    """
+
+    mapa = mapear_fichero(fic)
+    if mapa is None:
+        return []
+
+    rangos = []
+    with mapa:
+        tamano = len(mapa)
+        inicio = mapa.find(b'\n') + 1 or tamano
+
+        # Estimación del tamaño de cada fila a partir del comienzo del fichero
+        muestra = mapa[inicio:inicio + 2 ** 20]
+        bytes_por_fila = len(muestra) / max(muestra.count(b'\n'), 1)
+        paso = max(int(bytes_por_fila * n_filas), 1)
+
+        while inicio < tamano:
+            # Cada rango termina al final de la línea en la que cae su último byte
+            fin = mapa.find(b'\n', inicio + paso - 1) + 1 or tamano
+
+            # Si el salto de línea está dentro de un valor entre comillas, el
+            #   rango se extiende hasta el siguiente, hasta que quede fuera
+            comillas = contar_comillas(mapa, inicio, fin)
+            while comillas % 2 and fin < tamano:
+                siguiente = mapa.find(b'\n', fin) + 1 or tamano
+                comillas += contar_comillas(mapa, fin, siguiente)
+                fin = siguiente
+
+            rangos.append((inicio, fin))
+            inicio = fin
+
+
+    return rangos
+
+
+
+###############################################################################
+def evaluar_rango_fichero(fic, inicio, fin, separ, cabecera, campos, d_s_c, e_t_c, mapas_presencia=MAPAS_PRESENCIA):
+    """
+    Parses a byte range of a .csv data file and evaluates it as a chunk.
+    The file is memory-mapped and the parser reads the range straight from the mapping (see LectorRangoMapeado).
+    It is the unit of work of each process in the parallel evaluation, so only the small evaluation structure of the range is sent back.
+
+    Parameters
+    ----------
+    fic: string
+         File name.
+    inicio: int
+            First byte of the range (start of a line).
+    fin: int
+         Byte after the end of the range (start of a line or end of file).
+    separ: char
+           Character to separate values in the .csv data file.
+    cabecera: list
+              Names of the features in the file (see obtener_cabecera), read once for all its ranges.
+    campos: list
+            Names of the features to be read.
+    d_s_c: pandas dataframe
+           Data sources attribute table (see compilar_configuracion_fuentes).
+    e_t_c: ConfiguracionTipologias
+           Compiled event typologies configuration (see compilar_configuracion_tipologias).
+    mapas_presencia: bool
+                     If True, mandatory fields are reduced to presence bitmaps as soon as the range is parsed.
+
+    Returns
+    -------
+    valoracion: pandas.DataFrame
+                Evaluation structure for each Data source - Event typology in the range
+    fuentes_desconocidas: set
+                          Data sources in the range not defined in the configuration file.
+    medida: dict
+            Measurement of the range: rows, bytes, read and evaluation times (see crear_medida_chunk).
+
+    Example
+    -------
+    >>> evaluar_rango_fichero('muestra.csv', 41, 96000123, ';', cabecera, columnas, data_source_config, event_typology_config)
+    Returns evaluation dataframe updated (quantity, completeness, reliability and severity dimensions), the unknown data sources and the measurement of the chunk.
+    """
+
+    inicio_lectura = time.perf_counter()
+    inicio_cpu_lectura = time.process_time()
+    try:
+        with mapear_fichero(fic) as mapa, LectorRangoMapeado(mapa, inicio, fin) as lector:
+            if pa is not None:
+                chunk = next(leer_tablas_csv(abrir_lector_csv(lector, separ, campos, cabecera)))
+            else:
+                chunk = pd.read_csv(lector, sep=separ, header=None, names=cabecera, usecols=campos,
+                                    dtype={campo: 'category' for campo in CATEGORICAL_FIELDS})
+    except Exception:
+        print(ERROR_MSG_206)
+        sys.exit()
+
+    chunk, presencia = preparar_chunk(chunk, mapas_presencia)
+    lectura = (time.perf_counter() - inicio_lectura, time.process_time() - inicio_cpu_lectura)
+
+    fuentes_desconocidas = set()
+    valoracion, tiempo, tiempo_cpu = medir(process_chunk, chunk, d_s_c, e_t_c, presencia, fuentes_desconocidas)
+    medida = crear_medida_chunk(fic, len(chunk), fin - inicio, lectura, (tiempo, tiempo_cpu))
+
+
+    return valoracion, fuentes_desconocidas, medida
+
+
+
+###############################################################################
+def evaluar_bloque_columnar(fic, bloque, campos, d_s_c, e_t_c, mapas_presencia=MAPAS_PRESENCIA, chunksize=None):
+    """
+    Loads a block of a columnar data sample file and evaluates it as a chunk, or in chunks of chunksize rows if it is larger.
+    It is the unit of work of each process in the parallel evaluation of Parquet and Arrow IPC files.
+
+    Parameters
+    ----------
+    fic: string
+         File name.
+    bloque: int
+            Index of the block (row group or record batch) in the file.
+    campos: list
+            Names of the features to be read.
+    d_s_c: pandas dataframe
+           Data sources attribute table (see compilar_configuracion_fuentes).
+    e_t_c: ConfiguracionTipologias
+           Compiled event typologies configuration (see compilar_configuracion_tipologias).
+    mapas_presencia: bool
+                     If True, mandatory fields are reduced to presence bitmaps as soon as the block is loaded.
+    chunksize: int
+               Maximum number of rows of each chunk (CHUNKSIZE if None). Worker processes receive it from the parent process, as they do not see the changes made by configurar_ejecucion when they are started with spawn.
+
+    Returns
+    -------
+    valoracion: pandas.DataFrame
+                Evaluation structure for each Data source - Event typology in the block (None if the block has no rows)
+    fuentes_desconocidas: set
+                          Data sources in the block not defined in the configuration file.
+    medida: dict
+            Measurement of the block: rows, read and evaluation times (see crear_medida_chunk).
+
+    Example
+    -------
+    >>> evaluar_bloque_columnar('muestra.parquet', 0, campos_necesarios, data_source_config, event_typology_config)
+    Returns evaluation dataframe updated (quantity, completeness, reliability and severity dimensions), the unknown data sources and the measurement of the chunk.
+    """
+
+    if chunksize is None:
+        chunksize = CHUNKSIZE
+
+    tabla, tiempo, tiempo_cpu = medir(cargar_bloque_columnar, fic, bloque, campos)
+    lectura = [tiempo, tiempo_cpu]
+    proceso = [0.0, 0.0]
+
+    # Los bloques mayores que chunksize se evalúan por partes, sin copiarlos
+    valoracion = None
+    fuentes_desconocidas = set()
+    for inicio in range(0, tabla.num_rows, chunksize):
+        (chunk, presencia), tiempo, tiempo_cpu = medir(preparar_chunk, tabla.slice(inicio, chunksize), mapas_presencia)
+        lectura = [lectura[0] + tiempo, lectura[1] + tiempo_cpu]
+        val_aux, tiempo, tiempo_cpu = medir(process_chunk, chunk, d_s_c, e_t_c, presencia, fuentes_desconocidas)
+        proceso = [proceso[0] + tiempo, proceso[1] + tiempo_cpu]
+        valoracion = acumular_valoracion(valoracion, val_aux)
+    if valoracion is not None:
+        valoracion = valoracion.reset_index()
+    medida = crear_medida_chunk(fic, tabla.num_rows, None, tuple(lectura), tuple(proceso))
+
+
+    return valoracion, fuentes_desconocidas, medida
+
+
+
+###############################################################################
+def evaluar_fichero_comprimido(fic, separ, campos, d_s_c, e_t_c, mapas_presencia=MAPAS_PRESENCIA, chunksize=None):
+    """
+    Evaluates a whole compressed .csv data file, chunk by chunk, decompressing it in a separate thread (see evaluar_ficheros).
+    It is the unit of work of each process in the parallel evaluation of compressed files.
+
+    Parameters
+    ----------
+    fic: string
+         File name.
+    separ: char
+           Character to separate values in the .csv data file.
+    campos: list
+            Names of the features to be read.
+    d_s_c: pandas dataframe
+           Data sources attribute table (see compilar_configuracion_fuentes).
+    e_t_c: ConfiguracionTipologias
+           Compiled event typologies configuration (see compilar_configuracion_tipologias).
+    mapas_presencia: bool
+                     If True, mandatory fields are reduced to presence bitmaps as soon as each chunk is read.
+    chunksize: int
+               Maximum number of rows of each chunk (CHUNKSIZE if None). Worker processes receive it from the parent process, as they do not see the changes made by configurar_ejecucion when they are started with spawn.
+
+    Returns
+    -------
+    valoracion: pandas.DataFrame or None
+                Evaluation structure for each Data source - Event typology in the file (None if it has no rows).
+    fuentes_desconocidas: set
+                          Data sources in the file not defined in the configuration file.
+    medida: dict
+            Measurement of the file: rows, read and evaluation times of all its chunks (see crear_medida_chunk).
+
+    Example
+    -------
+    >>> evaluar_fichero_comprimido('muestra.csv.gz', ';', columnas, data_source_config, event_typology_config)
+    Returns evaluation dataframe updated (quantity, completeness, reliability and severity dimensions), the unknown data sources and the measurement of the file.
+    """
+
+    medidas = []
+    valoracion, fuentes_desconocidas = evaluar_ficheros([fic], separ, d_s_c, e_t_c, mapas_presencia, medidas, campos,
+                                                       chunksize)[fic]
+    if valoracion is not None:
+        valoracion = valoracion.reset_index()
+
+    # Medida del fichero completo: suma de las medidas de sus chunks
+    lectura = tuple(sum(medida[campo] for medida in medidas) for campo in ['tiempo_lectura', 'tiempo_cpu_lectura'])
+    proceso = tuple(sum(medida[campo] for medida in medidas) for campo in ['tiempo_proceso', 'tiempo_cpu_proceso'])
+    medida = crear_medida_chunk(fic, sum(medida['filas'] for medida in medidas), None, lectura, proceso)
+
+
+    return valoracion, fuentes_desconocidas, medida
+
+
+
+###############################################################################
+def evaluar_ficheros_en_paralelo(lis_fic, separ, d_s_c, e_t_c, n_procesos, mapas_presencia=MAPAS_PRESENCIA, medidas=None):
+    """
+    Obtains the evaluation structure of each input file, evaluating the chunks in a pool of processes.
+    Each process reads and evaluates its own byte range of a .csv file, or its own block of a Parquet or Arrow IPC file, and only the evaluation structure of the range travels back.
+    Compressed .csv files can not be split into ranges, so each one is evaluated whole by a single process (see evaluar_fichero_comprimido).
+    The number of ranges submitted and not yet finished is limited to MAX_CHUNKS_POR_PROCESO per process, so memory usage does not depend on file size.
+
+    Parameters
+    ----------
+    lis_fic: list.
+             List of data sample files (.csv, .parquet, .arrow or .feather), contained in the input directory.
+    separ: char
+           Character to separate values in the .csv data file.
+    d_s_c: pandas dataframe
+           Data sources attribute table (see compilar_configuracion_fuentes).
+    e_t_c: ConfiguracionTipologias
+           Compiled event typologies configuration (see compilar_configuracion_tipologias).
+    n_procesos: int
+                Number of worker processes.
+    mapas_presencia: bool
+                     If True, mandatory fields are reduced to presence bitmaps as soon as each chunk is read.
+    medidas: list
+             Measurements of the chunks (see crear_medida_chunk). The ones of the evaluated chunks are added to it.
+
+    Returns
+    -------
+    resultados: dict
+                Running evaluation structure (None if the file has no rows) and unknown data sources of each file.
+
+    Example
+    -------
+    >>> evaluar_ficheros_en_paralelo(lista_ficheros_input, separador, data_source_config, event_typology_config, 8)
+    {'input/muestra.csv': [<running evaluation dataframe>, set()]}
+    """
+
+    campos_necesarios = obtener_campos_necesarios(e_t_c)
+
+    # Unidades de trabajo: rangos de bytes en los ficheros .csv, bloques en
+    #   los ficheros Parquet y Arrow IPC y el fichero completo en los .csv
+    #   comprimidos, que no se pueden dividir. El fichero de cada tarea es su
+    #   primer argumento. El tamaño de chunk viaja con cada tarea, porque los
+    #   procesos iniciados con spawn (Windows) no ven el de configurar_ejecucion
+    tareas = []
+    for path in lis_fic:
+        cabecera = obtener_cabecera(path, separ)
+        columnas = obtener_columnas_lectura(path, cabecera, campos_necesarios, e_t_c)
+        if es_fichero_columnar(path):
+            tareas += [(evaluar_bloque_columnar, path, bloque, columnas, d_s_c, e_t_c, mapas_presencia, CHUNKSIZE)
+                       for bloque in range(obtener_bloques_columnar(path))]
+        elif es_fichero_comprimido(path):
+            tareas.append((evaluar_fichero_comprimido, path, separ, columnas, d_s_c, e_t_c, mapas_presencia, CHUNKSIZE))
+        else:
+            tareas += [(evaluar_rango_fichero, path, inicio, fin, separ, cabecera, columnas, d_s_c, e_t_c,
+                        mapas_presencia) for inicio, fin in obtener_rangos_fichero(path, CHUNKSIZE)]
+
+    resultados = {path: [None, set()] for path in lis_fic}
 
-    #for col in campos_obligatorios:
-    #    data_nivelinf = dat[pd.notnull(dat[col])]
-    #    campos_totales = campos_totales + len(data_nivelinf)
+    def acumular(futuro):
+        val_aux, fuentes_aux, medida = futuro.result()
+        resultado = resultados[ficheros[futuro]]
+        if val_aux is not None:
+            resultado[0] = acumular_valoracion(resultado[0], val_aux)
+        resultado[1] |= fuentes_aux
+        if medidas is not None:
+            medidas.append(medida)
 
-        # De momento, no calculamos el nivel de información. Solo añadimos los campos totales
-        # nivel_de_informacion = campos_totales / cantidad
-    campos_totales = np.sum(mask)
-    modified = ['Completitud', 'Nivel de informacion']
-    #val.loc[i, 'Nivel de informacion'] += campos_totales
-    val.loc[i, modified] += [completitud, campos_totales]
+    max_en_vuelo = n_procesos * MAX_CHUNKS_POR_PROCESO
+    ficheros = {}
+    pendientes = set()
+    with ProcessPoolExecutor(max_workers=n_procesos) as ejecutor:
+        for tarea in tareas:
+            # Se espera a que termine algún chunk antes de enviar uno nuevo
+            if len(pendientes) >= max_en_vuelo:
+                terminados, pendientes = wait(pendientes, return_when=FIRST_COMPLETED)
+                for futuro in terminados:
+                    acumular(futuro)
+            futuro = ejecutor.submit(*tarea)
+            ficheros[futuro] = tarea[1]
+            pendientes.add(futuro)
 
+        terminados, pendientes = wait(pendientes)
+        for futuro in terminados:
+            acumular(futuro)
 
-    return val
+
+    return resultados
 
 
 
 ###############################################################################
-def obtener_parametro(parametro, tip, c_p):
+def evaluar_ficheros(lis_fic, separ, d_s_c, e_t_c, mapas_presencia=MAPAS_PRESENCIA, medidas=None, columnas=None,
+                     chunksize=None):
     """
-    Get an item value from comfiguration file. First, it is looked for in the typology section. If it does not exist, it is looked for in the defalut section.
+    Obtains the evaluation structure of each input file, evaluating the chunks one after another in the current process.
 
     Parameters
     ----------
-    parametro: string
-               .ini file key which we want to obtain the value.
-    tip: string
-         Event typology.
-    c_p : ConfigParser
-          Configuration file values.
+    lis_fic: list.
+             List of data sample files (.csv, .parquet, .arrow or .feather), contained in the input directory.
+    separ: char
+           Character to separate values in the .csv data file.
+    d_s_c: pandas dataframe
+           Data sources attribute table (see compilar_configuracion_fuentes).
+    e_t_c: ConfiguracionTipologias
+           Compiled event typologies configuration (see compilar_configuracion_tipologias).
+    mapas_presencia: bool
+                     If True, mandatory fields are reduced to presence bitmaps as soon as each chunk is read.
+    medidas: list
+             Measurements of the chunks (see crear_medida_chunk). The ones of the evaluated chunks are added to it.
+    columnas: list
+              Names of the features to be read, if they are already known (see obtener_columnas_lectura).
+    chunksize: int
+               Maximum number of rows of each chunk (CHUNKSIZE if None).
 
     Returns
     -------
-    valor_parametro: string
-                     Value of the configuration file element with key = parameter.
+    resultados: dict
+                Running evaluation structure (None if the file has no rows) and unknown data sources of each file.
 
     Example
     -------
-    >>> obtener_parametro('veracidad_deseado', tip, e_t_p)
-    0.5
+    >>> evaluar_ficheros(lista_ficheros_input, separador, data_source_config, event_typology_config)
+    {'input/muestra.csv': [<running evaluation dataframe>, set()]}
     """
 
-    try:
-        valor_parametro = c_p.get(tip, parametro)
-    except Exception:
-        try:
-            valor_parametro = c_p.get('Default Section', parametro)
-        except Exception:
-            print(ERROR_MSG_208, parametro)
-            sys.exit()
+    campos_necesarios = obtener_campos_necesarios(e_t_c)
+
+    resultados = {}
+    for path in lis_fic:
+        val = None
+        fuentes_desconocidas = set()
+        # Solo se leen las columnas necesarias para la evaluación
+        columnas_fichero = columnas
+        if columnas_fichero is None:
+            columnas_fichero = obtener_columnas_lectura(path, obtener_cabecera(path, separ), campos_necesarios, e_t_c)
+        if es_fichero_columnar(path):
+            reader = leer_fichero_columnar(path, columnas_fichero, chunksize)
+        else:
+            reader = leer_fichero_muestra(path, separ, columnas_fichero, chunksize)
+        while True:
+            chunk, tiempo, tiempo_cpu = medir(next, reader, None)
+            if chunk is None:
+                break
+            # La conversión del chunk leído (y la reducción de los campos
+            #   obligatorios a mapas de bits) cuenta como lectura
+            (chunk, presencia), tiempo_conversion, tiempo_cpu_conversion = medir(preparar_chunk, chunk, mapas_presencia)
+            lectura = (tiempo + tiempo_conversion, tiempo_cpu + tiempo_cpu_conversion)
+            val_aux, tiempo, tiempo_cpu = medir(process_chunk, chunk, d_s_c, e_t_c, presencia, fuentes_desconocidas)
+            if medidas is not None:
+                medidas.append(crear_medida_chunk(path, len(chunk), None, lectura, (tiempo, tiempo_cpu)))
+            val = acumular_valoracion(val, val_aux)
+            del chunk
+            del val_aux
+        reader.close()
+        del reader
+        resultados[path] = [val, fuentes_desconocidas]
 
 
-    return valor_parametro
+    return resultados
 
 
 
 ###############################################################################
-def valorar_veracidad(val, dat, i, tip, e_t_p):
+def valorar_dimensiones(lis_fic, separ, d_s_c, e_t_c, n_procesos=N_PROCESOS, mapas_presencia=MAPAS_PRESENCIA, registro=None,
+                        incremental=INCREMENTAL):
     """
-    Evaluates data accuracy/credibility (reliability).
-    This function checks:
-        · Reliability: How many data reach the reference reliability level, for a specific event typology.
-        . Unknow reliability level: What is the unknow reliability level in received data, for a specific event typology.
+    Obtiene estructuras de evalucación para todos los ficheros de entrada.
+    In incremental mode, the counters of the files that did not change since the last run are taken from the state store (see cargar_estado), and only new or changed files are read.
 
     Parameters
     ----------
-    val: pandas dataframe
-         Evaluation structure for each Data source - Event typology.
-    dat: pandas dataframe
-         Data sample for the current Data source and Event typology.
-    i: integer
-       Current index in dataframe val.
-    tip: string
-         Event typology.
-    e_t_p: ConfigParser
-           Event tipology configuration structure.
+    lis_fic: list.
+             List of data sample files (.csv, .parquet, .arrow or .feather), contained in the input directory.
+    separ: char
+           Character to separate values in the .csv data file.
+    d_s_c: pandas dataframe
+           Data sources attribute table (see compilar_configuracion_fuentes).
+    e_t_c: ConfiguracionTipologias
+           Compiled event typologies configuration (see compilar_configuracion_tipologias).
+    n_procesos: int
+                Number of worker processes. With 1, chunks are evaluated sequentially in the current process.
+    mapas_presencia: bool
+                     Completeness-only ingestion mode. If True, mandatory fields are reduced to presence bitmaps as soon as each chunk is read, and completeness and information level are counted over the bitmaps.
+    registro: dict
+              Record of the run, in which the measurement of each chunk is kept (see registrar_chunks).
+    incremental: bool
+                 If True, the counters of each file are kept in the state store and reused while the file does not change.
 
     Returns
     -------
@@ -730,196 +2868,282 @@ def valorar_veracidad(val, dat, i, tip, e_t_p):
 
     Example
     -------
-    >>> valorar_veracidad(valoracion, data_aux, i, tipologia, event_tipology_parser)
-    Returns evaluation dataframe updated (reliability dimensions).
+    >>> valorar_dimensiones(lista_ficheros_input, separador, data_source_config, event_typology_config)
+    Returns evaluation dataframe updated (quantity, completeness, reliability and severity dimensions).
+    Results of all chunks are accumulated for each Data source - Event typology.
     """
 
-    # Cálculo de la veracidad para la tipologia-fuente actual
-    veracidad_referencia = int(obtener_parametro('veracidad_referencia', tip, e_t_p))
-    #veracidad = len(dat[dat[FIELD_FIABILITY] >= veracidad_referencia])
-    veracidad = np.sum(dat[FIELD_FIABILITY] >= veracidad_referencia)
-    #val.loc[i, 'Veracidad'] += veracidad
-
-    # Cálculo de la veracidad desconocida para la tipologia-fuente actual
-    #veracidad_desconocida = len(dat[dat[FIELD_FIABILITY] <= 1])
-    veracidad_desconocida = np.sum(dat[FIELD_FIABILITY] <= 1)
-    #val.loc[i, 'Veracidad desconocida'] += veracidad_desconocida
-
-    val.loc[i, ['Veracidad', 'Veracidad desconocida']] += [veracidad, veracidad_desconocida]
+    resultados = {}
+    pendientes = lis_fic
+    if incremental:
+        estado = cargar_estado(separ, e_t_c, d_s_c)
+        resultados, pendientes, huellas = recuperar_ficheros(estado, lis_fic, d_s_c)
+
+    medidas = []
+    if n_procesos > 1:
+        resultados.update(evaluar_ficheros_en_paralelo(pendientes, separ, d_s_c, e_t_c, n_procesos, mapas_presencia, medidas))
+    else:
+        resultados.update(evaluar_ficheros(pendientes, separ, d_s_c, e_t_c, mapas_presencia, medidas))
+    registrar_chunks(registro, medidas, pendientes)
+
+    if incremental:
+        guardar_estado(estado, lis_fic, resultados, huellas)
+        if registro is not None:
+            registro['ficheros'] = {'evaluados': len(pendientes), 'reutilizados': len(lis_fic) - len(pendientes)}
+
+    # Agrupación de los contadores de todos los ficheros
+    val = None
+    fuentes_desconocidas = set()
+    for path in lis_fic:
+        val_fichero, fuentes_fichero = resultados[path]
+        if val_fichero is not None:
+            val = acumular_valoracion(val, val_fichero.reset_index())
+        fuentes_desconocidas |= fuentes_fichero
 
 
-    return val
+    return finalizar_valoracion_dimensiones(val, fuentes_desconocidas)
 
 
 
 ###############################################################################
-def valorar_relevancia(val, dat, i):
+def calcular_hash_fichero(fic):
     """
-    Evaluates the data distribution into the different levels of severity.
+    Computes the content hash (sha1) of a data sample file, reading it in blocks of BYTES_BLOQUE_HASH bytes.
 
     Parameters
     ----------
-    val: pandas dataframe
-         Evaluation structure for each Data source - Event typology.
-    dat: pandas dataframe
-         Data sample for the current Data source and Event typology.
-    i: integer
-       Current index in dataframe val.
+    fic: string
+         File name.
 
     Returns
     -------
-    val: pandas dataframe
-         Evaluation structure for each Data source - Event typology.
-
-    Example
-    -------
-    >>> valorar_relevancia(valoracion, i,  tipologia, event_tipology_parser)
-    Returns evaluation dataframe updated (severity dimensions).
+    huella: str
+            Hexadecimal sha1 of the file content.
     """
 
-    # Cálculo de la relevancia alta para la tipologia-fuente actual
-    #relevancia_alta = len(dat[dat[FIELD_SEVERITY] >= 8])
-    relevancia_alta = np.sum(dat[FIELD_SEVERITY] >= 8)
-    #val.loc[i, 'Relevancia alta'] += relevancia_alta
+    huella = hashlib.sha1()
+    with open(os.path.join(BASE_PATH, INPUT_DIR, fic), 'rb') as fichero:
+        for bloque in iter(lambda: fichero.read(BYTES_BLOQUE_HASH), b''):
+            huella.update(bloque)
 
-    # Cálculo de la relevancia media para la tipologia-fuente actual
-    #relevancia_media = len(dat[(dat[FIELD_SEVERITY] >= 5) & (dat[FIELD_SEVERITY] < 8)])
-    relevancia_media = np.sum((dat[FIELD_SEVERITY] >= 5) & (dat[FIELD_SEVERITY] < 8))
-    #val.loc[i, 'Relevancia media'] += relevancia_media
 
-    # Cálculo de la relevancia baja para la tipologia-fuente actual
-    #relevancia_baja = len(dat[(dat[FIELD_SEVERITY] >= 2) & (dat[FIELD_SEVERITY] < 5)])
-    relevancia_baja = np.sum((dat[FIELD_SEVERITY] >= 2) & (dat[FIELD_SEVERITY] < 5))
-    #val.loc[i, 'Relevancia baja'] += relevancia_baja
+    return huella.hexdigest()
 
-    # Cálculo de la relevancia desconocida para la tipologia-fuente actual
-    #relevancia_desconocida = len(dat[(dat[FIELD_SEVERITY] < 2)])
-    relevancia_desconocida = np.sum(dat[FIELD_SEVERITY] < 2)
-    #val.loc[i, 'Relevancia desconocida'] += relevancia_desconocida
 
-    relevancias = ['Relevancia alta', 'Relevancia media', 'Relevancia baja', 'Relevancia desconocida']
-    val.loc[i, relevancias] += [relevancia_alta, relevancia_media, relevancia_baja, relevancia_desconocida]
 
+###############################################################################
+def obtener_huella_configuracion(separ, e_t_c, d_s_c):
+    """
+    Computes the fingerprint of the settings the counters of a file depend on: separator, mandatory fields and reference reliability of each typology, and the configured data sources.
+    Thresholds and data source attributes are not included, as they are applied after the counters.
 
-    return val
+    Parameters
+    ----------
+    separ: char
+           Character to separate values in the .csv data file.
+    e_t_c: ConfiguracionTipologias
+           Compiled event typologies configuration (see compilar_configuracion_tipologias).
+    d_s_c: pandas dataframe
+           Data sources attribute table (see compilar_configuracion_fuentes).
+
+    Returns
+    -------
+    huella: str
+            Hexadecimal sha1 of the settings.
+    """
+
+    tipologias = dict(e_t_c.tipologias, **{'Default Section': e_t_c.por_defecto})
+    configuracion = [VERSION_ESTADO, separ, sorted(str(fuente) for fuente in d_s_c.index),
+                     sorted((tip, list(conf.campos_obligatorios), conf.veracidad_referencia) for tip, conf in tipologias.items())]
+
+
+    return hashlib.sha1(json.dumps(configuracion).encode(ENCODING)).hexdigest()
 
 
 
 ###############################################################################
-def eliminar_tildes(val):
+def cargar_estado(separ, e_t_c, d_s_c):
     """
-    Remove tildes from evaluation dataframe's typology variable.
+    Loads the state store of the incremental evaluation: the counters (CAMPOS_ESTADO) of each Event typology - Data source pair of each file evaluated in previous runs, with the size, modification time and content hash of the file.
+    If the store does not exist, can not be read, or was saved with other settings (see obtener_huella_configuracion), an empty store is returned and every file is evaluated again.
 
     Parameters
     ----------
-    val: pandas dataframe
-         Evaluation structure for each Data source - Event typology.
+    separ: char
+           Character to separate values in the .csv data file.
+    e_t_c: ConfiguracionTipologias
+           Compiled event typologies configuration (see compilar_configuracion_tipologias).
+    d_s_c: pandas dataframe
+           Data sources attribute table (see compilar_configuracion_fuentes).
 
     Returns
     -------
-    val: pandas dataframe
-         Evaluation structure for each Data source - Event typology.
+    estado: dict
+            State store of the incremental evaluation.
 
     Example
     -------
-    >>> eliminar_tildes(valoracion)
-    Returns evaluation dataframe updated (without tildes in typology variable).
+    >>> cargar_estado(separador, event_typology_config, data_source_config)
+    {'huella_configuracion': '3f2a...', 'ficheros': {'/datos/input/muestra_0100.csv': {...}, ...}}
     """
 
-    val['Tipologia'] = val['Tipologia'].apply(lambda x: unicodedata.normalize('NFKD', x.decode('utf-8')).encode('utf-8').decode('ascii', 'ignore'))
+    huella = obtener_huella_configuracion(separ, e_t_c, d_s_c)
+    estado = {'huella_configuracion': huella, 'ficheros': {}}
+
+    path_estado = os.path.join(TEMP_DIR, FICHERO_ESTADO)
+    if os.path.exists(path_estado):
+        try:
+            with open(path_estado, 'r', encoding=ENCODING) as fichero:
+                estado_guardado = json.load(fichero)
+        except (OSError, ValueError):
+            print(WARNING_MSG_104 % path_estado)
+            return estado
+        if estado_guardado.get('huella_configuracion') == huella:
+            estado = estado_guardado
 
 
-    return val
+    return estado
 
 
 
 ###############################################################################
-def process_chunk(data, d_s_p, e_t_p):
-    '''
-    Process a data chunk from a data file and creates the evaluation structure for the data contained within.
+def recuperar_ficheros(estado, lis_fic, d_s_c):
+    """
+    Finds the input files whose counters can be taken from the state store, and rebuilds their running evaluation structures.
+    A file is unchanged if its size and modification time are the stored ones or, when only the modification time changed, if its content hash is the stored one.
+    The hash is only computed in that case, so new files are not read twice: it is stored when a file whose modification time changed is evaluated again, and files evaluated for the first time are stored without it.
 
     Parameters
     ----------
-    data: pandas.Dataframe
-          A chunk from a data file
-    d_s_p: ConfigParser
-           Datasources configuration structure
-    e_t_p: ConfigParser
-           Event typologies configuration structure
+    estado: dict
+            State store of the incremental evaluation (see cargar_estado).
+    lis_fic: list
+             List of data sample files.
+    d_s_c: pandas dataframe
+           Data sources attribute table (see compilar_configuracion_fuentes).
 
     Returns
     -------
-    valoracion: pandas.DataFrame
-                Evaluation structure for each Data source - Event typology in the chunk
+    resultados: dict
+                Running evaluation structure and unknown data sources of each unchanged file.
+    pendientes: list
+                New or changed files, to be evaluated.
+    huellas: dict
+             Size, modification time and content hash (None if it was not needed) of each file to be evaluated, taken before reading it.
+    """
 
-    Example
+    resultados = {}
+    pendientes = []
+    huellas = {}
+    for path in lis_fic:
+        propiedades = os.stat(os.path.join(BASE_PATH, INPUT_DIR, path))
+        huella = {'tamano': propiedades.st_size, 'mtime': propiedades.st_mtime_ns}
+        huella['hash'] = None
+        guardado = estado['ficheros'].get(path)
+
+        if guardado is not None and guardado['tamano'] == huella['tamano']:
+            if guardado['mtime'] != huella['mtime']:
+                huella['hash'] = calcular_hash_fichero(path)
+                if guardado['hash'] == huella['hash']:
+                    guardado['mtime'] = huella['mtime']
+            if guardado['mtime'] == huella['mtime']:
+                resultados[path] = [restaurar_contadores(guardado['contadores'], d_s_c), set(guardado['fuentes_desconocidas'])]
+                continue
+
+        huellas[path] = huella
+        pendientes.append(path)
+
+
+    return resultados, pendientes, huellas
+
+
+
+###############################################################################
+def restaurar_contadores(contadores, d_s_c):
+    """
+    Rebuilds the running evaluation structure of a file from its stored counters, with the current attributes of each data source.
+
+    Parameters
+    ----------
+    contadores: dict or None
+                Stored counters (CAMPOS_ESTADO) of each pair of the file. None if the file has no rows.
+    d_s_c: pandas dataframe
+           Data sources attribute table (see compilar_configuracion_fuentes).
+
+    Returns
     -------
-    >>> process_chunk(chunk, data_source_parser, event_typology_parser)
-    Returns evaluation dataframe updated (quantity, completeness, reliability and severity dimensions).
-    '''
+    val: pandas dataframe or None
+         Running evaluation structure of the file, indexed by Tipologia and Data source.
+    """
 
-    #try:
-    # data.to_csv('chunks/%f.csv' % np.random.random(), header=True, index=False)
-    pairs = list(set(zip(data[FIELD_TYPOLOGY], data[FIELD_DATA_SOURCE])))
-    tip_fue = pd.DataFrame(data=pairs, columns=[FIELD_TYPOLOGY, FIELD_DATA_SOURCE])
-    valoracion = inicializar_estructura_valoracion(tip_fue, d_s_p)
-    lista_tipologias = list(set(valoracion['Tipologia']))
-    data = eliminar_columnas_innecesarias(data, e_t_p, lista_tipologias)
-    data = redefinir_datos_fiabilidad_severidad(data)
+    if contadores is None:
+        return None
 
-    # itera solo sobre los pares tipologia - fuente que sabemos que están presentes
-    for tipologia, fuente in zip(valoracion['Tipologia'], valoracion['Data source']):
-        data_aux = data[(data[FIELD_TYPOLOGY] == tipologia) & (data[FIELD_DATA_SOURCE] == fuente)]
+    contadores = pd.DataFrame(contadores, columns=CAMPOS_ESTADO)
+    pares = pd.DataFrame({FIELD_TYPOLOGY: contadores['Tipologia'], FIELD_DATA_SOURCE: contadores['Data source']})
+    val = inicializar_estructura_valoracion(pares, d_s_c)
+    for campo in CAMPOS_ESTADO[len(SORT_FIELDS):]:
+        val[campo] = contadores[campo].values
 
-        # Calculo de medidas relacionadas con la dimension de CANTIDAD (I):
-        #       La cantidad normalizada y el nivel de calidad se calcularan al
-        #       final del proceso, ya que necesitan utilizar los datos de todas
-        #       las fuentes
-        cantidad = int(len(data_aux))
-            # Índice del par tipologia-fuente en la estructura de valoracion
-        i = np.nonzero(((valoracion['Tipologia'] == tipologia) & (valoracion['Data source'] == fuente)))[0][0]
-        valoracion.loc[i, 'Cantidad'] += cantidad
 
-        # Calculo de medidas relacionadas con la dimension de COMPLETITUD:
-        valoracion = valorar_completitud(valoracion, data_aux, i, tipologia, e_t_p)
+    return acumular_valoracion(None, val)
 
-        # Calculo de medidas relacionadas con la dimension de VERACIDAD:
-        valoracion = valorar_veracidad(valoracion, data_aux, i, tipologia, e_t_p)
 
-        # Calculo de medidas relacionadas con la dimension de RELEVANCIA:
-        valoracion = valorar_relevancia(valoracion, data_aux, i)
 
-    #except Exception as e:
-    #    log.error(str(e))
+###############################################################################
+def guardar_estado(estado, lis_fic, resultados, huellas):
+    """
+    Saves the state store of the incremental evaluation, with the counters of the files evaluated in this run. Files that are no longer in the input directory are removed from the store.
+    The store is written to a temporary file and then renamed, so an interrupted run does not leave it half written.
 
-#    valoracion = eliminar_tildes(valoracion)
+    Parameters
+    ----------
+    estado: dict
+            State store of the incremental evaluation (see cargar_estado).
+    lis_fic: list
+             List of data sample files.
+    resultados: dict
+                Running evaluation structure and unknown data sources of each file.
+    huellas: dict
+             Size, modification time and content hash of each evaluated file (see recuperar_ficheros).
 
+    Returns
+    -------
+    None
+    """
 
-    return valoracion
+    ficheros = {}
+    for path in lis_fic:
+        if path not in huellas:
+            ficheros[path] = estado['ficheros'][path]
+            continue
+        val, fuentes_desconocidas = resultados[path]
+        contadores = None
+        if val is not None:
+            contadores = {campo: valores.tolist() for campo, valores in val.reset_index()[CAMPOS_ESTADO].items()}
+        ficheros[path] = dict(huellas[path], fuentes_desconocidas=sorted(fuentes_desconocidas), contadores=contadores)
+    estado['ficheros'] = ficheros
 
-# Posible problema: tener una lista de 10 ** 6 o más estructuras de valoración
-# parciales si el número de chunks totales es muy elevado. En este caso
-# sería mejor que process_chunk no devolviese la estrucutra de valoración
-# sino que la guardase con to_csv(mode='a'). Luego se podría leer el archivo
-# resultante por chunks y ejecutar compute_valoracion progresivamente.
+    makedir(TEMP_DIR)
+    path_estado = os.path.join(TEMP_DIR, FICHERO_ESTADO)
+    with open(path_estado + '.tmp', 'w', encoding=ENCODING) as fichero:
+        json.dump(estado, fichero)
+    os.replace(path_estado + '.tmp', path_estado)
 
 
 
 ###############################################################################
-def valorar_dimensiones(lis_fic, separ, d_s_p, e_t_p):
+def finalizar_valoracion_dimensiones(val, fuentes_desconocidas):
     """
-    Obtiene estructuras de evalucación para todos los ficheros de entrada.
+    Closes the evaluation of all input files: warns once about the data sources that are not defined in the configuration file, and checks that at least one pair could be evaluated.
+    If no data source of the data sample is defined in the configuration file, or the input files have no rows, the program returns an error and ends.
 
     Parameters
     ----------
-    lis_fic: list.
-             List of data sample files .csv, contained in the input directory.
-    separ: char
-           Character to separate values in the .csv data file.
-    d_s_p: ConfigParser
-           Datasource configuration structure
-    e_t_p: ConfigParser
-           Event typologies configuration structure
+    val: pandas dataframe or None
+         Running evaluation structure (see acumular_valoracion). None if there were no chunks.
+    fuentes_desconocidas: set
+                          Data sources not defined in the configuration file.
 
     Returns
     -------
@@ -928,26 +3152,16 @@ def valorar_dimensiones(lis_fic, separ, d_s_p, e_t_p):
 
     Example
     -------
-    >>> valorar_dimensiones(lista_ficheros_input, separador, data_source_parser, event_typology_parser)
-    Returns evaluation dataframe updated (quantity, completeness, reliability and severity dimensions).
-    Results are separated by chunks.
+    >>> finalizar_valoracion_dimensiones(valoracion_acumulada, {'Fuente9'})
+    WARNING: Data source Fuente9 configuration could not be loaded. Please, check file data_source.ini
+    [Returns the running evaluation dataframe.]
     """
 
-    val = pd.DataFrame()
-    i = 0
-    for path in lis_fic:
-        reader = cargar_fichero_muestra_by_chunks(path, separ)
-        for chunk in reader:
-            val_aux = pd.DataFrame()
-            val_aux = process_chunk(chunk, d_s_p, e_t_p)
-            val = val.append(val_aux)
-            del chunk
-            del val_aux
-            i += 1
-#            print('Chunk número', i)
-            gc.collect()
-        reader.close()
-        del reader
+    avisar_fuentes_desconocidas(fuentes_desconocidas)
+
+    if val is None or val.empty:
+        print(ERROR_MSG_205)
+        sys.exit()
 
 
     return val
@@ -955,14 +3169,15 @@ def valorar_dimensiones(lis_fic, separ, d_s_p, e_t_p):
 
 
 ###############################################################################
-def compute_valoracion(valoracion_chunks):
-    '''xxxREV
-    Combine all of the partial evaluation strucutres computed per chunk.
+def compute_valoracion(valoracion_acumulada):
+    '''
+    Finalizes the running evaluation structure accumulated chunk by chunk with acumular_valoracion.
+    ADDITION_FIELDS are already summed for each Event typology - Data source pair, so it only sorts the pairs and restores the column layout of the evaluation structure.
 
     Parameters
     ----------
-    valoracion_chunks: list<pandas.DataFrame>
-        A list of all the evaluation structures computed per chunk
+    valoracion_acumulada: pandas.DataFrame
+        Running evaluation structure, indexed by Tipologia and Data source.
 
     Returns
     -------
@@ -970,35 +3185,48 @@ def compute_valoracion(valoracion_chunks):
         Evaluation structure for each Data source - Event typology.
     '''
 
-#    res = pd.concat(valoracion_chunks)
-#    del valoracion_chunks
+    # Ordena las filas por tipologia y fuente y recupera ambos campos como
+    # columnas, con un índice de enteros ascendentes y contiguos
+    valoracion = valoracion_acumulada.sort_index().reset_index()
+
+
+    return valoracion
+
+
 
-    # Selecciona únicamente los valores para los cuales tiene sentido sumar
-    grouped = valoracion_chunks[CONCATENATION_FIELDS]
+###############################################################################
+def redondear(valores, decimales):
+    """
+    Rounds an array of values with the same result as the built-in round applied to each one.
+    numpy rounding scales the values, so it can differ from round for values that are almost halfway between two roundings; only those values are rounded one by one.
 
-    # Agrupa por tipologia y fuente y suma
-    grouped = grouped.groupby(by=SORT_FIELDS, as_index=False).sum(axis=0)
+    Parameters
+    ----------
+    valores: numpy array
+             Values to be rounded (float).
+    decimales: int
+               Number of decimals.
 
-    # Genera una estructura de valoracion con una sola fila para cada par
-    # tipologia-fuente y ordena las filas por tipologia y fuente
-    # Este ordenamiento se hace para despues poder insertar las columnas
-    # con las dimensiones sumadas anteriores
-    valoracion = valoracion_chunks.drop_duplicates(subset=SORT_FIELDS).sort_values(by=SORT_FIELDS)
+    Returns
+    -------
+    redondeados: numpy array
+                 Rounded values.
 
-    # Ordena la suma por tipologia-fuente. Así las filas de valoracion y
-    # grouped estarán alineadas
-    grouped = grouped.sort_values(by=SORT_FIELDS)
+    Example
+    -------
+    >>> redondear(np.array([2 / 3, 0.0005]), 3)
+    array([0.667, 0.001])
+    """
 
-    # Se reinicia el índice para que consista en enteros ascendentes y
-    # contiguos. Si no se hace esto, la siguiente sentencia fracasará
-    # horriblemente
-    valoracion.reset_index(inplace=True, drop=True)
+    valores = np.asarray(valores, dtype=float)
+    redondeados = np.round(valores, decimales)
 
-    # Sustituye los valores sumados en la estrucutra de valoración
-    valoracion[ADDITION_FIELDS] = grouped[ADDITION_FIELDS]
+    escalados = valores * 10 ** decimales
+    dudosos = np.abs(escalados - np.floor(escalados) - 0.5) < 1e-6
+    redondeados[dudosos] = [round(float(valor), decimales) for valor in valores[dudosos]]
 
 
-    return valoracion
+    return redondeados
 
 
 
@@ -1066,27 +3294,12 @@ def valorar_precio_por_dato(val, d_p):
     Returns evaluation dataframe updated (price per data dimension).
     """
 
-    # Diccionario para almacenar las cantidades de datos totales aportadas por cada tipología
-    dict_cantidad_por_fuente = {}
-    for fuente in set(val['Data source']):
-        df_aux = val[val['Data source'] == fuente]
-        total = sum(df_aux['Cantidad'])
-        dict_aux = {fuente: total}
-        dict_cantidad_por_fuente.update(dict_aux)
+    # Cantidad total de datos aportada por cada fuente, alineada con las filas
+    #   de valoracion
+    cantidad_fuente = val.groupby('Data source')['Cantidad'].transform('sum').astype(float)
 
-    del df_aux
-
-    # Se recorre el datasource de valoración y se va completando el dato de precio por dato
-    for i in range(len(val)):
-        fue = val.loc[i, 'Data source']
-
-        # Cálculo del precio por dato para la tipologia-fuente actual
-        precio = val.loc[i, 'Precio']
-        cantidad_fuente = dict_cantidad_por_fuente.get(fue)
-        precio_por_dato = (float(precio) * float(d_p)) / (float(cantidad_fuente) * 365)
-        precio_por_dato = round(precio_por_dato, 6)
-
-        val.loc[i, 'Precio por dato'] = precio_por_dato
+    precio_por_dato = (val['Precio'].astype(float) * float(d_p)) / (cantidad_fuente * 365)
+    val['Precio por dato'] = redondear(precio_por_dato.values, 6)
 
 
     return val
@@ -1114,27 +3327,59 @@ def calcular_cantidad_normalizada(val):
     [Returns evaluation dataframe updated (normalized quantity dimension).]
     """
 
-    # Diccionario para almacenar los datos máximos de una tipología, aportados por una sola fuente
-    dict_tipologias_maximo = {}
-    for tipologia in set(val['Tipologia']):
-        df_aux = val[val['Tipologia'] == tipologia]
-        maximo = max(df_aux['Cantidad'])
-        dict_aux = {tipologia: maximo}
-        dict_tipologias_maximo.update(dict_aux)
+    # Máximo de datos de la tipología aportado por una sola fuente, alineado
+    #   con las filas de valoracion
+    maximo_tipologia = val.groupby('Tipologia')['Cantidad'].transform('max').astype(float)
+
+    cantidad_normalizada = val['Cantidad'].astype(float) / maximo_tipologia
+    val['Cantidad normalizada'] = redondear(cantidad_normalizada.values, 3)
+
+
+    return val
+
+
+
+###############################################################################
+def calcular_valores_normalizados(val):
+    """
+    It calculates the normalized values of completeness, information level, accuracy (reliability and unknow reliability) and relevance dimensions (Quality dimension divided by Quantity).
+
+    Parameters
+    ----------
+    val: pandas dataframe
+         Evaluation structure for each Data source - Event typology.
+
+    Returns
+    -------
+    val: pandas dataframe
+         Evaluation structure for each Data source - Event typology.
+
+    Example
+    -------
+    >>> calcular_cantidad_normalizada(valoracion)
+    [Returns evaluation dataframe updated (normalized values of completeness, information level, accuracy and relevance dimensions).]
+    """
 
-    del df_aux
+    cantidad = val['Cantidad'].astype(float)
 
-    # Se recorre el datasource de valoración y se va completando el campo de cantidad normalizada
-    for i in range(len(val)):
-        tip = val.loc[i, 'Tipologia']
+    # Dimensiones normalizadas respecto de la cantidad
+    for dimension in ['Completitud',
+                      'Veracidad',
+                      'Veracidad desconocida',
+                      'Relevancia alta',
+                      'Relevancia media',
+                      'Relevancia baja',
+                      'Relevancia desconocida']:
+        normalizada = val[dimension].astype(float) / cantidad
+        val[dimension + ' normalizada'] = redondear(normalizada.values, 3)
 
-        # Cálculo de la cantidad normalizada para la tipologia-fuente actual
-        cantidad = val.loc[i, 'Cantidad']
-        maximo_tipologia = dict_tipologias_maximo.get(tip)
-        cantidad_normalizada = float(cantidad) / float(maximo_tipologia)
-        cantidad_normalizada = round(cantidad_normalizada, 3)
+    # Nivel de informacion normalizado respecto del número de campos obligatorios
+    nivel_informacion_normalizada = val['Nivel de informacion'].astype(float) / val['Numero campos obligatorios'].astype(float)
+    val['Nivel de informacion normalizada'] = redondear(nivel_informacion_normalizada.values, 3)
 
-        val.loc[i, 'Cantidad normalizada'] = cantidad_normalizada
+    # Una vez hemos calculado el nivel de información normalizado, borramos la columna 'Numero
+    #   campos obligatorios' del dataframe, ya que no se va a utilizar más.
+    val.drop(['Numero campos obligatorios'], axis='columns', inplace=True)
 
 
     return val
@@ -1142,14 +3387,17 @@ def calcular_cantidad_normalizada(val):
 
 
 ###############################################################################
-def calcular_valores_normalizados(val):
+def calcular_precio_normalizado(val, e_t_c):
     """
-    It calculates the normalized values of completeness, information level, accuracy (reliability and unknow reliability) and relevance dimensions (Quality dimension divided by Quantity).
+    Evaluates economic value of the data.
+    It calculates the normalized economic value of the data (Price per data Reference price for this typology).
 
     Parameters
     ----------
     val: pandas dataframe
          Evaluation structure for each Data source - Event typology.
+    e_t_c: ConfiguracionTipologias
+           Compiled event typologies configuration (see compilar_configuracion_tipologias).
 
     Returns
     -------
@@ -1158,57 +3406,16 @@ def calcular_valores_normalizados(val):
 
     Example
     -------
-    >>> calcular_cantidad_normalizada(valoracion)
-    [Returns evaluation dataframe updated (normalized values of completeness, information level, accuracy and relevance dimensions).]
+    >>> calcular_precio_normalizado(valoracion, event_typology_config)
+    [Returns evaluation dataframe updated (normalized price per data dimension).]
     """
 
-    for i in range(len(val)):
-        cantidad = val.loc[i, 'Cantidad']
-
-        # Completitud normalizada
-        completitud_normalizada = float(val.loc[i, 'Completitud']) / float(cantidad)
-        completitud_normalizada = round(completitud_normalizada, 3)
-        val.loc[i, 'Completitud normalizada'] = completitud_normalizada
-
-        # Nivel de informacion normalizada
-        numero_campos_obligatorios = val.loc[i, 'Numero campos obligatorios']
-        nivel_informacion_normalizada = float(val.loc[i, 'Nivel de informacion']) / float(numero_campos_obligatorios)
-        nivel_informacion_normalizada = round(nivel_informacion_normalizada, 3)
-        val.loc[i, 'Nivel de informacion normalizada'] = nivel_informacion_normalizada
-
-        # Veracidad normalizada
-        veracidad_normalizada = float(val.loc[i, 'Veracidad']) / float(cantidad)
-        veracidad_normalizada = round(veracidad_normalizada, 3)
-        val.loc[i, 'Veracidad normalizada'] = veracidad_normalizada
-
-        # Veracidad desconocida normalizada
-        veracidad_desconocida_normalizada = float(val.loc[i, 'Veracidad desconocida']) / float(cantidad)
-        veracidad_desconocida_normalizada = round(veracidad_desconocida_normalizada, 3)
-        val.loc[i, 'Veracidad desconocida normalizada'] = veracidad_desconocida_normalizada
-
-        # Relevancia alta normalizada
-        relevancia_alta_normalizada = float(val.loc[i, 'Relevancia alta']) / float(cantidad)
-        relevancia_alta_normalizada = round(relevancia_alta_normalizada, 3)
-        val.loc[i, 'Relevancia alta normalizada'] = relevancia_alta_normalizada
-
-        # Relevancia media normalizada
-        relevancia_media_normalizada = float(val.loc[i, 'Relevancia media']) / float(cantidad)
-        relevancia_media_normalizada = round(relevancia_media_normalizada, 3)
-        val.loc[i, 'Relevancia media normalizada'] = relevancia_media_normalizada
-
-        # Relevancia baja normalizada
-        relevancia_baja_normalizada = float(val.loc[i, 'Relevancia baja']) / float(cantidad)
-        relevancia_baja_normalizada = round(relevancia_baja_normalizada, 3)
-        val.loc[i, 'Relevancia baja normalizada'] = relevancia_baja_normalizada
+    # Precio de referencia de la tipología de cada fila
+    precio_referencia = np.array([obtener_configuracion_tipologia(tip, e_t_c).precio_por_dato_referencia
+                                  for tip in val['Tipologia']], dtype=float)
 
-        # Relevancia desconocida normalizada
-        relevancia_desconocida_normalizada = float(val.loc[i, 'Relevancia desconocida']) / float(cantidad)
-        relevancia_desconocida_normalizada = round(relevancia_desconocida_normalizada, 3)
-        val.loc[i, 'Relevancia desconocida normalizada'] = relevancia_desconocida_normalizada
-
-    # Una vez hemos calculado el nivel de información normalizado, borramos la columna 'Numero
-    #   campos obligatorios' del dataframe, ya que no se va a utilizar más.
-    val.drop(['Numero campos obligatorios'], axis='columns', inplace=True)
+    precio_por_dato_normalizada = val['Precio por dato'].astype(float).values / precio_referencia
+    val['Precio por dato normalizada'] = redondear(precio_por_dato_normalizada, 6)
 
 
     return val
@@ -1216,17 +3423,16 @@ def calcular_valores_normalizados(val):
 
 
 ###############################################################################
-def calcular_precio_normalizado(val, e_t_p):
+def normalizar_valoracion(val, e_t_c):
     """
-    Evaluates economic value of the data.
-    It calculates the normalized economic value of the data (Price per data Reference price for this typology).
+    Calculates all the normalized quality dimensions at once: quantity (see calcular_cantidad_normalizada), completeness, information level, accuracy and relevance (see calcular_valores_normalizados) and price per data (see calcular_precio_normalizado).
 
     Parameters
     ----------
     val: pandas dataframe
          Evaluation structure for each Data source - Event typology.
-    e_t_p: ConfigParser
-           Event typologies configuration structure
+    e_t_c: ConfiguracionTipologias
+           Compiled event typologies configuration (see compilar_configuracion_tipologias).
 
     Returns
     -------
@@ -1235,18 +3441,13 @@ def calcular_precio_normalizado(val, e_t_p):
 
     Example
     -------
-    >>> calcular_precio_normalizado(valoracion, event_typology_parser)
-    [Returns evaluation dataframe updated (normalized price per data dimension).]
+    >>> normalizar_valoracion(valoracion, event_typology_config)
+    [Returns evaluation dataframe updated (normalized dimensions).]
     """
 
-    for i in range(len(val)):
-        tipologia = val.loc[i, 'Tipologia']
-        precio_por_dato = float(val.loc[i, 'Precio por dato'])
-        precio_referencia = obtener_parametro('precio_por_dato_referencia', tipologia, e_t_p)
-        precio_por_dato_normalizada = float(precio_por_dato) / float(precio_referencia)
-        precio_por_dato_normalizada = round(precio_por_dato_normalizada, 6)
-
-        val.loc[i, 'Precio por dato normalizada'] = precio_por_dato_normalizada
+    val = calcular_cantidad_normalizada(val)
+    val = calcular_valores_normalizados(val)
+    val = calcular_precio_normalizado(val, e_t_c)
 
 
     return val
@@ -1283,207 +3484,201 @@ def obtener_segundos(cadena):
 
 
 ###############################################################################
-def calcular_niveles(val, e_t_p):
+def convertir_valores_umbral(parametro, valores):
     """
-    It sets quality level (good, acceptable or bad) in each quality dimension.
+    Converts the values of a quality dimension, or its thresholds, into numbers that can be compared: hh:mm:ss frequencies into seconds and consistency levels into their numeric equivalence.
 
     Parameters
     ----------
-    val: pandas dataframe
-       Time value in seconds.
+    parametro: string
+               Prefix of the dimension thresholds in the configuration file (see DIMENSIONES_NIVELES).
+    valores: pandas series
+             Values of the dimension.
+
+    Returns
+    -------
+    numericos: numpy array
+               Numeric values (float).
 
     Example
     -------
-    >>> obtener_segundos('01:30:45')
-    5445
+    >>> convertir_valores_umbral('consistencia', pd.Series(['Media', 'Alta']))
+    array([1., 2.])
     """
 
-    tupla = cadena.split(":")
-    segs = int(tupla[0]) * 3600 + int(tupla[1]) * 60 + int(tupla[0])
+    if parametro == 'frecuencia':
+        valores = valores.map({cadena: obtener_segundos(cadena) for cadena in set(valores)})
+    elif parametro == 'consistencia':
+        valores = valores.map(EQUIVALENCIA_CONSISTENCIA_NUMERICA)
 
 
-    return segs
+    return valores.astype(float).values
 
 
 
 ###############################################################################
-def calcular_niveles(val, e_t_p):
+def obtener_tabla_umbrales(tipologias, e_t_c):
     """
-    It sets quality level (good, acceptable or bad) in each quality dimension.
+    Builds the table of thresholds of the quality levels: one row per typology and one column per minimo / deseado parameter, already converted into numbers.
 
     Parameters
     ----------
-    val: pandas dataframe
-         Evaluation structure for each Data source - Event typology.
-    e_t_p: ConfigParser
-           Event typologies configuration structure
+    tipologias: list
+                Event typologies.
+    e_t_c: ConfiguracionTipologias
+           Compiled event typologies configuration (see compilar_configuracion_tipologias).
 
     Returns
     -------
-    val: pandas dataframe
-         Evaluation structure for each Data source - Event typology.
+    tabla: pandas dataframe
+           Thresholds table, indexed by typology.
 
     Example
     -------
-    calcular_niveles(valoracion, event_typology_parser)
-    [Returns evaluation dataframe updated (levels).]
+    >>> obtener_tabla_umbrales(['Tipologia1'], event_typology_config)
+    [It returns a dataframe with a row for Tipologia1 and columns cantidad_minimo, cantidad_deseado, ..., precio_por_dato_deseado.]
     """
 
-    for i in range(len(val)):
-        tip = val.loc[i, 'Tipologia']
-
-        # Asignación del nivel de cantidad
-        cantidad_normalizada = val.loc[i, 'Cantidad normalizada']
-        umbral_deseado = float(obtener_parametro('cantidad_deseado', tip, e_t_p))
-        umbral_minimo = float(obtener_parametro('cantidad_minimo', tip, e_t_p))
-
-        if cantidad_normalizada >= umbral_deseado:
-            nivel = GOOD_LEVEL
-        elif (cantidad_normalizada >= umbral_minimo) & (cantidad_normalizada < umbral_deseado):
-            nivel = ACCEPTABLE_LEVEL
-        else:
-            nivel = BAD_LEVEL
-        val.loc[i, 'Cantidad nivel'] = nivel
-
-        del umbral_deseado, umbral_minimo, nivel
+    tipologias = list(tipologias)
+    tabla = pd.DataFrame([obtener_configuracion_tipologia(tip, e_t_c).umbrales for tip in tipologias],
+                         index=tipologias, columns=UmbralesTipologia._fields, dtype=float)
 
-        # Asignación del nivel de completitud
-        completitud_normalizada = val.loc[i, 'Completitud normalizada']
-        umbral_deseado = float(obtener_parametro('completitud_deseado', tip, e_t_p))
-        umbral_minimo = float(obtener_parametro('completitud_minimo', tip, e_t_p))
 
-        if completitud_normalizada >= umbral_deseado:
-            nivel = GOOD_LEVEL
-        elif (completitud_normalizada >= umbral_minimo) & (completitud_normalizada < umbral_deseado):
-            nivel = ACCEPTABLE_LEVEL
-        else:
-            nivel = BAD_LEVEL
+    return tabla
 
-        val.loc[i, 'Completitud nivel'] = nivel
 
-        del umbral_deseado, umbral_minimo, nivel
 
-        # Asignación del nivel de nivel de información
-        nivel_de_informacion_normalizada = val.loc[i, 'Nivel de informacion normalizada']
-        umbral_deseado = float(obtener_parametro('nivel_de_informacion_deseado', tip, e_t_p))
-        umbral_minimo = float(obtener_parametro('nivel_de_informacion_minimo', tip, e_t_p))
+###############################################################################
+def asignar_niveles(valores, minimo, deseado, mayor_es_mejor):
+    """
+    Assigns the quality level (good, acceptable or bad) of a dimension to many values at once, comparing each one with its own thresholds.
 
-        if nivel_de_informacion_normalizada >= umbral_deseado:
-            nivel = GOOD_LEVEL
-        elif (nivel_de_informacion_normalizada >= umbral_minimo) & (nivel_de_informacion_normalizada < umbral_deseado):
-            nivel = ACCEPTABLE_LEVEL
-        else:
-            nivel = BAD_LEVEL
+    Parameters
+    ----------
+    valores: numpy array
+             Values of the dimension.
+    minimo: numpy array
+            Minimum threshold for each value.
+    deseado: numpy array
+             Desired threshold for each value.
+    mayor_es_mejor: bool
+                    True if higher values are better, False if lower values are better.
 
-        val.loc[i, 'Nivel de informacion nivel'] = nivel
+    Returns
+    -------
+    niveles: numpy array
+             GOOD_LEVEL, ACCEPTABLE_LEVEL or BAD_LEVEL for each value.
 
-        del umbral_deseado, umbral_minimo, nivel
+    Example
+    -------
+    >>> asignar_niveles(np.array([0.9, 0.7, 0.1]), np.array([0.6] * 3), np.array([0.8] * 3), True)
+    array([2, 1, 0])
+    """
 
-        # Asignación del nivel de veracidad
-        veracidad_normalizada = val.loc[i, 'Veracidad normalizada']
-        umbral_deseado = float(obtener_parametro('veracidad_deseado', tip, e_t_p))
-        umbral_minimo = float(obtener_parametro('veracidad_minimo', tip, e_t_p))
+    if mayor_es_mejor:
+        bueno = valores >= deseado
+        aceptable = (valores >= minimo) & (valores < deseado)
+    else:
+        bueno = valores <= deseado
+        aceptable = (valores <= minimo) & (valores > deseado)
 
-        if veracidad_normalizada >= umbral_deseado:
-            nivel = GOOD_LEVEL
-        elif (veracidad_normalizada >= umbral_minimo) & (veracidad_normalizada < umbral_deseado):
-            nivel = ACCEPTABLE_LEVEL
-        else:
-            nivel = BAD_LEVEL
 
-        val.loc[i, 'Veracidad nivel'] = nivel
+    return np.select([bueno, aceptable], [GOOD_LEVEL, ACCEPTABLE_LEVEL], BAD_LEVEL)
 
-        del umbral_deseado, umbral_minimo, nivel
 
-        # Asignación del nivel de veracidad desonocida
-        veracidad_desconocida_normalizada = val.loc[i, 'Veracidad desconocida normalizada']
-        umbral_deseado = float(obtener_parametro('veracidad_desconocida_deseado', tip, e_t_p))
-        umbral_minimo = float(obtener_parametro('veracidad_desconocida_minimo', tip, e_t_p))
 
-        if veracidad_desconocida_normalizada <= umbral_deseado:
-            nivel = GOOD_LEVEL
-        elif (veracidad_desconocida_normalizada <= umbral_minimo) & (veracidad_desconocida_normalizada > umbral_deseado):
-            nivel = ACCEPTABLE_LEVEL
-        else:
-            nivel = BAD_LEVEL
+###############################################################################
+def calcular_niveles(val, e_t_c):
+    """
+    It sets quality level (good, acceptable or bad) in each quality dimension.
+    Thresholds of each typology are taken from the compiled configuration into a table, which is joined to the evaluation structure, so the levels of each dimension are assigned to all rows with vectorized comparisons.
 
-        val.loc[i, 'Veracidad desconocida nivel'] = nivel
+    Parameters
+    ----------
+    val: pandas dataframe
+         Evaluation structure for each Data source - Event typology.
+    e_t_c: ConfiguracionTipologias
+           Compiled event typologies configuration (see compilar_configuracion_tipologias).
 
-        del umbral_deseado, umbral_minimo, nivel
+    Returns
+    -------
+    val: pandas dataframe
+         Evaluation structure for each Data source - Event typology.
 
-        # Asignación del nivel de frecuencia
-        frecuencia_normalizada = val.loc[i, 'Frecuencia normalizada']
-        frecuencia_umbral_deseado = obtener_parametro('frecuencia_deseado', tip, e_t_p)
-        frecuencia_umbral_minimo = obtener_parametro('frecuencia_minimo', tip, e_t_p)
+    Example
+    -------
+    calcular_niveles(valoracion, event_typology_config)
+    [Returns evaluation dataframe updated (levels).]
+    """
 
-            # Conversión de los datos a segundos, para poder compararlos
-        frecuencia_normalizada_seg = obtener_segundos(frecuencia_normalizada)
-        frecuencia_umbral_deseado_seg = obtener_segundos(frecuencia_umbral_deseado)
-        frecuencia_umbral_minimo_seg = obtener_segundos(frecuencia_umbral_minimo)
+    # Tabla de umbrales de cada tipología, alineada con las filas de valoracion
+    tabla_umbrales = obtener_tabla_umbrales(set(val['Tipologia']), e_t_c)
+    umbrales = tabla_umbrales.reindex(val['Tipologia'])
 
-        if frecuencia_normalizada_seg <= frecuencia_umbral_deseado_seg:
-            nivel = GOOD_LEVEL
-        elif (frecuencia_normalizada_seg <= frecuencia_umbral_minimo_seg) & (frecuencia_normalizada_seg > frecuencia_umbral_deseado_seg):
-            nivel = ACCEPTABLE_LEVEL
-        else:
-            nivel = BAD_LEVEL
+    for dimension, parametro, mayor_es_mejor in DIMENSIONES_NIVELES:
+        valores = convertir_valores_umbral(parametro, val[dimension + ' normalizada'])
+        minimo = umbrales[parametro + '_minimo'].values
+        deseado = umbrales[parametro + '_deseado'].values
+        val[dimension + ' nivel'] = asignar_niveles(valores, minimo, deseado, mayor_es_mejor)
 
-        val.loc[i, 'Frecuencia nivel'] = nivel
 
-        del nivel
+    return val
 
-        #Asignación del nivel de consistencia
-        consistencia_normalizada = val.loc[i, 'Consistencia normalizada']
-        consistencia_umbral_deseado = obtener_parametro('consistencia_deseado', tip, e_t_p)
-        consistencia_umbral_minimo = obtener_parametro('consistencia_minimo', tip, e_t_p)
 
-            # Conversión de los datos a numéricos, para poder compararlos
-        consistencia_normalizada_numerica = EQUIVALENCIA_CONSISTENCIA_NUMERICA.get(consistencia_normalizada)
-        consistencia_umbral_deseado_numerico = EQUIVALENCIA_CONSISTENCIA_NUMERICA.get(consistencia_umbral_deseado)
-        consistencia_umbral_minimo_numerico = EQUIVALENCIA_CONSISTENCIA_NUMERICA.get(consistencia_umbral_minimo)
 
-        if consistencia_normalizada_numerica >= consistencia_umbral_deseado_numerico:
-            nivel = GOOD_LEVEL
-        elif (consistencia_normalizada_numerica >= consistencia_umbral_minimo_numerico) & (consistencia_normalizada_numerica < consistencia_umbral_deseado_numerico):
-            nivel = ACCEPTABLE_LEVEL
-        else:
-            nivel = BAD_LEVEL
+###############################################################################
+def calcular_calidad(niveles, pesos):
+    """
+    Calculates the quality of many Data source - Event typology pairs at once: each level is replaced by its weight with a lookup array, and the weights of each row are averaged.
+    Levels without weight score 0.
 
-        val.loc[i, 'Consistencia nivel'] = nivel
+    Parameters
+    ----------
+    niveles: numpy array
+             Matrix of levels, one row per pair and one column per quality dimension.
+    pesos: dict
+           Weight of each level.
 
-        del nivel
+    Returns
+    -------
+    calidad: numpy array
+             Quality of each pair, rounded to 3 decimals.
 
-        #Asignación del nivel de precio por dato
-        precio_por_dato_normalizada = val.loc[i, 'Precio por dato normalizada']
-        umbral_deseado = float(obtener_parametro('precio_por_dato_deseado', tip, e_t_p))
-        umbral_minimo = float(obtener_parametro('precio_por_dato_minimo', tip, e_t_p))
+    Example
+    -------
+    >>> calcular_calidad(np.array([[2, 2, 1, 0], [2, 2, 2, 2]]), PESOS_NIVELES)
+    array([0.375, 1.   ])
+    """
 
-        if precio_por_dato_normalizada <= umbral_deseado:
-            nivel = GOOD_LEVEL
-        elif (precio_por_dato_normalizada <= umbral_minimo) & (precio_por_dato_normalizada > umbral_deseado):
-            nivel = ACCEPTABLE_LEVEL
-        else:
-            nivel = BAD_LEVEL
+    niveles = np.asarray(niveles, dtype=float)
 
-        val.loc[i, 'Precio por dato nivel'] = nivel
+    tabla_pesos = np.zeros(int(max(pesos)) + 1)
+    for nivel, peso in pesos.items():
+        tabla_pesos[nivel] = peso
 
-        del umbral_deseado, umbral_minimo, nivel
+    validos = np.isin(niveles, list(pesos))
+    puntuaciones = np.where(validos, tabla_pesos[np.where(validos, niveles, 0).astype(int)], 0.0)
+    calidad = puntuaciones.sum(axis=1) / niveles.shape[1]
 
 
-    return val
+    return redondear(calidad, 3)
 
 
 
 ###############################################################################
-def valorar_calidad_tipologia(val):
+def valorar_calidad_tipologia(val, dimensiones=DIMENSIONES, pesos=PESOS_NIVELES):
     """
     Evaluates datasource quality level in each tipology.
-    The quality is calculated using the levels in each data quality dimension, and applying the evaluation weights.
+    The quality is calculated using the levels in each data quality dimension, and applying the evaluation weights (see calcular_calidad).
 
     Parameters
     ----------
     val: pandas dataframe
          Evaluation structure for each Data source - Event typology.
+    dimensiones: list
+                 Level columns of the quality dimensions that score for the quality.
+    pesos: dict
+           Weight of each level (GOOD_LEVEL, ACCEPTABLE_LEVEL and BAD_LEVEL).
 
     Returns
     -------
@@ -1496,23 +3691,7 @@ def valorar_calidad_tipologia(val):
     Returns evaluation dataframe updated (quality for each typology).
     """
 
-    for i in range(len(val)):
-        calidad = 0.0
-        for dim in DIMENSIONES:
-            puntuacion = val.loc[i, dim]
-            if puntuacion == GOOD_LEVEL:
-                calidad = calidad + W1
-            elif puntuacion == ACCEPTABLE_LEVEL:
-                calidad = calidad + W2
-            elif puntuacion == BAD_LEVEL:
-                calidad = calidad + W3
-            else:
-                pass
-
-        calidad = calidad / len(DIMENSIONES)
-        calidad = round(calidad, 3)
-
-        val.loc[i, 'Calidad'] = calidad
+    val['Calidad'] = calcular_calidad(val[list(dimensiones)].values, pesos)
 
 
     return val
@@ -1522,8 +3701,8 @@ def valorar_calidad_tipologia(val):
 ###############################################################################
 def valorar_exclusividad(val):
     """
-    Evaluates datasource quality level in each tipology.
-    The quality is calculated using the levels in each data quality dimension, and applying the evaluation weights.
+    Evaluates datasource exclusivity in each tipology: the other data sources that provide data of the same typology.
+    The list of data sources of each typology is built once, with a single groupby.
 
     Parameters
     ----------
@@ -1537,21 +3716,16 @@ def valorar_exclusividad(val):
 
     Example
     -------
-    >>> valorar_calidad_tipologia(valoracion)
-    Returns evaluation dataframe updated (quality for each typology).
+    >>> valorar_exclusividad(valoracion)
+    Returns evaluation dataframe updated (exclusivity for each typology).
     """
 
-    for i in range(len(val)):
-        tip = val.loc[i, 'Tipologia']
-        val_aux = val[val['Tipologia'] == tip]
-        val_aux = val_aux.reset_index()
-        lista_fuentes = []
-        for j in range(len(val_aux)):
-            if (val_aux.loc[j, 'Data source']) != (val.loc[i, 'Data source']):
-                lista_fuentes.append(val_aux.loc[j, 'Data source'])
+    # Fuentes de cada tipología, en el orden de las filas de valoracion
+    fuentes_tipologia = val.groupby('Tipologia', sort=False)['Data source'].agg(list).to_dict()
 
-        lista_fuentes_cadena = ', '.join(lista_fuentes)
-        val.loc[i, 'Exclusividad'] = lista_fuentes_cadena
+    # La exclusividad de cada fila es la lista de las demás fuentes de su tipología
+    val['Exclusividad'] = [', '.join([fuente for fuente in fuentes_tipologia[tip] if fuente != fue])
+                           for tip, fue in zip(val['Tipologia'], val['Data source'])]
 
 
     return val
@@ -1579,51 +3753,27 @@ def valorar_calidad_global(val):
     Returns datasource quality evaluation dataframe.
     """
 
-    val_fuentes = pd.DataFrame(columns=(FIELD_DATA_SOURCE,
-                                        'Tipo',
-                                        'Tipologias',
-                                        'Valoracion datos obsoletos',
-                                        'Tasa falsos positivos',
-                                        'Tasa datos duplicados',
-                                        'Precio',
-                                        'Valoracion manual',
-                                        'Calidad',
-                                        'Diversidad',
-                                        'Total'))
-
     total_tip = len(set(val['Tipologia']))
 
-    for fuente in set(val['Data source']):
-        df_aux = val[val['Data source'] == fuente]
-        t_f = df_aux.loc[df_aux.index[0], 'Data source type']
-        tip = len(df_aux)
-        vdo = df_aux.loc[df_aux.index[0], 'Valoracion datos obsoletos']
-        tfp = df_aux.loc[df_aux.index[0], 'Tasa falsos positivos']
-        tdd = df_aux.loc[df_aux.index[0], 'Tasa datos duplicados']
-        pre = df_aux.loc[df_aux.index[0], 'Precio']
-        pre = round(pre, 2)
-        v_m = df_aux.loc[df_aux.index[0], 'Valoracion manual']
-        cal = df_aux['Calidad'].mean()
-        cal = round(cal, 3)
-        div = float(tip) / float(total_tip)
-        div = round(div, 3)
-        tot = cal + div
-        tot = round(tot, 3)
-
-        val_fuentes = val_fuentes.append({FIELD_DATA_SOURCE: fuente,
-                                          'Tipo': t_f,
-                                          'Tipologias': tip,
-                                          'Precio': pre,
-                                          'Valoracion datos obsoletos': vdo,
-                                          'Tasa falsos positivos': tfp,
-                                          'Tasa datos duplicados': tdd,
-                                          'Valoracion manual': v_m,
-                                          'Calidad': cal,
-                                          'Diversidad': div,
-                                          'Total': tot
-                                         }, ignore_index=True)
-
-    del df_aux
+    # Atributos estáticos de cada fuente (los de su primera fila), calidad
+    #   media y número de tipologías, en una sola agregación. La calidad
+    #   media se calcula con Series.mean, que suma de forma distinta a la
+    #   media de groupby y puede cambiar el redondeo
+    val_fuentes = val.groupby('Data source', sort=True).agg(**{'Tipo': ('Data source type', 'first'),
+                                                              'Tipologias': ('Tipologia', 'size'),
+                                                              'Valoracion datos obsoletos': ('Valoracion datos obsoletos', 'first'),
+                                                              'Tasa falsos positivos': ('Tasa falsos positivos', 'first'),
+                                                              'Tasa datos duplicados': ('Tasa datos duplicados', 'first'),
+                                                              'Precio': ('Precio', 'first'),
+                                                              'Valoracion manual': ('Valoracion manual', 'first'),
+                                                              'Calidad': ('Calidad', lambda calidad: calidad.mean())})
+    val_fuentes.index.name = FIELD_DATA_SOURCE
+    val_fuentes = val_fuentes.reset_index()
+
+    val_fuentes['Precio'] = redondear(val_fuentes['Precio'].values, 2)
+    val_fuentes['Calidad'] = redondear(val_fuentes['Calidad'].values, 3)
+    val_fuentes['Diversidad'] = redondear(val_fuentes['Tipologias'].values / float(total_tip), 3)
+    val_fuentes['Total'] = redondear(val_fuentes['Calidad'].values + val_fuentes['Diversidad'].values, 3)
 
 
     return val_fuentes
@@ -1648,167 +3798,253 @@ def encode_image(path_to_image):
 
 
 
+###############################################################################
+@lru_cache(maxsize=None)
+def obtener_entorno_plantillas():
+    """
+    Gets the Jinja environment of the report templates. It is created once per process, so the templates are loaded and compiled only the first time they are used.
+
+    Parameters
+    ----------
+    None
+
+    Returns
+    -------
+    env: jinja2 Environment
+         Environment that loads the templates from the program directory.
+
+    Example
+    -------
+    >>> obtener_entorno_plantillas().get_template('report_ranking.html')
+    <Template 'report_ranking.html'>
+    """
+
+
+    return Environment(loader=FileSystemLoader(BASE_PATH))
+
+
+
+###############################################################################
+def formatear_cabecera(columnas):
+    """
+    Gets the column names shown in the header of a report table: the data source column is shown as FUENTE.
+
+    Parameters
+    ----------
+    columnas: list
+              Column names of the table.
+
+    Returns
+    -------
+    cabecera: list
+              Names shown in the header.
+
+    Example
+    -------
+    >>> formatear_cabecera(['Data source', 'Calidad'])
+    ['Fuente de datos', 'Calidad']
+    """
+
+
+    return [FUENTE if columna in [DATA_SOURCE, FIELD_DATA_SOURCE] else columna for columna in columnas]
+
+
+
+###############################################################################
+def formatear_filas(df):
+    """
+    Converts the rows of a report table into lists of texts, with comma as decimal separator.
+
+    Parameters
+    ----------
+    df: pandas dataframe
+        Table to be shown in a report.
+
+    Returns
+    -------
+    filas: list
+           One list of texts per row.
+
+    Example
+    -------
+    >>> formatear_filas(pd.DataFrame({'Data source': ['Fuente1'], 'Calidad': [0.5]}))
+    [['Fuente1', '0,5']]
+    """
+
+
+    return [[str(valor).replace('.', ',') for valor in fila] for fila in df.itertuples(index=False)]
+
+
+
+###############################################################################
+def formatear_tabla_niveles(df):
+    """
+    Prepares a table of normalized values for the reports: the level columns are not shown, but they give the level of their normalized column.
+    Normalized values with level use comma as decimal separator; the rest of the values are shown as they are.
+
+    Parameters
+    ----------
+    df: pandas dataframe
+        Normalized values and levels ('<dimension> normalizada' and '<dimension> nivel' columns).
+
+    Returns
+    -------
+    cabecera: list
+              Names shown in the header.
+    filas: list
+           One list of texts per row.
+    niveles: list
+             One list per row with the level of each value (None for values without level).
+
+    Example
+    -------
+    >>> formatear_tabla_niveles(df_normalized_typology)
+    [It returns the header, the rows and the levels of the normalized values table.]
+    """
+
+    atributos = [columna for columna in df.columns if 'nivel' not in columna]
+    columnas_nivel = [atributo.replace('normalizada', 'nivel') for atributo in atributos]
+    con_nivel = [columna in df.columns and 'nivel' in columna for columna in columnas_nivel]
+
+    cabecera = [atributo.replace(' normalizada', '') for atributo in formatear_cabecera(atributos)]
+
+    filas = []
+    for fila in df[atributos].itertuples(index=False):
+        filas.append([str(valor).replace('.', ',') if nivel else str(valor) for valor, nivel in zip(fila, con_nivel)])
+
+    niveles = []
+    for fila in df[[columna for columna, nivel in zip(columnas_nivel, con_nivel) if nivel]].itertuples(index=False):
+        valores_nivel = iter(fila)
+        niveles.append([next(valores_nivel) if nivel else None for nivel in con_nivel])
+
+
+    return cabecera, filas, niveles
+
+
+
+###############################################################################
+def escribir_pdf(renderizado, pdf_resultante):
+    """
+    Converts a rendered html report into a pdf file. The html is passed to pisa through an in-memory buffer, so no intermediate file is written and any number of reports can be converted at the same time.
+    pisa reports most conversion failures in its result instead of raising them, so they are raised here (and the partial pdf is removed) to be counted with the rest of failed reports (see generar_informes).
+
+    Parameters
+    ----------
+    renderizado: string
+                 Rendered html of the report.
+    pdf_resultante: string
+                    Path of the pdf file.
+
+    Returns
+    -------
+    None
+
+    Example
+    -------
+    >>> escribir_pdf(template.render(template_vars), os.path.join(path, 'Ranking fuentes.pdf'))
+    [It writes the pdf report Ranking fuentes.pdf.]
+    """
+
+    with io.StringIO(renderizado) as html:
+        with open(pdf_resultante, "wb") as fichero_pdf:
+            resultado = pisa.CreatePDF(html, fichero_pdf)
+
+    if resultado.err:
+        os.remove(pdf_resultante)
+        errores = [mensaje for tipo, _, mensaje, _ in resultado.log if tipo == 'error']
+        raise RuntimeError(ERROR_MSG_214 % (resultado.err, '; '.join(errores)))
+
+
+
 ###############################################################################
 def crear_report_fuentes(path, tit, fue_dat, lista_cabecera, df_fuente_obs, df_raw_data, df_quality_data, df_normalized_data, lista_valoracion):
     """
-    XXX
+    Generates the pdf report of a data source, rendering the template report_fuentes.html in a single pass.
+
+    Parameters
+    ----------
+    path: string
+          Output directory.
+    tit: string
+         Report title.
+    fue_dat: string
+             Data source.
+    lista_cabecera: list
+                    Data source attributes shown in the global information table.
+    df_fuente_obs: pandas dataframe
+                   Data source evaluation (a single row of valorar_calidad_global).
+    df_raw_data: pandas dataframe
+                 Raw values of each typology of the data source.
+    df_quality_data: pandas dataframe
+                     Quality and exclusivity of each typology of the data source.
+    df_normalized_data: pandas dataframe
+                        Normalized values and levels of each typology of the data source.
+    lista_valoracion: list
+                      Final evaluation attributes.
+
+    Returns
+    -------
+    None
+
+    Example
+    -------
+    >>> crear_report_fuentes(path_to_output, TITULO_FUENTES, 'Fuente1', ['Tipo', 'Precio'], obs, df_raw, df_quality, df_normalized, ['Calidad', 'Diversidad', 'Total'])
+    [It generates the report Informe_fuente_Fuente1.pdf.]
     """
 
-    env = Environment(loader=FileSystemLoader('.'))
-    ruta_plantilla_temporal = 'temp_html.html'
-    template = env.get_template('general_execution_template.html')
+    pdf_resultante = os.path.join(path, "Informe_fuente_"+fue_dat+".pdf")
+    cabecera_normalizados, filas_normalizados, niveles_normalizados = formatear_tabla_niveles(df_normalized_data)
 
     template_vars = {"title": tit,
                      "sufijo_title": fue_dat,
-                     "general_information_execution": '',
-                     #"logo": encode_image(os.path.join(BASE_PATH,"logo.jpg").replace('\'',''))
-                     "logo": os.path.join(BASE_PATH, "logo.jpg").replace('\'', '')
+                     "logo": os.path.join(BASE_PATH, "logo.jpg").replace('\'', ''),
+                     "cabecera_global": lista_cabecera,
+                     "valores_global": formatear_filas(df_fuente_obs[lista_cabecera])[0],
+                     "cabecera_bruto": list(df_raw_data.columns),
+                     "filas_bruto": formatear_filas(df_raw_data),
+                     "cabecera_normalizados": cabecera_normalizados,
+                     "filas_normalizados": filas_normalizados,
+                     "niveles_normalizados": niveles_normalizados,
+                     "clases_niveles": CLASES_NIVELES,
+                     "cabecera_calidad": list(df_quality_data.columns),
+                     "filas_calidad": formatear_filas(df_quality_data),
+                     "cabecera_valoracion": lista_valoracion,
+                     "valores_valoracion": formatear_filas(df_fuente_obs[lista_valoracion].astype(float).round(3))[0]
                     }
 
-    # Datos globales de la fuente
-    tabla_formateada = "<h3>Informacion global de la fuente de datos:</h3>"
-    tabla_formateada += "<table width='100%' border='1' cellspacing='0' cellpadding='2'>"
-    tabla_formateada += "<tr>"
-    for atributo in lista_cabecera:
-        tabla_formateada += "<td align='center' class='black'><strong>" + str(atributo) + "</strong></td>"
-    tabla_formateada += "</tr><tr>"
-    for atributo in lista_cabecera:
-        tabla_formateada += "<td align='center'>" + (str(df_fuente_obs[atributo].values[0])).replace('.', ',') + "</td>"
-    tabla_formateada += "</tr></table>"
-
-#    template_vars["general_information_execution"] = tabla_formateada
-
-    # Datos en crudo
-    tabla_formateada += "<br/><h3>Datos en bruto por tipologia:</h3>"
-    tabla_formateada += "<table width='100%' border='1' cellspacing='0' cellpadding='2'><tr>"
-    for nombre_atributo in df_raw_data.columns:
-        if nombre_atributo == EVENT_TYPOLOGY:
-            # tabla_formateada += "<td align='center' class='black letra ancho' colspan='2'>" + nombre_atributo + "</td>"
-            tabla_formateada += "<td align='center' class='black letra ancho' >" + nombre_atributo + "</td>"
-        else:
-            tabla_formateada += "<td align='center' class='black letra ancho' >" + nombre_atributo + "</td>"
-    tabla_formateada += "</tr>"
-    for ind in range(len(df_raw_data)):
-        obs = df_raw_data.iloc[ind:ind+1]
-        tabla_formateada += "<tr>"
-        for atributo in obs.columns:
-            if atributo == EVENT_TYPOLOGY:
-                # tabla_formateada += "<td align='center' colspan='2'>" + (str(obs[atributo].values[0])).replace('.', ',') + "</td>"
-                tabla_formateada += "<td align='center'>" + (str(obs[atributo].values[0])).replace('.', ',') + "</td>"
-            else:
-                tabla_formateada += "<td align='center'>" + (str(obs[atributo].values[0])).replace('.', ',') + "</td>"
-        tabla_formateada += "</tr>"
-    tabla_formateada += "</table>"
-
-    # Datos normalizados
-    tabla_formateada += "<br/><h3>Datos normalizados por tipologia:</h3>"
-    tabla_formateada += "<table width='100%' border='1' cellspacing='0' cellpadding='2'>"
-    nombres_columnas_datos_normalizados = df_normalized_data.columns
-    lista_atributos_normalizados = []
-    lista_nombres_niveles = []
-
-    for elemento in nombres_columnas_datos_normalizados:
-        if 'nivel' not in elemento:
-            lista_atributos_normalizados.append(elemento)
-        else:
-            lista_nombres_niveles.append(elemento)
+    # Generamos el html y, a partir de él, el pdf
+    renderizado = obtener_entorno_plantillas().get_template('report_fuentes.html').render(template_vars)
+    escribir_pdf(renderizado, pdf_resultante)
 
-    tabla_formateada += "<tr>"
 
-    # Imprimimos cabecera
-    for elemento in lista_atributos_normalizados:
-        if elemento == EVENT_TYPOLOGY:
-            # tabla_formateada += "<td align='center' class='black letra ancho' colspan='2'>" + elemento + "</td>"
-            tabla_formateada += "<td align='center' class='black letra ancho'>" + elemento + "</td>"
-        else:
-            elemento = elemento.replace(' normalizada', '')
-            tabla_formateada += "<td align='center' class='black letra ancho'>" + elemento + "</td>"
-    tabla_formateada += "</tr>"
-
-    # Imprimimos datos normalizados
-    for ind in range(len(df_normalized_data)):
-        tabla_formateada += "<tr>"
-        obs = df_normalized_data.iloc[ind:ind+1]
-#        print(obs)
-        for nombre_atributo in lista_atributos_normalizados:
-            valor = obs[nombre_atributo].values[0]
-#            print(valor)
-            nombre_atributo_nivel = nombre_atributo.replace('normalizada', 'nivel')
-#            print(nombre_atributo_nivel)
-            atributo_nivel = ''
-            if nombre_atributo_nivel in lista_nombres_niveles:
-                atributo_nivel = obs[nombre_atributo_nivel].values[0]
-                if atributo_nivel == 0:
-                    tabla_formateada += "<td class='bad' align='center'>" + (str(valor)).replace('.', ',') + "</td>"
-                elif atributo_nivel == 1:
-                    tabla_formateada += "<td class='acceptable' align='center'>" + (str(valor)).replace('.', ',') + "</td>"
-                elif atributo_nivel == 2:
-                    tabla_formateada += "<td class='good' align='center'>" + (str(valor)).replace('.', ',') + "</td>"
-            else:
-                if nombre_atributo_nivel == EVENT_TYPOLOGY:
-                    #tabla_formateada += "<td align='center' colspan='2'>" + (str(valor)).replace('.', ',') + "</td>"
-                    tabla_formateada += "<td align='center'>" + str(valor) + "</td>"
-                else:
-                    tabla_formateada += "<td align='center'>" + str(valor) + "</td>"
-        tabla_formateada += "</tr>"
-    tabla_formateada += "</table>"
-
-
-    # Valoración por tipología
-    tabla_formateada += "<br/><h3>Evaluacion por tipologia:</h3>"
-    tabla_formateada += "<table align='center' width='60%' border='1' cellspacing='0' cellpadding='2'><tr>"
-    for nombre_atributo in df_quality_data.columns:
-        tabla_formateada += "<td align='center' class='black letra ancho' >" + nombre_atributo + "</td>"
-    tabla_formateada += "</tr>"
-    for ind in range(len(df_quality_data)):
-        obs = df_quality_data.iloc[ind:ind+1]
-        tabla_formateada += "<tr>"
-        for atributo in obs.columns:
-            tabla_formateada += "<td align='center'>" + (str(obs[atributo].values[0])).replace('.', ',') + "</td>"
-        tabla_formateada += "</tr>"
-    tabla_formateada += "</table>"
-
-
-    # Valoracion final
-    tabla_formateada += "<br/><h3>Evaluacion final:</h3>"
-    tabla_formateada += "<table align='center' width='60%' border='1' cellspacing='0' cellpadding='2'>"
-    tabla_formateada += "<tr>"
-    for atributo in lista_valoracion:
-        tabla_formateada += "<td align='center' class='black'><strong>" + str(atributo) + "</strong></td>"
-    tabla_formateada += "</tr><tr>"
-    for atributo in lista_valoracion:
-        tabla_formateada += "<td align='center'>" + (str(round(df_fuente_obs[atributo].values[0], 3))).replace('.', ',') + "</td>"
-    tabla_formateada += "</tr></table>"
-
-    template_vars["general_information_execution"] = tabla_formateada
-
-    # Generamos el html
-    with codecs.open(ruta_plantilla_temporal, 'w', encoding='utf-8') as output_file:
-        renderizado = template.render(template_vars)
-        output_file.write(renderizado)
-
-#        output_file = codecs.open(ruta_plantilla_temporal, mode="w", encoding="utf8")
-#        renderizado = template.render(template_vars)
-#        output_file.write(renderizado.decode("utf8", "replace"))
-
-    # Generamos el pdf
-    with codecs.open(ruta_plantilla_temporal, 'r') as html_leido:
-#        pdf_resultante = os.path.join('.', "Informe_"+fuente_datos+".pdf")
-        pdf_resultante = os.path.join(path, "Informe_fuente_"+fue_dat+".pdf")
-        with open(pdf_resultante, "wb") as fichero_intermedio:
-            pisa.CreatePDF(html_leido.read(), fichero_intermedio)  # ,encoding='cp1252')
-    if os.path.exists(ruta_plantilla_temporal):
-        os.remove(ruta_plantilla_temporal)
-
-
-
-###############################################################################
-def generar_informe_fuentes(val, val_fuentes):
+
+###############################################################################
+def generar_informe_fuentes(val, val_fuentes, n_procesos=N_PROCESOS_INFORMES):
     """
-    XXX
+    Generates the pdf report of each data source. Reports are rendered in a pool of processes (see generar_informes).
+
+    Parameters
+    ----------
+    val: pandas dataframe
+         Evaluation structure for each Data source - Event typology.
+    val_fuentes: pandas dataframe
+                 Data source evaluation structure.
+    n_procesos: int
+                Number of processes rendering reports.
+
+    Returns
+    -------
+    fallos: list
+            Name and error of each report that could not be generated.
+
+    Example
+    -------
+    >>> generar_informe_fuentes(valoracion, valoracion_fuentes)
+    [It generates a report Informe_fuente_<fuente>.pdf for each data source in the output directory.]
     """
 
     path_to_output = os.path.join(BASE_PATH, OUTPUT_DIR)
+    tareas = []
     for i in range(len(val_fuentes)):
         obs = val_fuentes.iloc[i:i+1]
         vendor = obs[FIELD_DATA_SOURCE].values[0]
@@ -1816,245 +4052,251 @@ def generar_informe_fuentes(val, val_fuentes):
         df_raw_typology_data = df_tipologia_vendor[['Tipologia', 'Cantidad', 'Completitud', 'Nivel de informacion', 'Veracidad', 'Veracidad desconocida', 'Frecuencia', 'Consistencia', 'Relevancia alta', 'Relevancia media', 'Relevancia baja', 'Relevancia desconocida', 'Precio por dato']]
         df_normalized_typology = df_tipologia_vendor[['Tipologia', 'Cantidad normalizada', 'Completitud normalizada', 'Nivel de informacion normalizada', 'Veracidad normalizada', 'Veracidad desconocida normalizada', 'Frecuencia normalizada', 'Consistencia normalizada', 'Relevancia alta normalizada', 'Relevancia media normalizada', 'Relevancia baja normalizada', 'Relevancia desconocida normalizada', 'Precio por dato normalizada', 'Cantidad nivel', 'Completitud nivel', 'Nivel de informacion nivel', 'Veracidad nivel', 'Veracidad desconocida nivel', 'Frecuencia nivel', 'Consistencia nivel', 'Precio por dato nivel']]
         df_quality_tiplogy = df_tipologia_vendor[['Tipologia', 'Calidad', 'Exclusividad']]
-        crear_report_fuentes(path_to_output, TITULO_FUENTES, vendor, ['Tipo', 'Tipologias', 'Valoracion datos obsoletos', 'Tasa falsos positivos', 'Tasa datos duplicados', 'Precio', 'Valoracion manual'], obs, df_raw_typology_data, df_quality_tiplogy, df_normalized_typology, ['Calidad', 'Diversidad', 'Total'])
+        tareas.append(("Informe_fuente_"+str(vendor)+".pdf", crear_report_fuentes,
+                       path_to_output, TITULO_FUENTES, vendor, ['Tipo', 'Tipologias', 'Valoracion datos obsoletos', 'Tasa falsos positivos', 'Tasa datos duplicados', 'Precio', 'Valoracion manual'], obs, df_raw_typology_data, df_quality_tiplogy, df_normalized_typology, ['Calidad', 'Diversidad', 'Total']))
+
+
+    return generar_informes(tareas, n_procesos)
 
 
 
 ###############################################################################
 def crear_report_tipologias(path, tit, tip, df_raw_data, df_normalized_data, df_quality_data):
     """
-    XXX
+    Generates the pdf report of an event typology, rendering the template report_tipologias.html in a single pass.
+
+    Parameters
+    ----------
+    path: string
+          Output directory.
+    tit: string
+         Report title.
+    tip: string
+         Event typology.
+    df_raw_data: pandas dataframe
+                 Raw values of each data source of the typology.
+    df_normalized_data: pandas dataframe
+                        Normalized values and levels of each data source of the typology.
+    df_quality_data: pandas dataframe
+                     Quality of each data source of the typology.
+
+    Returns
+    -------
+    None
+
+    Example
+    -------
+    >>> crear_report_tipologias(path_to_output, TITULO_TIPOLOGIAS, 'IP Bot', df_raw, df_normalized, df_quality)
+    [It generates the report Informe_tipologia_IP Bot.pdf.]
     """
 
-    env = Environment(loader=FileSystemLoader('.'))
-    ruta_plantilla_temporal = 'temp_html.html'
-    template = env.get_template('general_execution_template.html')
+    pdf_resultante = os.path.join(path, "Informe_tipologia_"+tip+".pdf")
+    cabecera_normalizados, filas_normalizados, niveles_normalizados = formatear_tabla_niveles(df_normalized_data)
 
     template_vars = {"title": tit,
                      "sufijo_title": tip,
-                     "general_information_execution": '',
-                     #"logo": encode_image(os.path.join(BASE_PATH,"logo.jpg").replace('\'',''))
-                     "logo": os.path.join(BASE_PATH, "logo.jpg").replace('\'', '')
+                     "logo": os.path.join(BASE_PATH, "logo.jpg").replace('\'', ''),
+                     "cabecera_bruto": formatear_cabecera(df_raw_data.columns),
+                     "filas_bruto": formatear_filas(df_raw_data),
+                     "cabecera_normalizados": cabecera_normalizados,
+                     "filas_normalizados": filas_normalizados,
+                     "niveles_normalizados": niveles_normalizados,
+                     "clases_niveles": CLASES_NIVELES,
+                     "cabecera_calidad": formatear_cabecera(df_quality_data.columns),
+                     "filas_calidad": formatear_filas(df_quality_data)
                     }
 
-    # Datos en crudo
-    tabla_formateada = "<br/><h3>Datos en bruto por fuente de datos:</h3>"
-    tabla_formateada += "<table width='100%' border='1' cellspacing='0' cellpadding='2'><tr>"
-    for nombre_atributo in df_raw_data.columns:
-        if nombre_atributo == DATA_SOURCE:
-            nombre_atributo = FUENTE
-            #tabla_formateada += "<td align='center' class='black letra ancho' colspan='2'>" + nombre_atributo + "</td>"
-            tabla_formateada += "<td align='center' class='black letra ancho' >" + nombre_atributo + "</td>"
-        else:
-            tabla_formateada += "<td align='center' class='black letra ancho' >" + nombre_atributo + "</td>"
-    tabla_formateada += "</tr>"
-    for ind in range(len(df_raw_data)):
-        obs = df_raw_data.iloc[ind:ind+1]
-        tabla_formateada += "<tr>"
-        for atributo in obs.columns:
-            if atributo == DATA_SOURCE:
-                #tabla_formateada += "<td align='center' colspan='2'>" + (str(obs[atributo].values[0])).replace('.', ',') + "</td>"
-                tabla_formateada += "<td align='center'>" + (str(obs[atributo].values[0])).replace('.', ',') + "</td>"
-            else:
-                tabla_formateada += "<td align='center'>" + (str(obs[atributo].values[0])).replace('.', ',') + "</td>"
-        tabla_formateada += "</tr>"
-    tabla_formateada += "</table>"
-
-    # Datos normalizados
-    tabla_formateada += "<br/><h3>Datos normalizados por fuente de datos:</h3>"
-    tabla_formateada += "<table width='100%' border='1' cellspacing='0' cellpadding='2'>"
-    nombres_columnas_datos_normalizados = df_normalized_data.columns
-    lista_atributos_normalizados = []
-    lista_nombres_niveles = []
-
-    for elemento in nombres_columnas_datos_normalizados:
-        if 'nivel' not in elemento:
-            lista_atributos_normalizados.append(elemento)
-        else:
-            lista_nombres_niveles.append(elemento)
-
-    tabla_formateada += "<tr>"
-
-    # Imprimimos cabecera
-    for elemento in lista_atributos_normalizados:
-        if elemento == DATA_SOURCE:
-            elemento = FUENTE
-            #tabla_formateada += "<td align='center' class='black letra ancho' colspan='2'>" + elemento + "</td>"
-            tabla_formateada += "<td align='center' class='black letra ancho'>" + elemento + "</td>"
-        else:
-            elemento = elemento.replace(' normalizada', '')
-            tabla_formateada += "<td align='center' class='black letra ancho'>" + elemento + "</td>"
-    tabla_formateada += "</tr>"
-
-    # Imprimimos datos normalizados
-    for ind in range(len(df_normalized_data)):
-        tabla_formateada += "<tr>"
-        obs = df_normalized_data.iloc[ind:ind+1]
-#        print(obs)
-        for nombre_atributo in lista_atributos_normalizados:
-            valor = obs[nombre_atributo].values[0]
-#            print(valor)
-            nombre_atributo_nivel = nombre_atributo.replace('normalizada', 'nivel')
-#            print(nombre_atributo_nivel)
-            atributo_nivel = ''
-            if nombre_atributo_nivel in lista_nombres_niveles:
-                atributo_nivel = obs[nombre_atributo_nivel].values[0]
-                if atributo_nivel == 0:
-                    tabla_formateada += "<td class='bad' align='center'>" + (str(valor)).replace('.', ',') + "</td>"
-                elif atributo_nivel == 1:
-                    tabla_formateada += "<td class='acceptable' align='center'>" + (str(valor)).replace('.', ',') + "</td>"
-                elif atributo_nivel == 2:
-                    tabla_formateada += "<td class='good' align='center'>" + (str(valor)).replace('.', ',') + "</td>"
-            else:
-                if nombre_atributo_nivel == DATA_SOURCE:
-                    #tabla_formateada += "<td align='center' colspan='2'>" + (str(valor)).replace('.', ',') + "</td>"
-                    tabla_formateada += "<td align='center'>" + str(valor) + "</td>"
-                else:
-                    tabla_formateada += "<td align='center'>" + str(valor) + "</td>"
-        tabla_formateada += "</tr>"
-    tabla_formateada += "</table>"
-
-
-    # Clasificación por calidad
-    tabla_formateada += "<br/><h3>Clasificacion fuentes de datos:</h3>"
-    tabla_formateada += "<table align='center' width='30%' border='1' cellspacing='0' cellpadding='2'><tr>"
-    for nombre_atributo in df_quality_data.columns:
-        if nombre_atributo == DATA_SOURCE:
-            nombre_atributo = FUENTE
-            #tabla_formateada += "<td align='center' class='black letra ancho' colspan='2'>" + nombre_atributo + "</td>"
-            tabla_formateada += "<td align='center' class='black letra ancho' >" + nombre_atributo + "</td>"
-        else:
-            tabla_formateada += "<td align='center' class='black letra ancho' >" + nombre_atributo + "</td>"
-    tabla_formateada += "</tr>"
-    for ind in range(len(df_quality_data)):
-        obs = df_quality_data.iloc[ind:ind+1]
-        tabla_formateada += "<tr>"
-        for atributo in obs.columns:
-            if atributo == DATA_SOURCE:
-                #tabla_formateada += "<td align='center' colspan='2'>" + (str(obs[atributo].values[0])).replace('.', ',') + "</td>"
-                tabla_formateada += "<td align='center'>" + (str(obs[atributo].values[0])).replace('.', ',') + "</td>"
-            else:
-                tabla_formateada += "<td align='center'>" + (str(obs[atributo].values[0])).replace('.', ',') + "</td>"
-        tabla_formateada += "</tr>"
-    tabla_formateada += "</table>"
-
-
-    template_vars["general_information_execution"] = tabla_formateada
+    # Generamos el html y, a partir de él, el pdf
+    renderizado = obtener_entorno_plantillas().get_template('report_tipologias.html').render(template_vars)
+    escribir_pdf(renderizado, pdf_resultante)
 
-    # Generamos el html
-    with codecs.open(ruta_plantilla_temporal, 'w', encoding='utf-8') as output_file:
-        renderizado = template.render(template_vars)
-        output_file.write(renderizado)
 
-#        output_file = codecs.open(ruta_plantilla_temporal, mode="w", encoding="utf8")
-#        renderizado = template.render(template_vars)
-#        output_file.write(renderizado.decode("utf8", "replace"))
 
-    # Generamos el pdf
-    with codecs.open(ruta_plantilla_temporal, 'r') as html_leido:
-#        pdf_resultante = os.path.join('.', "Informe_"+fuente_datos+".pdf")
-        pdf_resultante = os.path.join(path, "Informe_tipologia_"+tip+".pdf")
-        with open(pdf_resultante, "wb") as fichero_intermedio:
-            pisa.CreatePDF(html_leido.read(), fichero_intermedio)  # ,encoding='cp1252')
-    if os.path.exists(ruta_plantilla_temporal):
-        os.remove(ruta_plantilla_temporal)
+###############################################################################
+def generar_informe_tipologias(val, n_procesos=N_PROCESOS_INFORMES):
+    """
+    Generates the pdf report of each event typology. Reports are rendered in a pool of processes (see generar_informes).
 
+    Parameters
+    ----------
+    val: pandas dataframe
+         Evaluation structure for each Data source - Event typology.
+    n_procesos: int
+                Number of processes rendering reports.
 
+    Returns
+    -------
+    fallos: list
+            Name and error of each report that could not be generated.
 
-###############################################################################
-def generar_informe_tipologias(val):
-    """
-    XXX
+    Example
+    -------
+    >>> generar_informe_tipologias(valoracion)
+    [It generates a report Informe_tipologia_<tipologia>.pdf for each event typology in the output directory.]
     """
 
     path_to_output = os.path.join(BASE_PATH, OUTPUT_DIR)
+    tareas = []
     for tipologia in set(val['Tipologia']):
         df_tipologia = val[val['Tipologia'] == tipologia]
-        df_tipologia.sort_values(['Tipologia', 'Calidad', 'Data source'], ascending=[True, False, True], inplace=True)
+        df_tipologia = df_tipologia.sort_values(['Tipologia', 'Calidad', 'Data source'], ascending=[True, False, True])
         df_raw_typology_data = df_tipologia[['Data source', 'Cantidad', 'Completitud', 'Nivel de informacion', 'Veracidad', 'Veracidad desconocida', 'Frecuencia', 'Consistencia', 'Relevancia alta', 'Relevancia media', 'Relevancia baja', 'Relevancia desconocida', 'Precio por dato']]
         df_normalized_typology = df_tipologia[['Data source', 'Cantidad normalizada', 'Completitud normalizada', 'Nivel de informacion normalizada', 'Veracidad normalizada', 'Veracidad desconocida normalizada', 'Frecuencia normalizada', 'Consistencia normalizada', 'Relevancia alta normalizada', 'Relevancia media normalizada', 'Relevancia baja normalizada', 'Relevancia desconocida normalizada', 'Precio por dato normalizada', 'Cantidad nivel', 'Completitud nivel', 'Nivel de informacion nivel', 'Veracidad nivel', 'Veracidad desconocida nivel', 'Frecuencia nivel', 'Consistencia nivel', 'Precio por dato nivel']]
 
         df_quality_tiplogy = df_tipologia[['Data source', 'Calidad']]
 
-        crear_report_tipologias(path_to_output, TITULO_TIPOLOGIAS, tipologia, df_raw_typology_data, df_normalized_typology, df_quality_tiplogy)
+        tareas.append(("Informe_tipologia_"+str(tipologia)+".pdf", crear_report_tipologias,
+                       path_to_output, TITULO_TIPOLOGIAS, tipologia, df_raw_typology_data, df_normalized_typology, df_quality_tiplogy))
+
+
+    return generar_informes(tareas, n_procesos)
 
 
 
 ###############################################################################
 def crear_report_ranking(path, titulo, df_val_fuentes):
     """
-    XXX
+    Generates the pdf report with the ranking of the data sources, rendering the template report_ranking.html in a single pass.
+
+    Parameters
+    ----------
+    path: string
+          Output directory.
+    titulo: string
+            Report title.
+    df_val_fuentes: pandas dataframe
+                    Data sources evaluation, sorted by ranking position.
+
+    Returns
+    -------
+    None
+
+    Example
+    -------
+    >>> crear_report_ranking(path_to_output, TITULO_RANKING, df_valoracion_fuentes)
+    [It generates the report Ranking fuentes.pdf.]
     """
 
-    env = Environment(loader=FileSystemLoader('.'))
-    ruta_plantilla_temporal = 'temp_html.html'
-    template = env.get_template('general_execution_template.html')
+    pdf_resultante = os.path.join(path, "Ranking fuentes"+".pdf")
 
     template_vars = {"title": titulo,
                      "sufijo_title": '',
-                     "general_information_execution": '',
-                     #"logo": encode_image(os.path.join(BASE_PATH,"logo.jpg").replace('\'',''))
-                     "logo": os.path.join(BASE_PATH, "logo.jpg").replace('\'', '')
+                     "logo": os.path.join(BASE_PATH, "logo.jpg").replace('\'', ''),
+                     "cabecera_ranking": formatear_cabecera(df_val_fuentes.columns),
+                     "filas_ranking": formatear_filas(df_val_fuentes)
                     }
 
-    # Clasificación por calidad
-    tabla_formateada = "<br/><h3>Clasificacion de fuentes de datos:</h3>"
-    tabla_formateada += "<table align='center' width='60%' border='1' cellspacing='0' cellpadding='2'><tr>"
-    for nombre_atributo in df_val_fuentes.columns:
-        if nombre_atributo == FIELD_DATA_SOURCE:
-            nombre_atributo = FUENTE
-            #tabla_formateada += "<td align='center' class='black letra ancho' colspan='2'>" + nombre_atributo + "</td>"
-            tabla_formateada += "<td align='center' class='black letra ancho' >" + nombre_atributo + "</td>"
-        else:
-            tabla_formateada += "<td align='center' class='black letra ancho' >" + nombre_atributo + "</td>"
-    tabla_formateada += "</tr>"
-    for ind in range(len(df_val_fuentes)):
-        obs = df_val_fuentes.iloc[ind:ind+1]
-        tabla_formateada += "<tr>"
-        for atributo in obs.columns:
-            if atributo == FIELD_DATA_SOURCE:
-                #tabla_formateada += "<td align='center' colspan='2'>" + (str(obs[atributo].values[0])).replace('.', ',') + "</td>"
-                tabla_formateada += "<td align='center'>" + (str(obs[atributo].values[0])).replace('.', ',') + "</td>"
-            else:
-                tabla_formateada += "<td align='center'>" + (str(obs[atributo].values[0])).replace('.', ',') + "</td>"
-        tabla_formateada += "</tr>"
-    tabla_formateada += "</table>"
+    # Generamos el html y, a partir de él, el pdf
+    renderizado = obtener_entorno_plantillas().get_template('report_ranking.html').render(template_vars)
+    escribir_pdf(renderizado, pdf_resultante)
+
+
+
+###############################################################################
+def generar_informe_ranking(val_fuentes):
+    """
+    Generates the pdf report with the ranking of the data sources.
+
+    Parameters
+    ----------
+    val_fuentes: pandas dataframe
+                 Data source evaluation structure.
+
+    Returns
+    -------
+    fallos: list
+            Name and error of the report, if it could not be generated.
+
+    Example
+    -------
+    >>> generar_informe_ranking(valoracion_fuentes)
+    [It generates the report Ranking fuentes.pdf in the output directory.]
+    """
 
+    path_to_output = os.path.join(BASE_PATH, OUTPUT_DIR)
 
-    template_vars["general_information_execution"] = tabla_formateada
+    df_valoracion_fuentes = val_fuentes[[FIELD_DATA_SOURCE, 'Tipo', 'Precio', 'Calidad', 'Diversidad', 'Total']]
+    df_valoracion_fuentes = df_valoracion_fuentes.sort_values(['Total', 'Calidad', 'Diversidad', FIELD_DATA_SOURCE], ascending=[False, False, False, True])
 
-    # Generamos el html
-    with codecs.open(ruta_plantilla_temporal, 'w', encoding='utf-8') as output_file:
-        renderizado = template.render(template_vars)
-        output_file.write(renderizado)
+    tareas = [("Ranking fuentes"+".pdf", crear_report_ranking, path_to_output, TITULO_RANKING, df_valoracion_fuentes)]
 
-#        output_file = codecs.open(ruta_plantilla_temporal, mode="w", encoding="utf8")
-#        renderizado = template.render(template_vars)
-#        output_file.write(renderizado.decode("utf8", "replace"))
 
-    # Generamos el pdf
-    with codecs.open(ruta_plantilla_temporal, 'r') as html_leido:
-#        pdf_resultante = os.path.join('.', "Informe_"+fuente_datos+".pdf")
-        pdf_resultante = os.path.join(path, "Ranking fuentes"+".pdf")
-        with open(pdf_resultante, "wb") as fichero_intermedio:
-            pisa.CreatePDF(html_leido.read(), fichero_intermedio)  # ,encoding='cp1252')
-    if os.path.exists(ruta_plantilla_temporal):
-        os.remove(ruta_plantilla_temporal)
+    return generar_informes(tareas, 1)
 
 
 
 ###############################################################################
-def generar_informe_ranking(val_fuentes):
+def generar_informes(tareas, n_procesos):
     """
-    XXX
+    Renders a list of pdf reports, each one independently, in a pool of processes (in the current process if n_procesos is 1).
+    A report that fails does not stop the others: its error is collected and returned, so the run can go on and report every failure at the end (see avisar_informes_fallidos).
+
+    Parameters
+    ----------
+    tareas: list
+            One tuple per report: report name, crear_report_* function and its arguments.
+    n_procesos: int
+                Number of processes rendering reports.
+
+    Returns
+    -------
+    fallos: list
+            Name and error message of each report that could not be generated.
+
+    Example
+    -------
+    >>> generar_informes([('Ranking fuentes.pdf', crear_report_ranking, path, TITULO_RANKING, df_valoracion_fuentes)], 1)
+    []
     """
 
-    path_to_output = os.path.join(BASE_PATH, OUTPUT_DIR)
+    fallos = []
+    if n_procesos > 1 and len(tareas) > 1:
+        with ProcessPoolExecutor(max_workers=min(n_procesos, len(tareas))) as ejecutor:
+            futuros = [(tarea[0], ejecutor.submit(*tarea[1:])) for tarea in tareas]
+            for nombre, futuro in futuros:
+                error = futuro.exception()
+                if error is not None:
+                    fallos.append((nombre, str(error)))
+    else:
+        for tarea in tareas:
+            try:
+                tarea[1](*tarea[2:])
+            except Exception as error:
+                fallos.append((tarea[0], str(error)))
 
-    df_valoracion_fuentes = val_fuentes[[FIELD_DATA_SOURCE, 'Tipo', 'Precio', 'Calidad', 'Diversidad', 'Total']]
-    df_valoracion_fuentes.sort_values(['Total', 'Calidad', 'Diversidad', FIELD_DATA_SOURCE], ascending=[False, False, False, True], inplace=True)
 
-    crear_report_ranking(path_to_output, TITULO_RANKING, df_valoracion_fuentes)
+    return fallos
+
+
+
+###############################################################################
+def avisar_informes_fallidos(fallos, n_informes):
+    """
+    Shows the summary of the reports that could not be generated.
+
+    Parameters
+    ----------
+    fallos: list
+            Name and error message of each report that could not be generated (see generar_informes).
+    n_informes: int
+                Number of reports generated or attempted.
+
+    Returns
+    -------
+    None
+
+    Example
+    -------
+    >>> avisar_informes_fallidos([('Informe_fuente_Fuente1.pdf', 'No such file or directory')], 12)
+    WARNING: Report Informe_fuente_Fuente1.pdf could not be generated: No such file or directory
+    WARNING: 1 of 12 reports could not be generated
+    """
+
+    for nombre, error in fallos:
+        print(WARNING_MSG_102 % (nombre, error))
+
+    if fallos:
+        print(WARNING_MSG_103 % (len(fallos), n_informes))
 
 
 
@@ -2072,10 +4314,7 @@ def makedir(directory_path):
         The path of the directory to be created
     '''
 
-    try:
-        os.mkdir(directory_path)
-    except WindowsError:
-        pass
+    os.makedirs(directory_path, exist_ok=True)
 
 
 
@@ -2113,6 +4352,35 @@ def process_valoracion_tipologia(valoracion_tipologia, plot_col):
 
 
 
+###############################################################################
+@lru_cache(maxsize=None)
+def obtener_figura():
+    """
+    Gets the matplotlib figure used to draw the plots. It is created once per process, with the Agg backend and without pyplot, and it is cleared and reused for every plot.
+
+    Parameters
+    ----------
+    None
+
+    Returns
+    -------
+    figura: matplotlib Figure
+            Figure attached to an Agg canvas.
+
+    Example
+    -------
+    >>> obtener_figura()
+    <Figure size 640x480 with 0 Axes>
+    """
+
+    figura = Figure()
+    FigureCanvasAgg(figura)
+
+
+    return figura
+
+
+
 ###############################################################################
 def plot_comparison_sources(valoracion_tipologia, tipologia, dimension, save_path, plot_col):
     '''
@@ -2129,34 +4397,96 @@ def plot_comparison_sources(valoracion_tipologia, tipologia, dimension, save_pat
         The selected data quality dimension
     save_path: str
         Directory in which to save the generated plot
+    plot_col: str
+        Column with the labels of the bars
     '''
 
     plot_kwargs = process_valoracion_tipologia(valoracion_tipologia, plot_col)
-    plt.figure()
-    plt.xticks(rotation=-45)
-    plt.title(u'Valoración de la dimensión %s en % s' % (dimension, tipologia))
+    figura = obtener_figura()
+    figura.clear()
+    ejes = figura.add_subplot(111)
+    ejes.tick_params(axis='x', labelrotation=-45)
+    ejes.set_title(u'Valoración de la dimensión %s en % s' % (dimension, tipologia))
     # Otherwise the scale of the Y axis may be such that the bar will be not visible
-    plt.ylim(bottom=0)
+    ejes.set_ylim(bottom=0)
     index = -(dimension in ['Precio por dato', 'Veracidad desconocida'])
     top = plot_kwargs['height'][index] + plot_kwargs['height'][index] * 0.05
     if not top:
         top = 1
-    plt.ylim(top=top)
-    plt.xlabel(u"Fuentes")
-    plt.ylabel(dimension)
-    plt.bar(**plot_kwargs)
-    plt.savefig(os.path.join(save_path, dimension), bbox_inches='tight')
-    plt.close()
+    ejes.set_ylim(top=top)
+    ejes.set_xlabel(u"Fuentes")
+    ejes.set_ylabel(dimension)
+    ejes.bar(**plot_kwargs)
+    figura.savefig(os.path.join(save_path, dimension), bbox_inches='tight')
+
+
+
+###############################################################################
+def generar_plots_grupo(valoracion_grupo, grupo, plot_col, path, solo_cambios=PLOTS_SOLO_CAMBIOS):
+    '''
+    Generates the comparison plots of every quality dimension for a single typology (or data source).
+    It is the unit of work of each process in generar_plots.
+    If solo_cambios is True, a plot is only drawn again if its data changed since the last run: a fingerprint of the data of each plot is kept in FICHERO_HUELLAS_PLOTS, in the directory of the group.
+
+    Parameters
+    ----------
+    valoracion_grupo: pandas.DataFrame
+                      Evaluation structure for a single typology (or data source).
+    grupo: str
+           The selected typology (or data source)
+    plot_col: str
+              Column with the labels of the bars
+    path: str
+          Directory in which to create the directory of the group
+    solo_cambios: bool
+                  If True, plots whose data have not changed are not drawn again.
+
+    Returns
+    -------
+    n_plots: int
+             Number of plots drawn.
+    '''
+
+    grupo_path = os.path.join(path, grupo)
+    # Crea el directorio para plots de este grupo
+    makedir(grupo_path)
+
+    path_huellas = os.path.join(grupo_path, FICHERO_HUELLAS_PLOTS)
+    huellas = {}
+    if solo_cambios and os.path.exists(path_huellas):
+        with open(path_huellas, 'r', encoding=ENCODING) as fichero:
+            huellas = json.load(fichero)
+
+    n_plots = 0
+    for dim in COMPARISON_PLOTS_DIMENSIONS:
+        # Extrae fuente, dimension en bruto y su nivel.
+        valoracion_dimension = valoracion_grupo[[plot_col, dim, dim + ' nivel']]
+
+        huella = hashlib.sha1(valoracion_dimension.to_csv(index=False).encode(ENCODING)).hexdigest()
+        if solo_cambios and huellas.get(dim) == huella and os.path.exists(os.path.join(grupo_path, dim + '.png')):
+            continue
+
+        # Crea y guarda el plot
+        plot_comparison_sources(valoracion_dimension, grupo, dim, grupo_path, plot_col)
+        huellas[dim] = huella
+        n_plots += 1
+
+    with open(path_huellas, 'w', encoding=ENCODING) as fichero:
+        json.dump(huellas, fichero)
+
+
+    return n_plots
 
 
 
 ###############################################################################
-def generar_plots(valoracion, tipo_plot):
+def generar_plots(valoracion, tipo_plot, n_procesos=N_PROCESOS_INFORMES, solo_cambios=PLOTS_SOLO_CAMBIOS):
     '''
     Generates comparison plots between data sources for each of the the data
     quality dimensions.
     Plots are saved in temp folder by default, with one subfolder for each
     typology and within them, a png plot for each quality dimension.
+    The plots of each typology are drawn in a pool of processes (see generar_plots_grupo).
 
     Parameters
     ----------
@@ -2164,10 +4494,15 @@ def generar_plots(valoracion, tipo_plot):
                 Evaluation structure for each Data source - Event typology.
     tipo_plot: string
                It indicates the plot type: 'Tipología' o 'Data source'
+    n_procesos: int
+                Number of processes drawing plots.
+    solo_cambios: bool
+                  If True, plots whose data have not changed since the last run are not drawn again.
 
     Returns
     -------
-    None
+    n_plots: int
+             Number of plots drawn.
     '''
 
     valoracion = valoracion.copy(deep=True)
@@ -2180,13 +4515,309 @@ def generar_plots(valoracion, tipo_plot):
     # Tipologias evaluadas
     if tipo_plot == 'Data source':
         subdirectorio = 'Fuentes'
-        columna_seleccionada = 'Tipologia' 
+        columna_seleccionada = 'Tipologia'
     elif tipo_plot == 'Tipologia':
         subdirectorio = 'Tipologias'
         columna_seleccionada = 'Data source'
     path = os.path.join(TEMP_DIR, subdirectorio)
     makedir(path)
 
-    tipologias = set(valoracion[tipo_plot])
-    for tip in tipologias:
-        ti
\ No newline at end of file
+    columnas = [columna_seleccionada]
+    for dim in COMPARISON_PLOTS_DIMENSIONS:
+        columnas += [dim, dim + ' nivel']
+
+    tareas = [(valoracion_grupo[columnas], grupo, columna_seleccionada, path, solo_cambios)
+              for grupo, valoracion_grupo in valoracion.groupby(tipo_plot, sort=False)]
+
+    if n_procesos > 1 and len(tareas) > 1:
+        with ProcessPoolExecutor(max_workers=min(n_procesos, len(tareas))) as ejecutor:
+            n_plots = sum(ejecutor.map(generar_plots_grupo, *zip(*tareas)))
+    else:
+        n_plots = sum(generar_plots_grupo(*tarea) for tarea in tareas)
+
+
+    return n_plots
+
+
+
+###############################################################################
+# Functions for instrumentation                                               #
+###############################################################################
+
+def iniciar_registro(config=None):
+    """
+    Creates the record of a run, in which the measurements of each stage and of each chunk are kept.
+
+    Parameters
+    ----------
+    config: dict
+            Run configuration, saved with the record.
+
+    Returns
+    -------
+    registro: dict
+              Record of the run (see medir_etapa, registrar_chunks and guardar_registro).
+
+    Example
+    -------
+    >>> iniciar_registro({'procesos': 4})
+    {'inicio': '2019-05-27T09:46:38', 'config': {'procesos': 4}, 'etapas': [], 'chunks': []}
+    """
+
+    registro = {'inicio': datetime.now().isoformat(timespec='seconds'),
+                'config': dict(config or {}),
+                'etapas': [],
+                'chunks': []}
+
+
+    return registro
+
+
+
+###############################################################################
+def obtener_tiempo_cpu():
+    """
+    Gets the CPU time used by the current process and by its finished child processes (the workers of the process pools).
+
+    Parameters
+    ----------
+    None
+
+    Returns
+    -------
+    tiempo_cpu: float
+                CPU time, in seconds.
+    """
+
+    tiempo_cpu = time.process_time()
+    if resource is not None:
+        hijos = resource.getrusage(resource.RUSAGE_CHILDREN)
+        tiempo_cpu += hijos.ru_utime + hijos.ru_stime
+
+
+    return tiempo_cpu
+
+
+
+###############################################################################
+def obtener_memoria_pico():
+    """
+    Gets the peak resident memory (RSS) of the current process and of its largest finished child process, since they started.
+    It is not available on Windows (the resource module does not exist), where None is returned.
+
+    Parameters
+    ----------
+    None
+
+    Returns
+    -------
+    memoria_pico: float or None
+                  Peak RSS, in MB.
+    memoria_pico_hijos: float or None
+                        Peak RSS of the largest child process, in MB.
+    """
+
+    if resource is None:
+        return None, None
+
+    # ru_maxrss está en KB en Linux y en bytes en macOS
+    unidad = 2 ** 20 if sys.platform == 'darwin' else 2 ** 10
+    memoria_pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / unidad
+    memoria_pico_hijos = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / unidad
+
+
+    return round(memoria_pico, 1), round(memoria_pico_hijos, 1)
+
+
+
+###############################################################################
+@contextmanager
+def medir_etapa(registro, nombre):
+    """
+    Measures a stage of the run: wall time, CPU time (including the finished worker processes), peak RSS and, if the stage sets it, the number of rows.
+    The measurement is added to the stages of the record when the stage ends. With registro None nothing is recorded.
+
+    Parameters
+    ----------
+    registro: dict or None
+              Record of the run (see iniciar_registro).
+    nombre: str
+            Name of the stage.
+
+    Returns
+    -------
+    etapa: dict
+           Measurement of the stage. The number of rows can be set in its key 'filas'.
+
+    Example
+    -------
+    >>> with medir_etapa(registro, 'calcular_niveles') as etapa:
+    ...     valoracion = calcular_niveles(valoracion, event_typology_config)
+    ...     etapa['filas'] = len(valoracion)
+    """
+
+    etapa = {'etapa': nombre, 'filas': None}
+    inicio = time.perf_counter()
+    inicio_cpu = obtener_tiempo_cpu()
+    try:
+        yield etapa
+    finally:
+        etapa['tiempo'] = time.perf_counter() - inicio
+        etapa['tiempo_cpu'] = obtener_tiempo_cpu() - inicio_cpu
+        etapa['memoria_pico_mb'], etapa['memoria_pico_hijos_mb'] = obtener_memoria_pico()
+        if registro is not None:
+            registro['etapas'].append(etapa)
+
+
+
+###############################################################################
+def medir(funcion, *args):
+    """
+    Calls a function measuring its wall and CPU time (of the current process).
+
+    Parameters
+    ----------
+    funcion: function
+             Function to be called.
+    args: tuple
+          Arguments of the function.
+
+    Returns
+    -------
+    resultado: object
+               Result of the function.
+    tiempo: float
+            Wall time, in seconds.
+    tiempo_cpu: float
+                CPU time, in seconds.
+
+    Example
+    -------
+    >>> chunk, tiempo, tiempo_cpu = medir(next, reader, None)
+    """
+
+    inicio = time.perf_counter()
+    inicio_cpu = time.process_time()
+    resultado = funcion(*args)
+
+
+    return resultado, time.perf_counter() - inicio, time.process_time() - inicio_cpu
+
+
+
+###############################################################################
+def crear_medida_chunk(fic, filas, n_bytes, lectura, proceso):
+    """
+    Builds the measurement of a chunk, sent back with its evaluation structure (see registrar_chunks).
+
+    Parameters
+    ----------
+    fic: string
+         File name.
+    filas: int
+           Number of rows of the chunk.
+    n_bytes: int or None
+             Bytes of the file in the chunk. If None, they are estimated from the rows of the chunk (see registrar_chunks).
+    lectura: tuple
+             Wall and CPU time reading the chunk, in seconds.
+    proceso: tuple
+             Wall and CPU time evaluating the chunk (process_chunk), in seconds.
+
+    Returns
+    -------
+    medida: dict
+            Measurement of the chunk.
+    """
+
+    medida = {'fichero': os.path.basename(fic),
+              'filas': filas,
+              'bytes': n_bytes,
+              'tiempo_lectura': lectura[0],
+              'tiempo_cpu_lectura': lectura[1],
+              'tiempo_proceso': proceso[0],
+              'tiempo_cpu_proceso': proceso[1],
+              'memoria_pico_mb': obtener_memoria_pico()[0]}
+
+
+    return medida
+
+
+
+###############################################################################
+def registrar_chunks(registro, medidas, lis_fic):
+    """
+    Adds the measurements of the chunks to the record of the run, with their throughput (rows/s and bytes/s), and the read and process_chunk stages, which add up the times of all the chunks.
+    The bytes of the chunks read without byte ranges (sequential .csv reading, Parquet and Arrow IPC blocks) are estimated sharing out the size of their file by rows.
+
+    Parameters
+    ----------
+    registro: dict or None
+              Record of the run (see iniciar_registro). With None nothing is recorded.
+    medidas: list
+             Measurement of each chunk (see crear_medida_chunk).
+    lis_fic: list
+             List of data sample files.
+
+    Returns
+    -------
+    None
+    """
+
+    if registro is None:
+        return
+
+    tamanos = {os.path.basename(fic): os.path.getsize(os.path.join(BASE_PATH, INPUT_DIR, fic)) for fic in lis_fic}
+    filas_fichero = {}
+    for medida in medidas:
+        filas_fichero[medida['fichero']] = filas_fichero.get(medida['fichero'], 0) + medida['filas']
+
+    for medida in medidas:
+        if medida['bytes'] is None:
+            medida['bytes'] = int(round(tamanos[medida['fichero']] * medida['filas'] / max(filas_fichero[medida['fichero']], 1)))
+        tiempo = medida['tiempo_lectura'] + medida['tiempo_proceso']
+        medida['filas_por_segundo'] = medida['filas'] / tiempo if tiempo > 0 else None
+        medida['bytes_por_segundo'] = medida['bytes'] / tiempo if tiempo > 0 else None
+        registro['chunks'].append(medida)
+
+    # Etapas de lectura y evaluación: suma de los tiempos de todos los chunks
+    #   (en la ejecución en paralelo, suma de los tiempos de todos los procesos)
+    filas = sum(filas_fichero.values())
+    memorias = [medida['memoria_pico_mb'] for medida in medidas if medida['memoria_pico_mb'] is not None]
+    for nombre, sufijo in [('read', 'lectura'), ('process_chunk', 'proceso')]:
+        registro['etapas'].append({'etapa': nombre,
+                                   'filas': filas,
+                                   'tiempo': sum(medida['tiempo_' + sufijo] for medida in medidas),
+                                   'tiempo_cpu': sum(medida['tiempo_cpu_' + sufijo] for medida in medidas),
+                                   'memoria_pico_mb': max(memorias) if memorias else None,
+                                   'memoria_pico_hijos_mb': None})
+
+
+
+###############################################################################
+def guardar_registro(registro):
+    """
+    Saves the record of the run as a JSON file in the output directory, next to the reports.
+
+    Parameters
+    ----------
+    registro: dict
+              Record of the run (see iniciar_registro).
+
+    Returns
+    -------
+    path_registro: str
+                   Path of the JSON file.
+
+    Example
+    -------
+    >>> guardar_registro(registro)
+    'output/registro_ejecucion_20190527_094638.json'
+    """
+
+    fecha = datetime.strptime(registro['inicio'], '%Y-%m-%dT%H:%M:%S').strftime('%Y%m%d_%H%M%S')
+    path_registro = os.path.join(BASE_PATH, OUTPUT_DIR, FICHERO_REGISTRO_EJECUCION % fecha)
+    with open(path_registro, 'w', encoding=ENCODING) as fichero:
+        json.dump(registro, fichero, indent=2, default=str)
+
+
+    return path_registro
@@ -0,0 +1,81 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+'''
+Checks that the parallel evaluation of a .csv data sample file, split into
+byte ranges, gives the same results as the sequential one.
+
+Run from the "for Python 3.7" directory:
+
+    python -m unittest discover tests
+'''
+
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import lib_calidad_datos as cd
+from benchmark import kernels
+
+
+# Tamaño de la muestra y de los chunks: los chunks son pequeños para que el
+#   fichero se divida en muchos rangos
+FILAS = 20000
+CHUNKSIZE = 700
+PARES = 50
+PROCESOS = 2
+
+# Proporción de valores con saltos de línea y con separadores entre comillas
+TASA_SALTOS = 0.03
+TASA_COMILLAS = 0.01
+
+
+
+###############################################################################
+class TestRangosCsv(unittest.TestCase):
+
+    def setUp(self):
+        self.directorio = tempfile.mkdtemp()
+        self.entorno = kernels.preparar_entorno(PARES, os.path.join(self.directorio, 'config'))
+        cd.makedir(os.path.join(self.directorio, 'input'))
+        cd.configurar_ejecucion(input_dir=os.path.join(self.directorio, 'input'), chunksize=CHUNKSIZE)
+
+    def tearDown(self):
+        shutil.rmtree(self.directorio)
+
+    def escribir_muestra(self, fic, tasa_saltos, tasa_comillas):
+        generador_aleatorio = np.random.default_rng(0)
+        dat = kernels.generar_datos(self.entorno, FILAS)
+        campo_saltos, campo_comillas = self.entorno['campos'][-1], self.entorno['campos'][0]
+        dat[campo_saltos] = dat[campo_saltos].astype(object)
+        dat.loc[generador_aleatorio.random(FILAS) < tasa_saltos, campo_saltos] = 'linea1\nlinea2'
+        dat[campo_comillas] = dat[campo_comillas].astype(object)
+        dat.loc[generador_aleatorio.random(FILAS) < tasa_comillas, campo_comillas] = 'a;"b"'
+        dat.to_csv(os.path.join(self.directorio, 'input', fic), sep=';', index=False)
+
+    def comprobar_paralelo(self, fic):
+        secuencial = cd.evaluar_ficheros([fic], ';', self.entorno['d_s_c'], self.entorno['e_t_c'])
+        paralelo = cd.evaluar_ficheros_en_paralelo([fic], ';', self.entorno['d_s_c'], self.entorno['e_t_c'],
+                                                   PROCESOS)
+        # El orden de los pares depende de qué rango termina antes
+        pd.testing.assert_frame_equal(secuencial[fic][0].sort_index(), paralelo[fic][0].sort_index())
+        self.assertEqual(secuencial[fic][1], paralelo[fic][1])
+
+    def test_sin_comillas(self):
+        self.escribir_muestra('muestra.csv', 0, 0)
+        self.comprobar_paralelo('muestra.csv')
+
+    def test_saltos_de_linea_entre_comillas(self):
+        self.escribir_muestra('muestra.csv', TASA_SALTOS, TASA_COMILLAS)
+        self.assertGreater(len(cd.obtener_rangos_fichero('muestra.csv', CHUNKSIZE)), 1)
+        self.comprobar_paralelo('muestra.csv')
+
+
+
+if __name__ == '__main__':
+    unittest.main()